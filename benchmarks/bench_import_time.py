@@ -0,0 +1,78 @@
+# benchmarks/bench_import_time.py
+"""
+Cold-start import benchmark for the pipeline modules.
+
+Imports each module in a fresh interpreter, reports the best wall time
+over several runs, and exits non-zero if a module takes longer than the
+budget or pulls in a heavy library (transformers, torch, spaCy, sklearn,
+matplotlib) at import time. Heavy models must be loaded through src/models.py.
+
+Usage:
+    python -m benchmarks.bench_import_time --max-seconds 2.0
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+MODULES = [
+    "src.task2_sentiment_theme",
+    "src.task2_utils",
+    "src.theme_matcher",
+    "src.models",
+    "src.inference_backends",
+    "src.task4_insights",
+    "src.pipeline",
+]
+HEAVY = ["transformers", "torch", "spacy", "sklearn", "tqdm", "matplotlib",
+         "seaborn", "wordcloud", "onnxruntime"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+"""
+
+
+def measure(module: str, runs: int) -> dict:
+    """Best-of-`runs` import time of `module` in fresh interpreters."""
+    best = None
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)],
+            capture_output=True, text=True, check=True,
+        )
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--runs", type=int, default=3)
+    arg_parser.add_argument("--max-seconds", type=float, default=2.0,
+                            help="import time budget per module")
+    args = arg_parser.parse_args()
+
+    failed = False
+    for module in MODULES:
+        result = measure(module, args.runs)
+        status = "ok"
+        if result["heavy"]:
+            status = "FAIL: imports " + ", ".join(result["heavy"])
+            failed = True
+        elif result["seconds"] > args.max_seconds:
+            status = f"FAIL: over {args.max_seconds:.1f}s budget"
+            failed = True
+        print(f"{module:<28} {result['seconds']:.3f}s  {status}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
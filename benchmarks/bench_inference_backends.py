@@ -0,0 +1,119 @@
+# benchmarks/bench_inference_backends.py
+"""
+Compare the sentiment inference backends (src/inference_backends.py) on
+CPU: model load time, throughput through compute_sentiment (same length
+bucketing as the pipeline) and parity with the reference backend.
+
+Parity is measured on the labels compute_sentiment stores (POSITIVE /
+NEGATIVE / NEUTRAL after the confidence cut-off), together with the raw
+model label disagreement and the largest score difference. The script
+exits non-zero if a backend disagrees with the reference on more than
+--max-disagreement of the reviews, so it can gate a backend switch.
+
+Reviews come from src/synthetic.py unless --input points at a cleaned
+reviews CSV (e.g. data/cleaned/clean_reviews.csv).
+
+Usage:
+    python -m benchmarks.bench_inference_backends --n 2000
+    python -m benchmarks.bench_inference_backends --input \
+        data/cleaned/clean_reviews.csv --backends pipeline int8 --threads 4
+"""
+
+import argparse
+import sys
+import time
+import numpy as np
+import pandas as pd
+from src.inference_backends import BACKENDS, load_backend, prepare_backend
+from src.models import clear_models
+from src.synthetic import generate_reviews
+from src.task2_sentiment_theme import (
+    DISTILBERT_MODEL,
+    compute_sentiment,
+)
+
+
+def load_texts(path: str, n: int) -> pd.DataFrame:
+    """n reviews from a CSV with a `review` column, or synthetic ones."""
+    if path:
+        df = pd.read_csv(path, usecols=["review"], nrows=n)
+    else:
+        df = generate_reviews(n, noise=0.0)[["review"]]
+    return df.dropna().reset_index(drop=True)
+
+
+def run_backend(backend: str, df: pd.DataFrame, threads: int) -> dict:
+    """Export (if needed), load and run one backend; time each step."""
+    start = time.perf_counter()
+    prepare_backend(backend, DISTILBERT_MODEL)
+    export_s = time.perf_counter() - start
+
+    clear_models()  # measure a cold load, not the registry
+    if backend == "pipeline" and threads:
+        import torch
+
+        torch.set_num_threads(threads)
+    start = time.perf_counter()
+    classifier = load_backend(backend, DISTILBERT_MODEL, threads)
+    classifier(["warm up"])
+    load_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scored = compute_sentiment(df.copy(), classifier)
+    infer_s = time.perf_counter() - start
+    return {"export_s": export_s, "load_s": load_s, "infer_s": infer_s,
+            "labels": scored["sentiment_label"].astype(str).to_numpy(),
+            "scores": scored["sentiment_score"].to_numpy()}
+
+
+def parity(result: dict, reference: dict) -> dict:
+    """Label disagreement and score differences against the reference."""
+    differ = result["labels"] != reference["labels"]
+    # scores are comparable where both runs kept a non-neutral label
+    same = ~differ & (reference["labels"] != "NEUTRAL")
+    diff = np.abs(result["scores"] - reference["scores"])[same]
+    return {"disagreement": float(differ.mean()),
+            "max_score_diff": float(diff.max()) if diff.size else 0.0}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--n", type=int, default=2000,
+                            help="reviews to classify")
+    arg_parser.add_argument("--input", help="cleaned reviews CSV "
+                                            "(default: synthetic reviews)")
+    arg_parser.add_argument("--backends", nargs="+", choices=BACKENDS,
+                            default=list(BACKENDS))
+    arg_parser.add_argument("--reference", choices=BACKENDS,
+                            default="pipeline")
+    arg_parser.add_argument("--threads", type=int, default=None,
+                            help="intra-op threads (default: all cores)")
+    arg_parser.add_argument("--max-disagreement", type=float, default=0.02,
+                            help="allowed share of differing labels")
+    args = arg_parser.parse_args()
+
+    df = load_texts(args.input, args.n)
+    backends = list(dict.fromkeys([args.reference] + args.backends))
+    print(f"{len(df):,} reviews, model {DISTILBERT_MODEL}")
+    print(f"{'backend':<10} {'export s':>9} {'load s':>8} {'reviews/s':>10} "
+          f"{'labels differ':>14} {'max |score diff|':>17}")
+
+    results = {}
+    failed = False
+    for backend in backends:
+        results[backend] = result = run_backend(backend, df, args.threads)
+        check = parity(result, results[args.reference])
+        status = ""
+        if check["disagreement"] > args.max_disagreement:
+            status = f"  FAIL: over {args.max_disagreement:.1%}"
+            failed = True
+        print(f"{backend:<10} {result['export_s']:9.1f} "
+              f"{result['load_s']:8.2f} {len(df) / result['infer_s']:10,.0f} "
+              f"{check['disagreement']:14.2%} "
+              f"{check['max_score_diff']:17.4f}{status}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
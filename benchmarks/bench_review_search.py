@@ -0,0 +1,130 @@
+# benchmarks/bench_review_search.py
+"""
+Latency of full-text review search (src/review_search.py) on synthetic
+reviews (src/synthetic.py): phrase, boolean and filtered queries through
+the FTS5 index, against a LIKE '%...%' scan of review_text for the
+queries a LIKE can express.
+
+The sqlite database is built with the review loader, then indexed with
+update_search_index() as insert_reviews does. With --backend postgres the
+queries run against the configured database instead (migration 005
+applied, reviews already loaded).
+
+Usage:
+    python -m benchmarks.bench_review_search --n 10000000 --db /tmp/search.db
+    python -m benchmarks.bench_review_search --db /tmp/search.db --reuse
+    python -m benchmarks.bench_review_search --backend postgres
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from src.review_loader import load_reviews
+from src.review_query import PostgresBackend, SQLiteBackend, TTLCache
+from src.review_search import ReviewSearch, rebuild_search_index
+from src.review_search import update_search_index
+from src.synthetic import write_synthetic_reviews
+
+# (label, query, filters, LIKE pattern or None)
+QUERIES = [
+    ("phrase", '"otp code never arrives"', {}, "%otp code never arrives%"),
+    ("phrase + bank", '"transfer is slow"', {"bank": "CBE"},
+     "%transfer is slow%"),
+    ("phrase + dates", '"login fails"',
+     {"start_date": "2025-01-01", "end_date": "2025-03-31"},
+     "%login fails%"),
+    ("boolean AND NOT", "transfer AND failed NOT deducted", {}, None),
+    ("boolean OR", '"otp code" OR password', {"bank": "BOA"}, None),
+    ("rare word", "telebirr", {}, "%telebirr%"),
+    ("common word", "app", {}, "%app%"),
+]
+
+
+def build_database(path: str, n: int):
+    """Load n synthetic reviews into a fresh sqlite db and index them."""
+    if os.path.exists(path):
+        os.remove(path)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "reviews.csv")
+        write_synthetic_reviews(csv_path, n, clean=True)
+        conn = sqlite3.connect(path)
+        load_reviews(conn, csv_path)
+    start = time.perf_counter()
+    indexed = update_search_index(conn)
+    conn.commit()
+    index_s = time.perf_counter() - start
+    start = time.perf_counter()
+    rebuild_search_index(conn, optimize=True)
+    conn.commit()
+    conn.close()
+    print(f"Indexed {indexed:,} reviews in {index_s:.1f}s "
+          f"(full rebuild + optimize {time.perf_counter() - start:.1f}s)")
+
+
+def like_scan(path: str, pattern: str, filters: dict) -> float:
+    """Seconds for the equivalent LIKE count (bank / date filters)."""
+    sql = ("SELECT COUNT(*) FROM reviews r JOIN banks b "
+           "ON b.bank_id = r.bank_id WHERE r.review_text LIKE ?")
+    params = [pattern]
+    if "bank" in filters:
+        sql += " AND b.bank_name = ?"
+        params.append(filters["bank"])
+    if "start_date" in filters:
+        sql += " AND r.review_date BETWEEN ? AND ?"
+        params += [filters["start_date"], filters["end_date"]]
+    conn = sqlite3.connect(path)
+    start = time.perf_counter()
+    conn.execute(sql, params).fetchone()
+    seconds = time.perf_counter() - start
+    conn.close()
+    return seconds
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--n", type=int, default=1000000)
+    arg_parser.add_argument("--db", default=os.path.join(
+        tempfile.gettempdir(), "bench_review_search.db"))
+    arg_parser.add_argument("--reuse", action="store_true",
+                            help="query an existing --db without reloading")
+    arg_parser.add_argument("--backend", choices=["sqlite", "postgres"],
+                            default="sqlite")
+    arg_parser.add_argument("--repeat", type=int, default=20)
+    arg_parser.add_argument("--limit", type=int, default=20)
+    arg_parser.add_argument("--no-like", action="store_true",
+                            help="skip the LIKE scan baseline")
+    args = arg_parser.parse_args()
+
+    if args.backend == "sqlite":
+        if not args.reuse:
+            build_database(args.db, args.n)
+        backend = SQLiteBackend(args.db)
+    else:
+        backend = PostgresBackend()
+    # no result cache: every repeat runs the query
+    rs = ReviewSearch(backend, TTLCache(maxsize=0))
+
+    print(f"{'query':<18} {'matches':>10} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'LIKE ms':>9}")
+    for label, query, filters, pattern in QUERIES:
+        matches = rs.count_matches(query, **filters)
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            rs.search(query, args.limit, **filters)
+            times.append((time.perf_counter() - start) * 1000)
+        p95 = statistics.quantiles(times, n=20)[-1] if len(times) > 1 \
+            else times[0]
+        like = ""
+        if pattern and args.backend == "sqlite" and not args.no_like:
+            like = f"{like_scan(args.db, pattern, filters) * 1000:9.1f}"
+        print(f"{label:<18} {matches:>10,} {statistics.median(times):9.1f} "
+              f"{p95:9.1f} {like:>9}")
+    rs.close()
+
+
+if __name__ == "__main__":
+    main()
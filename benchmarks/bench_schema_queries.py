@@ -0,0 +1,262 @@
+# benchmarks/bench_schema_queries.py
+"""
+EXPLAIN ANALYZE the queries from schema.sql against two copies of the
+same synthetic data:
+
+- reviews_flat: the original schema.sql table (no indexes, no partitions)
+- reviews:      the migrated table (content hash, composite indexes,
+                monthly partitions on review_date)
+
+Everything is created in a scratch PostgreSQL schema (dropped at the end
+unless --keep) of the database configured by the DB_* settings. Rows are
+generated server-side with generate_series, so 10M rows need no client
+memory.
+
+Usage:
+    python -m benchmarks.bench_schema_queries --rows 10000000
+"""
+
+import argparse
+import json
+import time
+from src.db import get_connection
+from src.migrate import apply_migrations
+
+BENCH_SCHEMA = "bench_reviews"
+BATCH_ROWS = 1000000  # rows generated per INSERT ... SELECT
+WORDS = ("good bad app slow login transfer crash nice update otp balance "
+         "fast support").split()
+FIRST_DAY = "2022-01-01"
+DAYS = 3 * 365
+
+FLAT_TABLE_SQL = """
+CREATE TABLE reviews_flat (
+    review_id SERIAL PRIMARY KEY,
+    bank_id INT REFERENCES banks(bank_id),
+    review_text TEXT,
+    rating INT,
+    review_date DATE,
+    sentiment_label VARCHAR(20),
+    sentiment_score FLOAT,
+    source VARCHAR(50)
+);
+"""
+
+# six random words per review keep accidental content-hash collisions rare
+GENERATE_SQL = """
+INSERT INTO reviews (bank_id, review_text, rating, review_date,
+                     sentiment_label, sentiment_score, source, content_hash)
+SELECT bank_id, review_text, rating, review_date,
+       sentiment_label, sentiment_score, source,
+       md5(bank_id::text || '|' || review_text || '|'
+           || to_char(review_date, 'YYYY-MM-DD'))
+FROM (
+    SELECT 1 + (g % 3) AS bank_id,
+           (SELECT string_agg(w[1 + floor(random() * array_length(w, 1))::int],
+                              ' ')
+            FROM generate_series(1, 6) AS k
+            WHERE g IS NOT NULL) AS review_text,
+           1 + floor(random() * 5)::int AS rating,
+           DATE %(first_day)s + floor(random() * %(days)s)::int AS review_date,
+           CASE WHEN random() < 0.05 THEN NULL
+                WHEN random() < 0.6 THEN 'POSITIVE'
+                ELSE 'NEGATIVE' END AS sentiment_label,
+           random() AS sentiment_score,
+           CASE WHEN random() < 0.9 THEN 'Google Play'
+                ELSE 'App Store' END AS source
+    FROM generate_series(%(start)s, %(stop)s) AS g,
+         (SELECT %(words)s::text[] AS w) AS vocab
+) AS generated
+ON CONFLICT DO NOTHING;
+"""
+
+# The schema.sql queries, with {table} standing for the reviews table.
+QUERIES = {
+    "count_per_bank_id": """
+        SELECT bank_id, COUNT(*) FROM {table} GROUP BY bank_id;
+    """,
+    "count_all": """
+        SELECT COUNT(*) FROM {table};
+    """,
+    "reviews_per_bank": """
+        SELECT b.bank_name, COUNT(r.review_id) AS total_reviews
+        FROM banks b
+        LEFT JOIN {table} r ON b.bank_id = r.bank_id
+        GROUP BY b.bank_name
+        ORDER BY total_reviews DESC;
+    """,
+    "avg_rating_per_bank": """
+        SELECT b.bank_name, ROUND(AVG(r.rating), 2) AS avg_rating
+        FROM banks b
+        LEFT JOIN {table} r ON b.bank_id = r.bank_id
+        GROUP BY b.bank_name;
+    """,
+    "sentiment_per_bank": """
+        SELECT b.bank_name, r.sentiment_label, COUNT(*) AS sentiment_count
+        FROM banks b
+        LEFT JOIN {table} r ON b.bank_id = r.bank_id
+        GROUP BY b.bank_name, r.sentiment_label
+        ORDER BY b.bank_name, sentiment_count DESC;
+    """,
+    "missing_text_or_rating": """
+        SELECT * FROM {table}
+        WHERE review_text IS NULL OR rating IS NULL;
+    """,
+    "count_by_source": """
+        SELECT source, COUNT(*) AS total_reviews
+        FROM {table}
+        GROUP BY source;
+    """,
+    "duplicate_texts": """
+        SELECT review_text, COUNT(*) AS dup_count
+        FROM {table}
+        GROUP BY review_text
+        HAVING COUNT(*) > 1;
+    """,
+    # one bank, one month: partition pruning + (bank_id, review_date)
+    "bank_month_count": """
+        SELECT COUNT(*) FROM {table}
+        WHERE bank_id = 1
+          AND review_date >= DATE '2024-06-01'
+          AND review_date < DATE '2024-07-01';
+    """,
+}
+
+# The loader's "is this review already stored?" check, before and after.
+DEDUP_QUERIES = {
+    "reviews_flat": """
+        SELECT 1 FROM reviews_flat
+        WHERE bank_id = 1 AND review_text = 'good app'
+          AND review_date = DATE '2023-05-01';
+    """,
+    "reviews": """
+        SELECT 1 FROM reviews
+        WHERE content_hash = md5('1|good app|2023-05-01')
+          AND review_date = DATE '2023-05-01';
+    """,
+}
+
+
+def setup(conn, rows: int):
+    """Create both tables in the scratch schema and fill them."""
+    cur = conn.cursor()
+    cur.execute(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE;")
+    cur.execute(f"CREATE SCHEMA {BENCH_SCHEMA};")
+    cur.execute(f"SET search_path TO {BENCH_SCHEMA};")
+    apply_migrations(conn)
+
+    cur.execute("""
+        INSERT INTO banks (bank_name, app_name) VALUES
+        ('Commercial Bank of Ethiopia', 'CBE Mobile Banking'),
+        ('Bank of Abyssinia', 'BOA Mobile Banking'),
+        ('Dashen Bank', 'Dashen Mobile Banking');
+    """)
+    cur.execute(
+        "SELECT create_review_partitions(%s, DATE %s + %s);",
+        (FIRST_DAY, FIRST_DAY, DAYS),
+    )
+    cur.execute(FLAT_TABLE_SQL)
+
+    start = time.perf_counter()
+    for batch_start in range(1, rows + 1, BATCH_ROWS):
+        batch_stop = min(batch_start + BATCH_ROWS - 1, rows)
+        cur.execute(GENERATE_SQL, {
+            "start": batch_start,
+            "stop": batch_stop,
+            "first_day": FIRST_DAY,
+            "days": DAYS,
+            "words": WORDS,
+        })
+        print(f"Generated {batch_stop:,} / {rows:,} rows "
+              f"({time.perf_counter() - start:.0f}s)")
+    cur.execute("""
+        INSERT INTO reviews_flat (review_id, bank_id, review_text, rating,
+                                  review_date, sentiment_label,
+                                  sentiment_score, source)
+        SELECT review_id, bank_id, review_text, rating, review_date,
+               sentiment_label, sentiment_score, source
+        FROM reviews;
+    """)
+    # visibility map + statistics, so index-only scans are possible
+    cur.execute("VACUUM ANALYZE reviews;")
+    cur.execute("VACUUM ANALYZE reviews_flat;")
+    cur.close()
+
+
+def explain(conn, sql: str) -> dict:
+    """Run EXPLAIN ANALYZE; return execution time and the scan node types."""
+    cur = conn.cursor()
+    cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql)
+    plan = cur.fetchone()[0]
+    cur.close()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    plan = plan[0]
+
+    def scans(node):
+        found = [node["Node Type"]] if "Scan" in node["Node Type"] else []
+        for child in node.get("Plans", []):
+            found.extend(scans(child))
+        return found
+
+    return {
+        "ms": plan["Execution Time"],
+        "scans": sorted(set(scans(plan["Plan"]))),
+    }
+
+
+def run(conn, repeat: int) -> list:
+    """Best-of-`repeat` timing of every query on both tables."""
+    results = []
+    cases = [(name, sql.format(table=table), table)
+             for name, sql in QUERIES.items()
+             for table in ("reviews_flat", "reviews")]
+    cases += [("dedup_lookup", sql, table)
+              for table, sql in DEDUP_QUERIES.items()]
+    for name, sql, table in cases:
+        runs = [explain(conn, sql) for _ in range(repeat)]
+        best = min(runs, key=lambda r: r["ms"])
+        results.append({"query": name, "table": table, **best})
+    return results
+
+
+def print_results(results: list):
+    by_query = {}
+    for r in results:
+        by_query.setdefault(r["query"], {})[r["table"]] = r
+    print(f"{'query':<24}{'flat ms':>12}{'migrated ms':>14}{'speedup':>10}"
+          "  migrated plan")
+    for name, tables in by_query.items():
+        flat, new = tables["reviews_flat"], tables["reviews"]
+        speedup = flat["ms"] / new["ms"] if new["ms"] else float("inf")
+        print(f"{name:<24}{flat['ms']:>12,.1f}{new['ms']:>14,.1f}"
+              f"{speedup:>9.1f}x  {', '.join(new['scans'])}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--rows", type=int, default=10000000)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--keep", action="store_true",
+                            help=f"keep the {BENCH_SCHEMA} schema afterwards")
+    arg_parser.add_argument("--reuse", action="store_true",
+                            help="skip data generation (needs earlier --keep)")
+    args = arg_parser.parse_args()
+
+    conn = get_connection()
+    conn.autocommit = True  # VACUUM cannot run inside a transaction
+    try:
+        if args.reuse:
+            conn.cursor().execute(f"SET search_path TO {BENCH_SCHEMA};")
+        else:
+            setup(conn, args.rows)
+        print_results(run(conn, args.repeat))
+    finally:
+        if not args.keep:
+            conn.cursor().execute(
+                f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE;")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/bench_sentiment_batching.py
+"""
+Compare the length-bucketed sentiment batching in classify_texts
+(src/task2_sentiment_theme.py) with the previous loop, which classified
+fixed batches of --batch-size reviews in input order, so every batch was
+padded to its longest review.
+
+Both schedulers run on the same CPU classifier and truncation settings;
+the script prints reviews/sec for each and how many labels differ (only
+padding changes between them, so this should be zero or close to it).
+
+Reviews come from src/synthetic.py unless --input points at a cleaned
+reviews CSV (e.g. data/cleaned/clean_reviews.csv).
+
+Usage:
+    python -m benchmarks.bench_sentiment_batching --n 2000
+    python -m benchmarks.bench_sentiment_batching --input \
+        data/cleaned/clean_reviews.csv --backend onnx --threads 4
+"""
+
+import argparse
+import time
+from src.inference_backends import BACKENDS, load_backend
+from src.task2_sentiment_theme import (
+    DISTILBERT_MODEL,
+    MAX_TOKENS,
+    classify_texts,
+)
+from benchmarks.bench_inference_backends import load_texts
+
+
+def classify_fixed(texts: list, classifier, batch_size: int) -> list:
+    """The previous scheduler: fixed-size batches in input order."""
+    results = []
+    for start in range(0, len(texts), batch_size):
+        results += classifier(texts[start:start + batch_size],
+                              truncation=True, max_length=MAX_TOKENS)
+    return results
+
+
+def timed_run(fn, texts: list, rounds: int):
+    """Best wall time of `rounds` runs of fn(texts), and its results."""
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        results = fn(texts)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--n", type=int, default=2000,
+                            help="reviews to classify")
+    arg_parser.add_argument("--input", help="cleaned reviews CSV "
+                                            "(default: synthetic reviews)")
+    arg_parser.add_argument("--backend", choices=BACKENDS,
+                            default="pipeline")
+    arg_parser.add_argument("--batch-size", type=int, default=32,
+                            help="batch size of the fixed loop")
+    arg_parser.add_argument("--threads", type=int, default=None,
+                            help="intra-op threads (default: all cores)")
+    arg_parser.add_argument("--rounds", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    texts = load_texts(args.input, args.n)["review"].astype(str).tolist()
+    if args.backend == "pipeline" and args.threads:
+        import torch
+
+        torch.set_num_threads(args.threads)
+    classifier = load_backend(args.backend, DISTILBERT_MODEL, args.threads)
+    classifier(["warm up"])
+
+    fixed_s, fixed = timed_run(
+        lambda t: classify_fixed(t, classifier, args.batch_size),
+        texts, args.rounds)
+    bucketed_s, bucketed = timed_run(
+        lambda t: classify_texts(t, classifier), texts, args.rounds)
+    differ = sum(a["label"] != b["label"] for a, b in zip(fixed, bucketed))
+
+    print(f"{len(texts):,} reviews, model {DISTILBERT_MODEL} "
+          f"({args.backend}), best of {args.rounds}")
+    print(f"{'scheduler':<22} {'seconds':>8} {'reviews/s':>10}")
+    print(f"{f'fixed batch {args.batch_size}':<22} {fixed_s:8.2f} "
+          f"{len(texts) / fixed_s:10,.0f}")
+    print(f"{'length-bucketed':<22} {bucketed_s:8.2f} "
+          f"{len(texts) / bucketed_s:10,.0f}")
+    print(f"speedup {fixed_s / bucketed_s:.2f}x, "
+          f"{differ} label(s) differ")
+
+
+if __name__ == "__main__":
+    main()
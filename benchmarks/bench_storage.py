@@ -0,0 +1,80 @@
+# benchmarks/bench_storage.py
+"""
+Compare the CSV and typed Parquet storage of cleaned reviews: file size,
+load time with column projection and in-memory size. Also times the
+vectorized date normalization against the original per-row dateutil
+lambda.
+
+Usage:
+    python -m benchmarks.bench_storage --n 1000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from dateutil import parser
+from src.preprocess import normalize_dates
+from src.storage import read_reviews, write_reviews
+
+COLUMNS = ["review", "rating", "date", "bank"]
+
+
+def synthetic_clean_reviews(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    words = np.array("good bad app slow login transfer crash nice "
+                     "update otp balance fast support".split())
+    lengths = rng.integers(3, 25, size=n)
+    reviews = [" ".join(rng.choice(words, size=k)) for k in lengths]
+    dates = pd.Timestamp("2022-01-01") + pd.to_timedelta(
+        rng.integers(0, 3 * 365 * 24 * 3600, size=n), unit="s")
+    return pd.DataFrame({
+        "review": reviews,
+        "rating": rng.choice([1, 2, 3, 4, 5], size=n,
+                             p=[0.25, 0.07, 0.08, 0.1, 0.5]),
+        "date": dates,
+        "bank": rng.choice(["CBE", "BOA", "Dashen"], size=n),
+        "source": "Google Play",
+        "lang": "en",
+    })
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--n", type=int, default=1000000)
+    args = arg_parser.parse_args()
+
+    df = synthetic_clean_reviews(args.n)
+    raw_dates = df["date"].astype(str)
+
+    _, legacy_s = timed(lambda: raw_dates.apply(
+        lambda x: parser.parse(str(x)).strftime("%Y-%m-%d")))
+    _, vector_s = timed(lambda: normalize_dates(raw_dates))
+    print(f"reviews: {args.n:,}")
+    print(f"date normalization: dateutil {legacy_s:.2f}s, "
+          f"vectorized {vector_s:.2f}s ({legacy_s / vector_s:.0f}x)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "clean_reviews.csv")
+        pq_path = os.path.join(tmp, "clean_reviews.parquet")
+        df.to_csv(csv_path, index=False)
+        write_reviews(df, pq_path)
+
+        for label, path in [("csv", csv_path), ("parquet", pq_path)]:
+            loaded, load_s = timed(lambda: read_reviews(path, COLUMNS))
+            mem_mb = loaded.memory_usage(deep=True).sum() / 1e6
+            size_mb = os.path.getsize(path) / 1e6
+            print(f"{label:<8} file {size_mb:8.1f} MB  load {load_s:6.2f}s  "
+                  f"memory {mem_mb:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
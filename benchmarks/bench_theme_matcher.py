@@ -0,0 +1,134 @@
+# benchmarks/bench_theme_matcher.py
+"""
+Benchmark the compiled ThemeMatcher against the original per-keyword
+substring scan used by assign_themes_to_reviews, and compare the reviews
+per theme the two assign with the pipeline's dictionary.
+
+Usage:
+    python -m benchmarks.bench_theme_matcher --n 1000000
+    python -m benchmarks.bench_theme_matcher --keywords 18 \
+        --input data/cleaned/clean_reviews.csv
+"""
+
+import argparse
+import random
+import time
+import pandas as pd
+from src.theme_matcher import ThemeMatcher
+
+# Same dictionary as task2_sentiment_theme.map_keywords_to_themes
+MAPPING = {
+    "login": "Account Access Issues",
+    "password": "Account Access Issues",
+    "otp": "Account Access Issues",
+    "transfer": "Transaction Performance",
+    "slow": "Transaction Performance",
+    "delay": "Transaction Performance",
+    "failed": "Transaction Performance",
+    "crash": "Reliability & Stability",
+    "bug": "Reliability & Stability",
+    "ui": "User Interface & Experience",
+    "interface": "User Interface & Experience",
+    "design": "User Interface & Experience",
+    "support": "Customer Support",
+    "customer support": "Customer Support",
+    "fingerprint": "Feature Requests",
+    "feature": "Feature Requests",
+    "payment": "Transaction Performance",
+    "balance": "Account Information",
+}
+
+FILLER = (
+    "the app is very good but it keeps asking me to update quick debug "
+    "money bank account please fix this issue since last week thanks"
+).split()
+
+
+def extended_mapping(n_terms: int, seed: int = 0) -> dict:
+    """MAPPING padded with random made-up terms up to n_terms keywords."""
+    rng = random.Random(seed)
+    mapping = dict(MAPPING)
+    while len(mapping) < n_terms:
+        term = "".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=7))
+        mapping[term] = f"Theme {len(mapping) % 20}"
+    return mapping
+
+
+def synthetic_reviews(n: int, seed: int = 0) -> pd.Series:
+    """n random reviews mixing filler words and theme keywords."""
+    rng = random.Random(seed)
+    keywords = list(MAPPING)
+    reviews = []
+    for _ in range(n):
+        words = rng.choices(FILLER, k=rng.randint(3, 30))
+        for _ in range(rng.randint(0, 2)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(keywords))
+        reviews.append(" ".join(words))
+    return pd.Series(reviews)
+
+
+def legacy_assign(texts, mapping: dict) -> list:
+    """The original O(reviews x keywords) substring loop."""
+    lower_map = {k.lower(): v for k, v in mapping.items()}
+    out = []
+    for text in texts:
+        text_l = text.lower()
+        assigned = {theme for kw, theme in lower_map.items() if kw in text_l}
+        out.append("; ".join(sorted(assigned)) if assigned else "Other")
+    return out
+
+
+def theme_counts(themes) -> pd.Series:
+    """Reviews per theme from semicolon-joined theme strings."""
+    return pd.Series(themes).str.split("; ").explode().value_counts()
+
+
+def run(texts: pd.Series, mapping: dict):
+    """Time both implementations on one dictionary and print the result."""
+    start = time.perf_counter()
+    legacy = legacy_assign(texts, mapping)
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher = ThemeMatcher(mapping)
+    compiled = matcher.match_series(texts)
+    compiled_s = time.perf_counter() - start
+
+    changed = int((compiled != pd.Series(legacy)).sum())
+    print(f"keywords:           {len(mapping):,}")
+    print(f"  substring scan:   {legacy_s:.2f}s")
+    print(f"  compiled matcher: {compiled_s:.2f}s "
+          f"({legacy_s / compiled_s:.1f}x)")
+    print(f"  relabelled:       {changed:,} reviews "
+          "(substring false positives such as 'ui' in 'quick')")
+    if mapping == MAPPING:
+        counts = pd.DataFrame({"substring": theme_counts(legacy),
+                               "compiled": theme_counts(compiled)})
+        counts = counts.fillna(0).astype(int)
+        counts["diff"] = counts["compiled"] - counts["substring"]
+        print(counts.sort_values("substring", ascending=False).to_string())
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--n", type=int, default=1000000)
+    arg_parser.add_argument("--input", help="CSV with a `review` column "
+                                            "(default: synthetic reviews)")
+    arg_parser.add_argument(
+        "--keywords", type=int, nargs="+", default=[len(MAPPING), 100, 500],
+        help="dictionary sizes to benchmark",
+    )
+    args = arg_parser.parse_args()
+
+    if args.input:
+        texts = pd.read_csv(args.input, usecols=["review"], nrows=args.n)
+        texts = texts["review"].dropna().astype(str).reset_index(drop=True)
+    else:
+        texts = synthetic_reviews(args.n)
+    print(f"reviews: {len(texts):,}")
+    for n_terms in args.keywords:
+        run(texts, extended_mapping(n_terms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+# benchmarks/run_benchmarks.py
+"""
+Benchmark suite: time the pipeline stages on synthetic reviews
+(src/synthetic.py) at several scales and store the results per commit.
+
+Stages: clean_reviews (preprocess, from a raw CSV), compute_sentiment
+(with a stubbed keyword classifier, so the batching / labelling code is
+measured and not DistilBERT), aggregate_sentiment,
+assign_themes_to_reviews and extract_tfidf_keywords.
+
+Each stage runs --rounds times per scale on a fresh copy of its input;
+min / median / mean / stddev and rows per second are saved to
+benchmarks/results/<commit>.json. --compare prints the ratio against the
+results of another commit.
+
+Usage:
+    python -m benchmarks.run_benchmarks --scales 10000 1000000
+    python -m benchmarks.run_benchmarks --scales 10000000 --rounds 1 \
+        --stages compute_sentiment assign_themes_to_reviews
+    python -m benchmarks.run_benchmarks --compare 3373848
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+import numpy as np
+from src import langid, preprocess
+from src.synthetic import generate_reviews
+from src.task2_sentiment_theme import (
+    aggregate_sentiment,
+    assign_themes_to_reviews,
+    compute_sentiment,
+    extract_tfidf_keywords,
+    map_keywords_to_themes,
+)
+
+RESULTS_DIR = "benchmarks/results"
+DEFAULT_SCALES = [10000, 100000, 1000000]
+NEGATIVE_WORDS = frozenset(
+    "bad worst useless not terrible fix disappointed failing poor "
+    "frustrating fails never slow crashes cannot broken error".split())
+
+
+class StubClassifier:
+    """Keyword stand-in for the DistilBERT pipeline (same output shape)."""
+
+    def __call__(self, batch, **kwargs):
+        out = []
+        for text in batch:
+            words = text.lower().split()
+            hits = sum(w in NEGATIVE_WORDS for w in words)
+            score = min(0.5 + 0.15 * (hits or len(words) % 4), 0.99)
+            out.append({"label": "NEGATIVE" if hits else "POSITIVE",
+                        "score": score})
+        return out
+
+
+def commit_id() -> str:
+    """Short HEAD commit, with -dirty if the tree has local changes."""
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                             capture_output=True, text=True,
+                             check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain",
+                                "--untracked-files=no"],
+                               capture_output=True, text=True,
+                               check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return sha + ("-dirty" if dirty else "")
+
+
+def bench_clean_reviews(n: int, workdir: str):
+    """preprocess.clean_reviews on a raw CSV, run inside `workdir`."""
+    raw_path = os.path.join(workdir, preprocess.RAW_FILE)
+    os.makedirs(os.path.dirname(raw_path), exist_ok=True)
+    generate_reviews(n).to_csv(raw_path, index=False, encoding="utf-8")
+
+    def run():
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            preprocess.clean_reviews()
+        finally:
+            os.chdir(cwd)
+
+    # cold language-ID memo every round, as in a fresh process
+    return lambda: langid._memo.clear(), run
+
+
+def make_stages(clean_df, mapping):
+    """stage name -> (setup returning the round's input, timed function)."""
+    classifier = StubClassifier()
+    return {
+        "compute_sentiment": (
+            lambda: clean_df.copy(),
+            lambda df: compute_sentiment(df, classifier),
+        ),
+        "aggregate_sentiment": (
+            lambda: compute_sentiment(clean_df.copy(), classifier),
+            aggregate_sentiment,
+        ),
+        "assign_themes_to_reviews": (
+            lambda: clean_df.copy(),
+            lambda df: assign_themes_to_reviews(df, mapping),
+        ),
+        "extract_tfidf_keywords": (
+            lambda: clean_df,
+            lambda df: extract_tfidf_keywords(df, top_n=30),
+        ),
+    }
+
+
+def measure(setup, fn, rounds: int) -> list:
+    """Seconds per round; setup output is passed to fn and not timed."""
+    times = []
+    for _ in range(rounds):
+        arg = setup()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn() if arg is None else fn(arg)
+            times.append(time.perf_counter() - start)
+    return times
+
+
+def summarize(stage: str, n: int, times: list) -> dict:
+    median = statistics.median(times)
+    return {
+        "stage": stage,
+        "n": n,
+        "rounds": len(times),
+        "min": min(times),
+        "median": median,
+        "mean": statistics.fmean(times),
+        "stddev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "rows_per_sec": n / median if median > 0 else None,
+    }
+
+
+def run_suite(scales: list, stages: list, rounds: int) -> list:
+    results = []
+    mapping = map_keywords_to_themes(None)
+    for n in scales:
+        clean_df = generate_reviews(n, clean=True)
+        benches = make_stages(clean_df, mapping)
+        with tempfile.TemporaryDirectory() as workdir:
+            if "clean_reviews" in stages:
+                benches["clean_reviews"] = bench_clean_reviews(n, workdir)
+            for stage in stages:
+                setup, fn = benches[stage]
+                row = summarize(stage, n, measure(setup, fn, rounds))
+                results.append(row)
+                print(f"{stage:<26} {n:>10,}  median {row['median']:8.3f}s"
+                      f"  min {row['min']:8.3f}s  "
+                      f"{row['rows_per_sec']:>12,.0f} rows/s")
+    return results
+
+
+def save_results(results: list, commit: str,
+                 results_dir: str = RESULTS_DIR) -> str:
+    """Merge results into <results_dir>/<commit>.json (same key wins)."""
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, f"{commit}.json")
+    previous = []
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            previous = json.load(f)["benchmarks"]
+    keys = {(r["stage"], r["n"]) for r in results}
+    merged = [r for r in previous if (r["stage"], r["n"]) not in keys]
+    merged += results
+    report = {
+        "commit": commit,
+        "saved_at": datetime.now().isoformat(timespec="seconds"),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpus": os.cpu_count(),
+            "numpy": np.__version__,
+        },
+        "benchmarks": sorted(merged, key=lambda r: (r["stage"], r["n"])),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def load_results(ref: str, results_dir: str = RESULTS_DIR) -> dict:
+    """Results of a commit (prefix) or JSON path, keyed by (stage, n)."""
+    if not os.path.exists(ref):
+        matches = sorted(glob.glob(os.path.join(results_dir, f"{ref}*.json")))
+        if not matches:
+            raise FileNotFoundError(f"No saved results for {ref!r} "
+                                    f"in {results_dir}")
+        ref = matches[0]
+    with open(ref, encoding="utf-8") as f:
+        report = json.load(f)
+    return {(r["stage"], r["n"]): r for r in report["benchmarks"]}
+
+
+def compare(current: list, baseline: dict, label: str):
+    print(f"\nCompared with {label} (median; >1.00x means faster now)")
+    for row in current:
+        base = baseline.get((row["stage"], row["n"]))
+        if base is None:
+            continue
+        ratio = base["median"] / row["median"]
+        print(f"{row['stage']:<26} {row['n']:>10,}  {base['median']:8.3f}s"
+              f" -> {row['median']:8.3f}s  ({ratio:.2f}x)")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--scales", type=int, nargs="+",
+                            default=DEFAULT_SCALES)
+    arg_parser.add_argument(
+        "--stages", nargs="+",
+        choices=["clean_reviews", "compute_sentiment", "aggregate_sentiment",
+                 "assign_themes_to_reviews", "extract_tfidf_keywords"],
+        default=["clean_reviews", "compute_sentiment", "aggregate_sentiment",
+                 "assign_themes_to_reviews", "extract_tfidf_keywords"],
+    )
+    arg_parser.add_argument("--rounds", type=int, default=3)
+    arg_parser.add_argument("--results-dir", default=RESULTS_DIR)
+    arg_parser.add_argument("--compare", metavar="COMMIT",
+                            help="commit (prefix) or results JSON to "
+                                 "compare against")
+    arg_parser.add_argument("--no-save", action="store_true")
+    args = arg_parser.parse_args()
+
+    results = run_suite(args.scales, args.stages, args.rounds)
+    if not args.no_save:
+        path = save_results(results, commit_id(), args.results_dir)
+        print(f"Saved: {path}")
+    if args.compare:
+        compare(results, load_results(args.compare, args.results_dir),
+                args.compare)
+
+
+if __name__ == "__main__":
+    main()
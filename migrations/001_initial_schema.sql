@@ -0,0 +1,30 @@
+-- 001: banks and reviews tables (the original schema.sql / insert_reviews.py layout)
+
+CREATE TABLE IF NOT EXISTS banks (
+    bank_id SERIAL PRIMARY KEY,
+    bank_name VARCHAR(100) NOT NULL,
+    app_name VARCHAR(100)
+);
+
+DO $$
+BEGIN
+    -- from schema.sql's ALTER TABLE banks ADD CONSTRAINT unique_bank_name;
+    -- databases set up with schema.sql already have it
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conrelid = 'banks'::regclass AND contype = 'u'
+    ) THEN
+        ALTER TABLE banks ADD CONSTRAINT unique_bank_name UNIQUE (bank_name);
+    END IF;
+END $$;
+
+CREATE TABLE IF NOT EXISTS reviews (
+    review_id SERIAL PRIMARY KEY,
+    bank_id INT REFERENCES banks(bank_id),
+    review_text TEXT,
+    rating INT,
+    review_date DATE,
+    sentiment_label VARCHAR(20),
+    sentiment_score FLOAT,
+    source VARCHAR(50)
+);
@@ -0,0 +1,95 @@
+-- 002: content-hash dedup key, monthly range partitions on review_date,
+-- and indexes for the per-bank / per-date / sentiment queries in schema.sql.
+--
+-- content_hash = md5(bank_id || '|' || review_text || '|' || YYYY-MM-DD),
+-- computed by src/review_loader.py for new rows. A unique constraint on a
+-- partitioned table must include the partition key, hence
+-- (content_hash, review_date); review_date is part of the hash anyway.
+
+-- Create one partition per month between two dates (inclusive months).
+-- The range is clamped to [2008-10 (Android Market launch), 12 months ahead],
+-- so a bogus date such as 1970-01-01 cannot create hundreds of empty
+-- partitions; rows outside it stay in reviews_default. A month that already
+-- has rows in reviews_default is skipped, since attaching it would fail.
+CREATE OR REPLACE FUNCTION create_review_partitions(from_date DATE, to_date DATE)
+RETURNS void AS $$
+DECLARE
+    month_start DATE := date_trunc(
+        'month', GREATEST(from_date, DATE '2008-10-01'))::date;
+    last_date DATE := LEAST(to_date, (CURRENT_DATE + INTERVAL '12 months')::date);
+    partition_name TEXT;
+BEGIN
+    WHILE month_start <= last_date LOOP
+        partition_name := 'reviews_' || to_char(month_start, 'YYYY_MM');
+        IF to_regclass(partition_name) IS NULL AND EXISTS (
+            SELECT 1 FROM reviews_default
+            WHERE review_date >= month_start
+              AND review_date < (month_start + INTERVAL '1 month')::date
+        ) THEN
+            month_start := (month_start + INTERVAL '1 month')::date;
+            CONTINUE;
+        END IF;
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF reviews '
+            'FOR VALUES FROM (%L) TO (%L)',
+            partition_name, month_start, (month_start + INTERVAL '1 month')::date
+        );
+        month_start := (month_start + INTERVAL '1 month')::date;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+ALTER TABLE reviews RENAME TO reviews_unpartitioned;
+ALTER TABLE reviews_unpartitioned
+    RENAME CONSTRAINT reviews_pkey TO reviews_unpartitioned_pkey;
+ALTER SEQUENCE reviews_review_id_seq OWNED BY NONE;
+
+CREATE TABLE reviews (
+    review_id INT NOT NULL DEFAULT nextval('reviews_review_id_seq'),
+    bank_id INT REFERENCES banks(bank_id),
+    review_text TEXT,
+    rating INT,
+    review_date DATE NOT NULL,
+    sentiment_label VARCHAR(20),
+    sentiment_score FLOAT,
+    source VARCHAR(50),
+    content_hash CHAR(32) NOT NULL,
+    PRIMARY KEY (review_id, review_date),
+    CONSTRAINT unique_review_content UNIQUE (content_hash, review_date)
+) PARTITION BY RANGE (review_date);
+
+ALTER SEQUENCE reviews_review_id_seq OWNED BY reviews.review_id;
+
+-- Rows outside the partitioned months (see create_review_partitions).
+CREATE TABLE reviews_default PARTITION OF reviews DEFAULT;
+
+SELECT create_review_partitions(
+    COALESCE((SELECT MIN(review_date) FROM reviews_unpartitioned), CURRENT_DATE),
+    (CURRENT_DATE + INTERVAL '12 months')::date
+);
+
+-- Reviews without a date cannot be placed in a month and are dropped
+-- (preprocess.py already removes them before loading).
+INSERT INTO reviews (review_id, bank_id, review_text, rating, review_date,
+                     sentiment_label, sentiment_score, source, content_hash)
+SELECT review_id, bank_id, review_text, rating, review_date,
+       sentiment_label, sentiment_score, source,
+       md5(bank_id::text || '|' || COALESCE(review_text, '') || '|'
+           || to_char(review_date, 'YYYY-MM-DD'))
+FROM reviews_unpartitioned
+WHERE review_date IS NOT NULL
+ORDER BY review_id
+ON CONFLICT DO NOTHING;
+
+DROP TABLE reviews_unpartitioned;
+
+-- Per-bank counts / averages and per-bank time ranges
+CREATE INDEX idx_reviews_bank_date ON reviews (bank_id, review_date);
+CREATE INDEX idx_reviews_bank_rating ON reviews (bank_id, rating);
+-- Sentiment breakdown per bank
+CREATE INDEX idx_reviews_bank_sentiment ON reviews (bank_id, sentiment_label);
+-- Reviews by source
+CREATE INDEX idx_reviews_source ON reviews (source);
+-- Sentiment backfill (src/update_sentiment.py) scans only unscored rows
+CREATE INDEX idx_reviews_missing_sentiment ON reviews (review_id)
+    WHERE sentiment_label IS NULL OR sentiment_score IS NULL;
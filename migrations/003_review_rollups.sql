@@ -0,0 +1,23 @@
+-- 003: pre-aggregated daily rollups of reviews, maintained incrementally
+-- by src/rollups.py. One row per bank, day and rating (0 = no rating).
+
+CREATE TABLE IF NOT EXISTS review_daily_rollup (
+    bank_id INT NOT NULL REFERENCES banks(bank_id),
+    review_date DATE NOT NULL,
+    rating INT NOT NULL,
+    n_reviews BIGINT NOT NULL,
+    score_sum DOUBLE PRECISION NOT NULL,
+    score_n BIGINT NOT NULL,
+    positive_count BIGINT NOT NULL,
+    negative_count BIGINT NOT NULL,
+    neutral_count BIGINT NOT NULL,
+    PRIMARY KEY (bank_id, review_date, rating)
+);
+
+-- Highest review_id already folded into each rollup.
+CREATE TABLE IF NOT EXISTS rollup_state (
+    rollup_name VARCHAR(100) PRIMARY KEY,
+    last_review_id BIGINT NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
@@ -0,0 +1,5 @@
+-- 004: store the Task-2 themes of each review ("; "-joined theme names,
+-- as in reviews_sentiment_themes.csv) so they can be filtered in SQL
+-- (src/review_query.py).
+
+ALTER TABLE reviews ADD COLUMN IF NOT EXISTS themes TEXT;
@@ -0,0 +1,11 @@
+-- 005: full-text search over review_text (src/review_search.py).
+-- review_tsv is a stored generated column, so every inserted review is
+-- indexed by the same statement that inserts it; the GIN index is the
+-- inverted index (term -> reviews) used by @@ queries.
+
+ALTER TABLE reviews ADD COLUMN IF NOT EXISTS review_tsv tsvector
+    GENERATED ALWAYS AS (
+        to_tsvector('english', COALESCE(review_text, ''))
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_reviews_tsv ON reviews USING GIN (review_tsv);
@@ -1,4 +1,6 @@
 -- SQLBook: Code
+-- The tables below are the original layout. The live schema (partitions,
+-- indexes, content hash) is created by migrations/ via `python -m src.migrate`.
 CREATE TABLE banks (
     bank_id SERIAL PRIMARY KEY,
     bank_name VARCHAR(100) NOT NULL,
@@ -0,0 +1,39 @@
+# src/db.py
+"""
+Shared PostgreSQL connection helper.
+Connection settings are read from the environment (.env) using the
+DB_NAME, DB_USER, DB_PASSWORD, DB_HOST and DB_PORT variables.
+"""
+
+import os
+import psycopg2
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Upper bound of connections held by a pool from get_pool()
+POOL_MAX = int(os.getenv("DB_POOL_MAX", "8"))
+
+
+def connection_params() -> dict:
+    """psycopg2.connect keyword arguments from the DB_* settings."""
+    return {
+        "dbname": os.getenv("DB_NAME"),
+        "user": os.getenv("DB_USER"),
+        "password": os.getenv("DB_PASSWORD"),
+        "host": os.getenv("DB_HOST"),
+        "port": os.getenv("DB_PORT"),
+    }
+
+
+def get_connection():
+    """Open a new psycopg2 connection using the DB_* settings."""
+    return psycopg2.connect(**connection_params())
+
+
+def get_pool(minconn: int = 1, maxconn: int = POOL_MAX):
+    """Thread-safe pool of connections using the DB_* settings."""
+    from psycopg2.pool import ThreadedConnectionPool
+
+    return ThreadedConnectionPool(minconn, maxconn, **connection_params())
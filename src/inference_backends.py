@@ -0,0 +1,241 @@
+# src/inference_backends.py
+"""
+Interchangeable CPU inference backends for the DistilBERT sentiment model.
+
+Every backend is called like the transformers pipeline: a list of texts
+in, one {"label", "score"} dict per text out, so compute_sentiment,
+the sentiment cache and SentimentPool work unchanged on any of them.
+
+- pipeline: the full-precision PyTorch transformers pipeline (default)
+- onnx: the model exported to ONNX and run with ONNX Runtime
+- int8: the ONNX export with dynamically quantized int8 weights
+
+The ONNX files are exported once into ONNX_DIR and reused afterwards.
+Exporting needs torch; running an exported model only needs onnxruntime
+and the tokenizer.
+
+Usage:
+    python -m src.inference_backends --backend int8   # export ahead of time
+"""
+
+import argparse
+import json
+import os
+from src.models import get_model, sentiment_pipeline
+
+BACKENDS = ("pipeline", "onnx", "int8")
+ONNX_DIR = os.getenv("ONNX_DIR", "models/onnx")
+ONNX_OPSET = 14
+MAX_LENGTH = 512  # DistilBERT's position embeddings
+# same model as task2_sentiment_theme.DISTILBERT_MODEL
+DEFAULT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+
+
+def export_dir(model_name: str, onnx_dir: str = ONNX_DIR) -> str:
+    """Directory holding the ONNX files and tokenizer for `model_name`."""
+    return os.path.join(onnx_dir, model_name.replace("/", "--"))
+
+
+def export_onnx(model_name: str, onnx_dir: str = ONNX_DIR) -> str:
+    """
+    Export the model to ONNX (once) with dynamic batch / sequence axes.
+
+    The tokenizer, config and the source revision are saved next to the
+    model so it can be loaded without the Hugging Face cache.
+
+    Returns:
+        str: Path of model.onnx
+    """
+    out_dir = export_dir(model_name, onnx_dir)
+    path = os.path.join(out_dir, "model.onnx")
+    if os.path.exists(path):
+        return path
+    import torch
+    from transformers import (AutoModelForSequenceClassification,
+                              AutoTokenizer)
+
+    print(f"Exporting {model_name} to ONNX (first use)...")
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model.eval()
+    os.makedirs(out_dir, exist_ok=True)
+    tokenizer.save_pretrained(out_dir)
+    model.config.save_pretrained(out_dir)
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    axes = {0: "batch", 1: "sequence"}
+    tmp_path = path + ".tmp"
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"]),
+            tmp_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={"input_ids": axes, "attention_mask": axes,
+                          "logits": {0: "batch"}},
+            opset_version=ONNX_OPSET,
+            dynamo=False,
+        )
+    with open(os.path.join(out_dir, "export.json"), "w",
+              encoding="utf-8") as f:
+        json.dump({"model": model_name,
+                   "revision": getattr(model.config, "_commit_hash", None),
+                   "torch": torch.__version__}, f, indent=2)
+    # model.onnx appears last: its presence marks a complete export
+    os.replace(tmp_path, path)
+    return path
+
+
+def quantize_onnx(model_name: str, onnx_dir: str = ONNX_DIR) -> str:
+    """
+    Dynamically quantize the ONNX export to int8 weights (once).
+    Activations stay float and are quantized per batch at run time.
+
+    Returns:
+        str: Path of model.int8.onnx
+    """
+    path = os.path.join(export_dir(model_name, onnx_dir), "model.int8.onnx")
+    if os.path.exists(path):
+        return path
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    source = export_onnx(model_name, onnx_dir)
+    print(f"Quantizing {source} to int8...")
+    tmp_path = path + ".tmp"
+    quantize_dynamic(source, tmp_path, weight_type=QuantType.QInt8)
+    os.replace(tmp_path, path)
+    return path
+
+
+def export_revision(model_dir: str, default: str = "main") -> str:
+    """Source revision recorded in an ONNX export's export.json."""
+    info_path = os.path.join(model_dir, "export.json")
+    if not os.path.exists(info_path):
+        return default
+    with open(info_path, encoding="utf-8") as f:
+        return json.load(f).get("revision") or default
+
+
+def resolve_revision(backend: str, model_name: str,
+                     onnx_dir: str = ONNX_DIR, default: str = "main") -> str:
+    """
+    Revision (commit hash) of the model `backend` runs, without loading
+    the model: the export's recorded source for the ONNX backends, the
+    config's resolved hash for the pipeline.
+    """
+    if backend != "pipeline":
+        return export_revision(export_dir(model_name, onnx_dir), default)
+    from transformers import AutoConfig
+
+    config = AutoConfig.from_pretrained(model_name)
+    return getattr(config, "_commit_hash", None) or default
+
+
+def prepare_backend(backend: str, model_name: str,
+                    onnx_dir: str = ONNX_DIR):
+    """Create the model files `backend` needs (no-op for the pipeline)."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown sentiment backend {backend!r}; "
+                         f"expected one of {', '.join(BACKENDS)}")
+    if backend == "onnx":
+        export_onnx(model_name, onnx_dir)
+    elif backend == "int8":
+        quantize_onnx(model_name, onnx_dir)
+
+
+class OnnxClassifier:
+    """
+    ONNX Runtime sequence classifier with the pipeline's call interface.
+
+    Args:
+        model_path (str): .onnx file from export_onnx / quantize_onnx
+        threads (int): ONNX Runtime intra-op threads (None = all cores)
+        max_length (int): Longer reviews are truncated, in tokens
+    """
+
+    def __init__(self, model_path: str, threads: int = None,
+                 max_length: int = MAX_LENGTH):
+        import onnxruntime as ort
+        from transformers import AutoConfig, AutoTokenizer
+
+        model_dir = os.path.dirname(model_path)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = (
+            ort.GraphOptimizationLevel.ORT_ENABLE_ALL)
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        # used by token_lengths() for length bucketing
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        config = AutoConfig.from_pretrained(model_dir)
+        self.labels = [config.id2label[i] for i in range(config.num_labels)]
+        self.max_length = max_length
+        self.revision = export_revision(model_dir)
+
+    def __call__(self, texts, truncation=True, max_length=None) -> list:
+        import numpy as np
+
+        if isinstance(texts, str):
+            texts = [texts]
+        enc = self.tokenizer(list(texts), padding=True, truncation=truncation,
+                             max_length=max_length or self.max_length,
+                             return_tensors="np")
+        feeds = {name: enc[name].astype(np.int64)
+                 for name in self.input_names}
+        logits = self.session.run(None, feeds)[0]
+        # softmax, as the text-classification pipeline applies
+        logits = logits - logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+        best = probs.argmax(axis=1)
+        return [{"label": self.labels[i], "score": float(p[i])}
+                for i, p in zip(best, probs)]
+
+
+def load_backend(backend: str, model_name: str, threads: int = None,
+                 onnx_dir: str = ONNX_DIR):
+    """
+    Classifier for `backend`, loaded once per process (src/models.py).
+
+    Args:
+        backend (str): One of BACKENDS
+        model_name (str): Hugging Face model id
+        threads (int): Intra-op threads for the ONNX backends
+    """
+    if backend == "pipeline":
+        return sentiment_pipeline(model_name)
+
+    def load():
+        prepare_backend(backend, model_name, onnx_dir)
+        name = "model.int8.onnx" if backend == "int8" else "model.onnx"
+        return OnnxClassifier(
+            os.path.join(export_dir(model_name, onnx_dir), name), threads)
+
+    return get_model(("sentiment", model_name, backend, threads), load)
+
+
+def cache_model_name(model_name: str, backend: str) -> str:
+    """
+    Model name used in sentiment cache keys. The ONNX backends get their
+    own keys (int8 scores differ slightly); the pipeline keeps the
+    original ones.
+    """
+    return model_name if backend == "pipeline" else f"{model_name}:{backend}"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export a sentiment model for an ONNX backend.")
+    parser.add_argument("--backend", choices=["onnx", "int8"],
+                        default="int8")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--onnx-dir", default=ONNX_DIR)
+    args = parser.parse_args()
+    prepare_backend(args.backend, args.model, args.onnx_dir)
+    print(f"Ready: {export_dir(args.model, args.onnx_dir)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,88 +1,53 @@
 # src/insert_reviews.py
-
-import os
-import pandas as pd
-import psycopg2
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-DB_NAME = os.getenv("DB_NAME")
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_HOST = os.getenv("DB_HOST")
-DB_PORT = os.getenv("DB_PORT")
-
-# Connect to PostgreSQL
-conn = psycopg2.connect(
-    dbname=DB_NAME,
-    user=DB_USER,
-    password=DB_PASSWORD,
-    host=DB_HOST,
-    port=DB_PORT
-)
-cur = conn.cursor()
-
-# Create tables
-cur.execute("""
-CREATE TABLE IF NOT EXISTS banks (
-    bank_id SERIAL PRIMARY KEY,
-    bank_name VARCHAR(100) NOT NULL,
-    app_name VARCHAR(100) NOT NULL
-);
-""")
-
-cur.execute("""
-CREATE TABLE IF NOT EXISTS reviews (
-    review_id SERIAL PRIMARY KEY,
-    bank_id INT REFERENCES banks(bank_id),
-    review_text TEXT,
-    rating INT,
-    review_date DATE,
-    sentiment_label VARCHAR(20),
-    sentiment_score FLOAT,
-    source VARCHAR(50)
-);
-""")
-
-conn.commit()
-
-# Load cleaned CSV
-df = pd.read_csv("data/cleaned/clean_reviews.csv")
-
-# Insert unique banks first
-banks = df[["bank"]].drop_duplicates()
-for _, row in banks.iterrows():
-    cur.execute("""
-    INSERT INTO banks (bank_name, app_name)
-    VALUES (%s, %s)
-    ON CONFLICT (bank_name) DO NOTHING;
-    """, (row["bank"], row["bank"] + " App"))
-
-conn.commit()
-
-# Map bank names to IDs
-cur.execute("SELECT bank_id, bank_name FROM banks;")
-bank_map = {name: id for id, name in cur.fetchall()}
-
-# Insert reviews
-for _, row in df.iterrows():
-    cur.execute("""
-    INSERT INTO reviews (bank_id, review_text, rating, review_date, sentiment_label, sentiment_score, source)
-    VALUES (%s, %s, %s, %s, %s, %s, %s);
-    """, (
-        bank_map[row["bank"]],
-        row["review"],
-        row["rating"],
-        row["date"],
-        row.get("sentiment_label", None),
-        row.get("sentiment_score", None),
-        row["source"]
-    ))
-
-conn.commit()
-cur.close()
-conn.close()
-
-print("All reviews inserted successfully!")
+"""
+Load cleaned reviews into PostgreSQL.
+Uses the bulk COPY loader in src/review_loader.py, so re-runs only add
+reviews that are not stored yet, then folds the new reviews into the
+daily rollup (src/rollups.py) and the search index (src/review_search.py).
+
+Pass the Task-2 output with --input to store sentiment and themes too:
+    python -m src.insert_reviews \
+        --input data/processed/reviews_sentiment_themes.csv
+"""
+
+import argparse
+from src.db import get_connection
+from src.instrumentation import run_report, stage
+from src.review_loader import INPUT_CLEAN, load_reviews
+from src.review_search import update_search_index
+from src.rollups import update_rollups
+
+
+def main(input_path: str = INPUT_CLEAN):
+    """Load `input_path` (cleaned reviews by default) into `reviews`."""
+    conn = get_connection()
+    try:
+        with stage("load_reviews") as st:
+            stats = load_reviews(conn, input_path)
+            st.rows_in = stats["rows_read"]
+            st.rows_out = stats["rows_inserted"]
+        with stage("rollups") as st:
+            rolled_up = update_rollups(conn)
+            conn.commit()
+            st.rows_in = rolled_up
+        with stage("search_index") as st:
+            st.rows_in = update_search_index(conn)
+            conn.commit()
+    finally:
+        conn.close()
+
+    print(f"All reviews inserted successfully! "
+          f"({stats['rows_inserted']} new of {stats['rows_read']})")
+    if stats["rows_rejected"]:
+        print(f"Rejected {stats['rows_rejected']} rows without a valid "
+              f"bank or date.")
+    print(f"Rollup updated with {rolled_up} reviews.")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--input", default=INPUT_CLEAN,
+                            help="reviews CSV (or its Parquet copy) to load")
+    args = arg_parser.parse_args()
+    with run_report("insert_reviews"):
+        main(args.input)
@@ -0,0 +1,340 @@
+# src/instrumentation.py
+"""
+Stage-level instrumentation shared by the pipeline scripts.
+
+A script wraps its run in `run_report("name")` and its steps in
+`stage("step")` blocks (or `@timed()` functions). Every stage records
+wall and CPU time, rows in / rows out, and the peak resident memory
+sampled while it ran (one sampler thread serves the whole run);
+repeated stages (e.g. one per chunk) are summed.
+A stage opened inside another one is also subtracted from its parent's
+exclusive time, so the shares of run time add up to at most 100% (per
+thread).
+With PIPELINE_PROFILE=1 each stage also runs under cProfile and the
+report lists its most expensive functions next to a .prof dump.
+
+At the end of the run a JSON report is written to data/reports/, e.g.
+data/reports/preprocess_20240101-120000.json, so runs can be compared.
+Outside a run_report block, stage() and @timed() are no-ops.
+"""
+
+import cProfile
+import functools
+import json
+import os
+import platform
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+REPORT_DIR = os.getenv("PIPELINE_REPORT_DIR", "data/reports")
+PROFILE = os.getenv("PIPELINE_PROFILE", "0") == "1"
+RSS_SAMPLE_SECONDS = 0.05
+PROFILE_TOP_N = 15  # functions listed per profiled stage
+
+_current = None
+
+
+def current_rss_bytes():
+    """Resident set size of this process now (Linux /proc), or None."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process so far, or None."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _mb(n_bytes):
+    return None if n_bytes is None else round(n_bytes / 2 ** 20, 1)
+
+
+class _RssMark:
+    """Peak RSS seen while one stage runs (see _RssSampler.start_mark)."""
+
+    __slots__ = ("peak",)
+
+    def __init__(self, peak):
+        self.peak = peak
+
+
+class _RssSampler:
+    """
+    One background thread per run, sampling RSS for every open mark. A
+    stage opens a mark when it starts and reads its peak when it ends,
+    so stages called per chunk or per batch do not start threads.
+    """
+
+    def __init__(self, interval=RSS_SAMPLE_SECONDS):
+        self.interval = interval
+        self._marks = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        if current_rss_bytes() is not None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self):
+        rss = current_rss_bytes()
+        if rss is None:
+            return
+        with self._lock:
+            for mark in self._marks:
+                if rss > mark.peak:
+                    mark.peak = rss
+
+    def start_mark(self):
+        """Start tracking a peak from the current RSS."""
+        mark = _RssMark(current_rss_bytes())
+        if mark.peak is not None:
+            with self._lock:
+                self._marks.add(mark)
+        return mark
+
+    def end_mark(self, mark):
+        """Stop tracking `mark`; return its peak RSS in bytes, or None."""
+        if mark.peak is None:
+            return None
+        self._sample()
+        with self._lock:
+            self._marks.discard(mark)
+        return mark.peak
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+
+class Stage:
+    """Handle yielded by stage(); set rows_in / rows_out on it."""
+
+    def __init__(self, rows_in=None):
+        self.rows_in = rows_in
+        self.rows_out = None
+
+
+class RunReport:
+    """
+    Collects stage metrics for one script run and writes them as JSON.
+
+    Args:
+        script (str): Name of the script, used in the report file name
+        profile (bool): Run every stage under cProfile
+        report_dir (str): Folder for the JSON report and .prof files
+    """
+
+    def __init__(self, script, profile=PROFILE, report_dir=REPORT_DIR):
+        self.script = script
+        self.profile = profile
+        self.report_dir = report_dir
+        self.started = datetime.now()
+        self.run_id = f"{script}_{self.started:%Y%m%d-%H%M%S}"
+        self.status = "running"
+        self.stages = {}
+        self._start = time.perf_counter()
+        self._profilers = {}
+        self._profiling = False
+        self._lock = threading.Lock()
+        self._local = threading.local()  # per-thread stack of open stages
+        self._sampler = _RssSampler()
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """Time a block; stages with the same name are accumulated."""
+        handle = Stage(rows_in)
+        mark = self._sampler.start_mark()
+        profiler = None
+        with self._lock:
+            # cProfile cannot nest: only the outermost stage is profiled
+            if self.profile and not self._profiling:
+                profiler = self._profilers.setdefault(name, cProfile.Profile())
+                self._profiling = True
+        open_stages = getattr(self._local, "stack", None)
+        if open_stages is None:
+            open_stages = self._local.stack = []
+        nested = {"seconds": 0.0}  # wall time of stages opened inside
+        open_stages.append(nested)
+        wall, cpu = time.perf_counter(), time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield handle
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            peak = self._sampler.end_mark(mark)
+            open_stages.pop()
+            if open_stages:
+                open_stages[-1]["seconds"] += wall
+            with self._lock:
+                if profiler is not None:
+                    self._profiling = False
+                self._record(name, handle, wall, wall - nested["seconds"],
+                             cpu, peak)
+
+    def _record(self, name, handle, wall, exclusive, cpu, peak):
+        entry = self.stages.setdefault(name, {
+            "calls": 0, "seconds": 0.0, "exclusive_seconds": 0.0,
+            "cpu_seconds": 0.0, "rows_in": None, "rows_out": None,
+            "peak_rss_mb": None,
+        })
+        entry["calls"] += 1
+        entry["seconds"] += wall
+        entry["exclusive_seconds"] += exclusive
+        entry["cpu_seconds"] += cpu
+        for key in ("rows_in", "rows_out"):
+            value = getattr(handle, key)
+            if value is not None:
+                entry[key] = (entry[key] or 0) + int(value)
+        peak_mb = _mb(peak)
+        if peak_mb is not None:
+            entry["peak_rss_mb"] = max(entry["peak_rss_mb"] or 0, peak_mb)
+
+    def _profile_summary(self, name, profiler):
+        """Dump a stage's profile and return its top functions."""
+        path = os.path.join(self.report_dir, self.run_id, f"{name}.prof")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        profiler.dump_stats(path)
+        stats = pstats.Stats(profiler).stats
+        top = sorted(stats.items(), key=lambda kv: kv[1][3], reverse=True)
+        return {
+            "path": path,
+            "top_cumulative": [
+                {"function": f"{fn[0]}:{fn[1]}({fn[2]})",
+                 "calls": s[1], "cumulative_seconds": round(s[3], 4)}
+                for fn, s in top[:PROFILE_TOP_N]
+            ],
+        }
+
+    def to_dict(self) -> dict:
+        seconds = time.perf_counter() - self._start
+        stages = []
+        for name, entry in self.stages.items():
+            entry = dict(entry)
+            entry["seconds"] = round(entry["seconds"], 4)
+            entry["exclusive_seconds"] = round(entry["exclusive_seconds"], 4)
+            entry["cpu_seconds"] = round(entry["cpu_seconds"], 4)
+            rows = entry["rows_in"] or entry["rows_out"]
+            entry["rows_per_sec"] = (round(rows / entry["seconds"], 1)
+                                     if rows and entry["seconds"] > 0
+                                     else None)
+            # exclusive time, so nested stages are not counted twice
+            entry["share_of_run"] = (
+                round(entry["exclusive_seconds"] / seconds, 4)
+                if seconds > 0 else None)
+            if name in self._profilers:
+                entry["profile"] = self._profile_summary(
+                    name, self._profilers[name])
+            stages.append({"stage": name, **entry})
+        return {
+            "script": self.script,
+            "run_id": self.run_id,
+            "status": self.status,
+            "started_at": self.started.isoformat(timespec="seconds"),
+            "seconds": round(seconds, 4),
+            "peak_rss_mb": _mb(peak_rss_bytes()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "stages": stages,
+        }
+
+    def close(self):
+        """Stop the RSS sampler thread."""
+        self._sampler.stop()
+
+    def write(self) -> str:
+        """Write the JSON report; return its path."""
+        os.makedirs(self.report_dir, exist_ok=True)
+        path = os.path.join(self.report_dir, self.run_id + ".json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+
+@contextmanager
+def run_report(script, profile=PROFILE, report_dir=REPORT_DIR):
+    """
+    Collect stage metrics for the enclosed run and write the JSON report
+    when it ends, also when it fails (status "failed").
+    """
+    global _current
+    previous = _current
+    report = RunReport(script, profile=profile, report_dir=report_dir)
+    _current = report
+    try:
+        yield report
+        report.status = "ok"
+    except BaseException:
+        report.status = "failed"
+        raise
+    finally:
+        _current = previous
+        report.close()
+        print(f"Run report: {report.write()}")
+
+
+@contextmanager
+def stage(name, rows_in=None):
+    """Time a block as a stage of the current run (no-op outside one)."""
+    if _current is None:
+        yield Stage(rows_in)
+        return
+    with _current.stage(name, rows_in) as handle:
+        yield handle
+
+
+def _n_rows(value):
+    if isinstance(value, tuple) and value:
+        value = value[0]
+    if isinstance(value, (str, bytes)):
+        return None
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+
+def timed(name=None):
+    """
+    Decorator: run the function as a stage. rows_in / rows_out are the
+    lengths of the first argument and of the result (or of its first
+    item for tuples), when they have one.
+    """
+    def decorator(fn):
+        stage_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            rows_in = _n_rows(args[0]) if args else None
+            with stage(stage_name, rows_in) as handle:
+                result = fn(*args, **kwargs)
+                handle.rows_out = _n_rows(result)
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,276 @@
+# src/keyword_engine.py
+"""
+Corpus-wide TF-IDF keyword engine.
+
+The corpus is tokenized once into a single sparse document-term count
+matrix (unigrams + bigrams, one row per review) that is persisted with
+its vocabulary and per-review metadata (bank, rating, date). Vocabulary
+and IDF are therefore shared by all banks. Top keywords per bank, month
+or rating are row-group sums of the TF-IDF matrix, computed with one
+sparse product instead of refitting a vectorizer per group.
+
+New reviews are appended as new rows: their unseen terms extend the
+vocabulary and document frequencies are recounted from the matrix, so
+the result equals a full rebuild without re-tokenizing the old reviews.
+Appended chunks are stacked once, when the matrix is next read, so
+adding n chunks costs O(n) rather than re-copying the matrix per chunk.
+
+Usage:
+    python -m src.keyword_engine --add data/processed/new_reviews.csv
+    python -m src.keyword_engine --by month --top-n 15
+"""
+
+import argparse
+import json
+import os
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from src.instrumentation import timed
+
+INDEX_DIR = "data/processed/keyword_index"
+NGRAM_RANGE = (1, 2)
+MAX_FEATURES = 2000  # terms kept for TF-IDF, by corpus frequency
+META_COLUMNS = ["bank", "rating", "date"]
+
+
+def preprocess_for_tfidf(texts) -> list:
+    """Minimal preprocess: lowercase & remove extra spaces."""
+    return [str(t).lower().strip() for t in texts]
+
+
+class KeywordIndex:
+    """
+    Sparse document-term counts of the review corpus plus row metadata.
+
+    Args:
+        ngram_range (tuple): Token n-gram sizes to count
+    """
+
+    def __init__(self, ngram_range=NGRAM_RANGE):
+        self.ngram_range = tuple(ngram_range)
+        self.terms = []
+        self.vocabulary = {}
+        self._counts = sp.csr_matrix((0, 0), dtype=np.int64)
+        self._meta = pd.DataFrame(columns=META_COLUMNS)
+        # chunks added since the matrix was last stacked
+        self._pending = []
+        self._pending_meta = []
+
+    def __len__(self):
+        return self._counts.shape[0] + sum(m.shape[0] for m in self._pending)
+
+    def _consolidate(self):
+        """Stack pending chunks onto the matrix, widened to the vocabulary."""
+        if not self._pending:
+            return
+        blocks = [self._counts] + self._pending
+        for block in blocks:
+            block.resize((block.shape[0], len(self.terms)))
+        self._counts = sp.vstack(blocks, format="csr")
+        frames = [m for m in [self._meta] + self._pending_meta if len(m)]
+        self._meta = (pd.concat(frames, ignore_index=True) if frames
+                      else self._pending_meta[-1])
+        self._pending = []
+        self._pending_meta = []
+
+    @property
+    def counts(self) -> sp.csr_matrix:
+        """Document-term counts, one row per added document."""
+        self._consolidate()
+        return self._counts
+
+    @counts.setter
+    def counts(self, value):
+        self._consolidate()
+        self._counts = value
+
+    @property
+    def meta(self) -> pd.DataFrame:
+        """Row metadata (bank, rating, date) aligned with `counts`."""
+        self._consolidate()
+        return self._meta
+
+    @meta.setter
+    def meta(self, value):
+        self._consolidate()
+        self._meta = value
+
+    def add(self, texts, meta: pd.DataFrame = None):
+        """
+        Append documents. Unseen terms get new columns; existing rows are
+        not touched.
+
+        Args:
+            texts (iterable): Review texts
+            meta (pd.DataFrame): Row metadata aligned with `texts`
+                (any of bank, rating, date)
+        """
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        texts = preprocess_for_tfidf(texts)
+        if meta is None:
+            meta = pd.DataFrame(index=range(len(texts)))
+        meta = meta.reset_index(drop=True).reindex(columns=META_COLUMNS)
+
+        vectorizer = CountVectorizer(ngram_range=self.ngram_range,
+                                     dtype=np.int64)
+        try:
+            local = vectorizer.fit_transform(texts).tocsr()
+            local_terms = vectorizer.get_feature_names_out()
+        except ValueError:  # no tokens at all in this batch
+            local = sp.csr_matrix((len(texts), 0), dtype=np.int64)
+            local_terms = []
+
+        # map the batch's columns onto the global vocabulary
+        column = np.empty(len(local_terms), dtype=np.int64)
+        for j, term in enumerate(local_terms):
+            idx = self.vocabulary.get(term)
+            if idx is None:
+                idx = len(self.terms)
+                self.vocabulary[term] = idx
+                self.terms.append(term)
+            column[j] = idx
+
+        self._pending.append(sp.csr_matrix(
+            (local.data, column[local.indices], local.indptr),
+            shape=(len(texts), len(self.terms)),
+        ))
+        self._pending_meta.append(meta)
+
+    def truncate(self, n_rows: int):
+        """Keep only the first `n_rows` documents (used on resume)."""
+        self.counts = self.counts[:n_rows]
+        self.meta = self.meta.iloc[:n_rows].reset_index(drop=True)
+
+    def tfidf(self, max_features: int = MAX_FEATURES):
+        """
+        L2-normalized TF-IDF rows over the `max_features` most frequent
+        terms, as TfidfVectorizer(max_features=...) fitted on the corpus.
+
+        Returns:
+            tuple: (csr TF-IDF matrix, list of its terms)
+        """
+        counts = self.counts.tocsc()
+        term_freq = np.asarray(counts.sum(axis=0)).ravel()
+        terms = np.asarray(self.terms, dtype=str)
+        # most frequent first, ties broken alphabetically; then keep the
+        # selected columns in alphabetical order like the vectorizer
+        order = np.lexsort((terms, -term_freq))[:max_features]
+        keep = order[np.argsort(terms[order])]
+        counts = counts[:, keep].tocsr()
+
+        n_docs = counts.shape[0]
+        doc_freq = np.bincount(counts.indices, minlength=counts.shape[1])
+        idf = np.log((1 + n_docs) / (1 + doc_freq)) + 1
+        weights = counts.multiply(idf).tocsr().astype(np.float64)
+        norms = np.sqrt(np.asarray(weights.multiply(weights).sum(axis=1)))
+        norms[norms == 0] = 1.0
+        weights = sp.csr_matrix(weights.multiply(1 / norms))
+        return weights, terms[keep].tolist()
+
+    def group_keys(self, by: str) -> pd.Series:
+        """Per-row group key; `month` is derived from the date column."""
+        if by == "month":
+            return pd.to_datetime(self.meta["date"]).dt.to_period("M")
+        return self.meta[by]
+
+    def top_keywords(self, by: str = "bank", top_n: int = 20,
+                     max_features: int = MAX_FEATURES) -> pd.DataFrame:
+        """
+        Top TF-IDF keywords per group.
+
+        Args:
+            by (str): bank, rating or month
+            top_n (int): Keywords per group
+            max_features (int): Vocabulary size used for TF-IDF
+
+        Returns:
+            pd.DataFrame: `by` and top_keywords ("; "-joined)
+        """
+        weights, terms = self.tfidf(max_features)
+        codes, groups = pd.factorize(self.group_keys(by), sort=True)
+        rows = np.flatnonzero(codes >= 0)
+        # (groups x docs) indicator times (docs x terms) = per-group sums
+        indicator = sp.csr_matrix(
+            (np.ones(len(rows)), (codes[rows], rows)),
+            shape=(len(groups), weights.shape[0]),
+        )
+        sums = (indicator @ weights).toarray()
+
+        keywords_rows = []
+        for g, group in enumerate(groups):
+            top = sums[g].argsort()[::-1][:top_n]
+            top_kw = [terms[i] for i in top if sums[g, i] > 0]
+            keywords_rows.append({by: group,
+                                  "top_keywords": "; ".join(top_kw)})
+        return pd.DataFrame(keywords_rows, columns=[by, "top_keywords"])
+
+    def save(self, path: str = INDEX_DIR):
+        """Persist counts (npz), vocabulary (json) and metadata (parquet)."""
+        os.makedirs(path, exist_ok=True)
+        sp.save_npz(os.path.join(path, "counts.npz"), self.counts)
+        with open(os.path.join(path, "vocabulary.json"), "w",
+                  encoding="utf-8") as f:
+            json.dump({"ngram_range": self.ngram_range, "terms": self.terms},
+                      f)
+        meta = self.meta.copy()
+        meta["bank"] = meta["bank"].astype("string")
+        meta["rating"] = pd.to_numeric(meta["rating"]).astype("Int8")
+        meta["date"] = pd.to_datetime(meta["date"])
+        meta.to_parquet(os.path.join(path, "meta.parquet"), index=False)
+
+    @classmethod
+    def load(cls, path: str = INDEX_DIR) -> "KeywordIndex":
+        with open(os.path.join(path, "vocabulary.json"),
+                  encoding="utf-8") as f:
+            vocab = json.load(f)
+        index = cls(vocab["ngram_range"])
+        index.terms = vocab["terms"]
+        index.vocabulary = {t: i for i, t in enumerate(index.terms)}
+        index.counts = sp.load_npz(os.path.join(path, "counts.npz")).tocsr()
+        index.meta = pd.read_parquet(os.path.join(path, "meta.parquet"))
+        return index
+
+
+@timed()
+def build_index(df: pd.DataFrame) -> KeywordIndex:
+    """Tokenize a reviews frame (review + metadata columns) once."""
+    index = KeywordIndex()
+    index.add(df["review"], df.reindex(columns=META_COLUMNS))
+    return index
+
+
+def update_index(df: pd.DataFrame, path: str = INDEX_DIR) -> KeywordIndex:
+    """Append new reviews to the persisted index (created if missing)."""
+    if os.path.exists(os.path.join(path, "counts.npz")):
+        index = KeywordIndex.load(path)
+    else:
+        index = KeywordIndex()
+    index.add(df["review"], df.reindex(columns=META_COLUMNS))
+    index.save(path)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Review keyword engine.")
+    parser.add_argument("--add", help="CSV/Parquet of new reviews to append")
+    parser.add_argument("--by", default="bank",
+                        choices=["bank", "rating", "month"])
+    parser.add_argument("--top-n", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.add:
+        from src.storage import read_reviews
+
+        new = read_reviews(args.add, columns=["review"] + META_COLUMNS)
+        index = update_index(new)
+        print(f"Appended {len(new)} reviews ({len(index)} indexed, "
+              f"{len(index.terms)} terms)")
+    else:
+        index = KeywordIndex.load()
+    print(index.top_keywords(args.by, args.top_n).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# src/langid.py
+"""
+Shared language identification for preprocess and Task-2.
+
+Wraps langdetect with:
+- a batch API that detects each distinct text once,
+- a process-wide memo cache keyed by a hash of the text,
+- a fast path for short ASCII-only texts made mostly of common English
+  words (langdetect is slow and unreliable on very short inputs),
+- an optional process-parallel mode for large batches.
+"""
+
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from langdetect import detect, DetectorFactory
+from langdetect.lang_detect_exception import LangDetectException
+
+DetectorFactory.seed = 0  # Ensure consistent language detection results
+
+UNKNOWN = "unknown"
+FAST_PATH_MAX_CHARS = 80
+FAST_PATH_MIN_RATIO = 0.5  # share of words that must be common English
+MEMO_MAX_ENTRIES = 1000000
+PARALLEL_CHUNK = 2000  # texts per task in parallel mode
+
+ENGLISH_HINTS = frozenset("""
+a about after again all also am an and any app application are as at bad
+bank banking be best but by can cannot can't could did do does doesn't don't
+easy error excellent fast fix for from good great has have help i i'm if in
+is it it's just like love me money more my need nice no not now of ok on one
+or please problem really service slow so some that the this to too update
+use useful very was we what when why will with work working works worst you
+your
+""".split())
+
+_memo = {}
+
+
+def _key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def _fast_path(text: str):
+    """Return "en" for short ASCII texts of mostly common English words."""
+    if len(text) > FAST_PATH_MAX_CHARS or not text.isascii():
+        return None
+    words = [w.strip(".,!?;:()\"'").lower() for w in text.split()]
+    words = [w for w in words if w]
+    if not words:
+        return None
+    hits = sum(w in ENGLISH_HINTS for w in words)
+    return "en" if hits / len(words) >= FAST_PATH_MIN_RATIO else None
+
+
+def _detect_uncached(text: str) -> str:
+    fast = _fast_path(text)
+    if fast:
+        return fast
+    try:
+        return detect(text)
+    except LangDetectException:
+        return UNKNOWN
+
+
+def detect_language(text) -> str:
+    """Language code of `text` (e.g. "en"), or "unknown"."""
+    return detect_languages([text])[0]
+
+
+def detect_languages(texts, n_jobs: int = 1) -> list:
+    """
+    Detect the language of many texts.
+
+    Args:
+        texts (iterable): Texts to classify
+        n_jobs (int): Worker processes for texts not in the memo cache
+
+    Returns:
+        list: One language code per text, "unknown" when undetectable
+    """
+    texts = [str(t) for t in texts]
+    keys = [_key(t) for t in texts]
+
+    found = {}
+    todo = {}
+    for k, t in zip(keys, texts):
+        if k in _memo:
+            found[k] = _memo[k]
+        elif k not in todo:
+            todo[k] = t
+
+    if todo:
+        pending = list(todo.values())
+        if n_jobs > 1 and len(pending) > PARALLEL_CHUNK:
+            with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+                langs = list(pool.map(_detect_uncached, pending,
+                                      chunksize=PARALLEL_CHUNK))
+        else:
+            langs = [_detect_uncached(t) for t in pending]
+        new = dict(zip(todo, langs))
+        if len(_memo) + len(new) > MEMO_MAX_ENTRIES:
+            _memo.clear()
+        _memo.update(new)
+        found.update(new)
+
+    return [found[k] for k in keys]
+
+
+def is_english(text) -> bool:
+    """Return True if text is detected as English, else False."""
+    return detect_language(text) == "en"
@@ -0,0 +1,104 @@
+# src/migrate.py
+"""
+Apply the versioned SQL migrations in migrations/ to PostgreSQL.
+
+Each migrations/NNN_name.sql file runs once, inside its own transaction,
+and is recorded in the schema_migrations table. Re-running only applies
+files that are new since the last run.
+
+Usage:
+    python -m src.migrate            # apply pending migrations
+    python -m src.migrate --status   # list applied / pending migrations
+"""
+
+import argparse
+import glob
+import os
+from src.db import get_connection
+
+MIGRATIONS_DIR = "migrations"
+
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version VARCHAR(255) PRIMARY KEY,
+    applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+"""
+
+
+def list_migrations(directory: str = MIGRATIONS_DIR) -> list:
+    """Return (version, path) pairs sorted by version, e.g. ("001_x", ...)."""
+    paths = sorted(glob.glob(os.path.join(directory, "*.sql")))
+    return [(os.path.splitext(os.path.basename(p))[0], p) for p in paths]
+
+
+def applied_versions(conn) -> set:
+    """Versions already recorded in schema_migrations."""
+    cur = conn.cursor()
+    cur.execute(CREATE_TABLE_SQL)
+    cur.execute("SELECT version FROM schema_migrations;")
+    versions = {row[0] for row in cur.fetchall()}
+    conn.commit()
+    cur.close()
+    return versions
+
+
+def apply_migrations(conn, directory: str = MIGRATIONS_DIR) -> list:
+    """
+    Apply every pending migration in version order.
+
+    Args:
+        conn: Open psycopg2 connection
+        directory (str): Folder holding the NNN_name.sql files
+
+    Returns:
+        list: Versions applied by this call
+    """
+    done = applied_versions(conn)
+    applied = []
+    for version, path in list_migrations(directory):
+        if version in done:
+            continue
+        with open(path, encoding="utf-8") as f:
+            sql = f.read()
+        cur = conn.cursor()
+        try:
+            cur.execute(sql)
+            cur.execute(
+                "INSERT INTO schema_migrations (version) VALUES (%s);",
+                (version,),
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+        print(f"Applied migration {version}")
+        applied.append(version)
+    return applied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply schema migrations.")
+    parser.add_argument("--status", action="store_true",
+                        help="list applied and pending migrations only")
+    args = parser.parse_args()
+
+    conn = get_connection()
+    try:
+        if args.status:
+            done = applied_versions(conn)
+            for version, _ in list_migrations():
+                state = "applied" if version in done else "pending"
+                print(f"{version}: {state}")
+        else:
+            applied = apply_migrations(conn)
+            if not applied:
+                print("Schema is up to date.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
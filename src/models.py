@@ -0,0 +1,55 @@
+# src/models.py
+"""
+Lazy, process-wide registry for heavy NLP models.
+
+Models (and the libraries that provide them) are only imported and loaded
+the first time they are requested; later requests in the same process
+share the loaded instance. Importing this module is cheap.
+"""
+
+import threading
+
+_models = {}
+_lock = threading.Lock()
+
+
+def get_model(key, loader):
+    """
+    Return the model registered under `key`, loading it on first use.
+
+    Args:
+        key (hashable): Registry key, e.g. ("sentiment", model_name)
+        loader (callable): Zero-argument function that loads the model
+
+    Returns:
+        object: The shared model instance
+    """
+    model = _models.get(key)
+    if model is None:
+        with _lock:
+            model = _models.get(key)
+            if model is None:
+                model = loader()
+                _models[key] = model
+    return model
+
+
+def sentiment_pipeline(model_name: str):
+    """Shared transformers sentiment-analysis pipeline for `model_name`."""
+    def load():
+        from transformers import pipeline
+        # This will download model weights first time if not cached
+        return pipeline("sentiment-analysis", model=model_name)
+
+    return get_model(("sentiment", model_name), load)
+
+
+def loaded_models() -> list:
+    """Keys of the models loaded so far in this process."""
+    return list(_models)
+
+
+def clear_models():
+    """Drop every loaded model (frees memory; next use reloads)."""
+    with _lock:
+        _models.clear()
@@ -0,0 +1,166 @@
+# src/near_duplicates.py
+"""
+Near-duplicate review detection with shingling + MinHash + LSH banding.
+
+Reviews are normalized (lowercase, punctuation/emoji removed, whitespace
+collapsed), cut into character shingles and summarized by MinHash
+signatures. LSH banding only compares reviews that share a band bucket,
+so the cost grows roughly linearly with the corpus instead of with the
+number of pairs. Candidate pairs are confirmed when their signature
+agreement (an estimate of Jaccard similarity) reaches the threshold.
+"""
+
+import re
+import numpy as np
+
+NUM_PERM = 64
+SHINGLE_SIZE = 5  # characters (bytes of the UTF-8 text) per shingle
+CHUNK_SIZE = 20000  # reviews hashed per vectorized chunk
+SHIFT32 = np.uint64(32)
+MASK32 = np.uint64(0xFFFFFFFF)
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+
+
+def normalize_for_dedup(text) -> str:
+    """Lowercase, drop punctuation/emoji and collapse whitespace."""
+    text = _NON_WORD.sub(" ", str(text).lower())
+    return " ".join(text.split())
+
+
+def _shingle_hashes(texts: list, k: int):
+    """
+    Hash every k-byte shingle of every text in one vectorized pass.
+
+    Returns:
+        tuple: (32-bit shingle hashes, start offset of each text's shingles)
+    """
+    encoded = [t.encode("utf-8").ljust(k) for t in texts]
+    lengths = np.fromiter((len(e) for e in encoded), dtype=np.int64,
+                          count=len(encoded))
+    buf = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+
+    # rolling polynomial hash of every k-byte window of the joined buffer
+    n_windows = len(buf) - k + 1
+    hashes = np.zeros(n_windows, dtype=np.uint64)
+    for j in range(k):
+        hashes = ((hashes * np.uint64(257)) + buf[j:j + n_windows]) & MASK32
+
+    # keep only windows that lie inside a single text
+    n_grams = lengths - k + 1
+    text_starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    gram_starts = np.concatenate(([0], np.cumsum(n_grams)[:-1]))
+    within = np.arange(n_grams.sum()) - np.repeat(gram_starts, n_grams)
+    windows = np.repeat(text_starts, n_grams) + within
+    return hashes[windows], gram_starts
+
+
+def minhash_signatures(texts, num_perm: int = NUM_PERM,
+                       shingle_size: int = SHINGLE_SIZE,
+                       seed: int = 0) -> np.ndarray:
+    """
+    MinHash signature of each (already normalized) text.
+
+    Returns:
+        np.ndarray: uint32 array of shape (len(texts), num_perm)
+    """
+    texts = list(texts)
+    rng = np.random.default_rng(seed)
+    # multiply-shift hashing: (a * x + b) mod 2**64, keep the high 32 bits
+    a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint32)
+    for start in range(0, len(texts), CHUNK_SIZE):
+        chunk = texts[start:start + CHUNK_SIZE]
+        grams, offsets = _shingle_hashes(chunk, shingle_size)
+        for p in range(num_perm):
+            permuted = (a[p] * grams + b[p]) >> SHIFT32
+            signatures[start:start + len(chunk), p] = np.minimum.reduceat(
+                permuted, offsets)
+    return signatures
+
+
+def choose_bands(num_perm: int, threshold: float) -> int:
+    """
+    Number of LSH bands whose S-curve midpoint (1/b)^(1/r) is closest to,
+    but not above, the similarity threshold.
+    """
+    best, best_gap = 1, None
+    for bands in range(1, num_perm + 1):
+        if num_perm % bands:
+            continue
+        rows = num_perm // bands
+        midpoint = (1 / bands) ** (1 / rows)
+        if midpoint > threshold:
+            continue
+        gap = threshold - midpoint
+        if best_gap is None or gap < best_gap:
+            best, best_gap = bands, gap
+    return best
+
+
+def find_near_duplicates(texts, threshold: float = 0.85,
+                         num_perm: int = NUM_PERM,
+                         shingle_size: int = SHINGLE_SIZE,
+                         seed: int = 0) -> np.ndarray:
+    """
+    Group near-duplicate texts into clusters.
+
+    Args:
+        texts (iterable): Review texts
+        threshold (float): Minimum estimated Jaccard similarity of shingles
+        num_perm (int): MinHash permutations (signature length)
+        shingle_size (int): Shingle length in bytes
+        seed (int): Seed for the hash permutations
+
+    Returns:
+        np.ndarray: For each text, the position of the first text of its
+            cluster (a text that is nobody's duplicate points to itself).
+            Texts that are empty after normalization (e.g. emoji only)
+            are never grouped.
+    """
+    normalized = [normalize_for_dedup(t) for t in texts]
+    n = len(normalized)
+    parent = list(range(n))
+    # signature row -> text position, for the texts with something to compare
+    positions = np.flatnonzero(np.fromiter(map(bool, normalized), dtype=bool,
+                                           count=n))
+    if len(positions) < 2:
+        return np.arange(n, dtype=np.int64)
+    sig = minhash_signatures([normalized[i] for i in positions],
+                             num_perm, shingle_size, seed)
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i, j):
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            # the earliest review stays the cluster representative
+            parent[max(ri, rj)] = min(ri, rj)
+
+    bands = choose_bands(num_perm, threshold)
+    rows = num_perm // bands
+    for band in range(bands):
+        block = np.ascontiguousarray(sig[:, band * rows:(band + 1) * rows])
+        keys = block.view(np.dtype((np.void, block.dtype.itemsize * rows)))
+        _, bucket = np.unique(keys.ravel(), return_inverse=True)
+        bucket = bucket.ravel()
+        # only buckets holding two or more reviews produce candidates
+        shared = np.flatnonzero(np.bincount(bucket)[bucket] > 1)
+        if len(shared) == 0:
+            continue
+        order = shared[np.argsort(bucket[shared], kind="stable")]
+        bounds = np.flatnonzero(np.diff(bucket[order])) + 1
+        for group in np.split(order, bounds):
+            # compare every member with the bucket's first review only
+            rep = group[0]
+            agreement = (sig[group[1:]] == sig[rep]).mean(axis=1)
+            for member in group[1:][agreement >= threshold]:
+                union(positions[rep], positions[member])
+
+    return np.array([find(i) for i in range(n)], dtype=np.int64)
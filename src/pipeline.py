@@ -0,0 +1,543 @@
+# src/pipeline.py
+"""
+End-to-end pipeline: scrape -> preprocess -> task2 -> insert_reviews and
+task4 (the last two run concurrently), as one dependency graph.
+
+Each stage runs its script (python -m src.<module>) in a subprocess, so
+every stage still writes its own run report. Before a stage runs, its
+fingerprint is computed from the content of its input files, its source
+code (the module and every src module it imports, found by parsing the
+imports) and its parameters (model, backend, cluster count, target
+database, ...):
+
+- same fingerprint as the last run and outputs untouched -> skipped
+- fingerprint seen before (outputs kept in PIPELINE_CACHE_DIR) -> the
+  outputs are restored from the cache instead of recomputed
+- otherwise the stage runs and its outputs are stored under the new
+  fingerprint
+
+Because downstream inputs are upstream outputs, a stage reruns exactly
+when something it reads changed. insert_reviews writes no files; its
+output is the state of the reviews table (row count and last review_id),
+so an emptied or replaced database loads again. Scraping depends on the
+Play Store, not on local files, so it only runs with --scrape (or when
+there is no raw data yet).
+
+Usage:
+    python -m src.pipeline                  # run what changed
+    python -m src.pipeline --scrape --incremental
+    python -m src.pipeline --dry-run
+    python -m src.pipeline --force task2 --skip insert_reviews
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from src import preprocess, scrape_reviews, task4_insights
+from src import task2_sentiment_theme
+from src.instrumentation import run_report, stage
+from src.storage import parquet_path
+from src.theme_discovery import N_CLUSTERS
+
+STATE_PATH = os.getenv("PIPELINE_STATE", "data/pipeline/state.json")
+CACHE_DIR = os.getenv("PIPELINE_CACHE_DIR", "data/pipeline/cache")
+CACHE_KEEP = int(os.getenv("PIPELINE_CACHE_KEEP", "3"))  # per stage
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "2"))
+HASH_BLOCK = 1 << 20  # bytes read per update when hashing files
+
+REVIEWS_OUT = task2_sentiment_theme.OUT_REVIEWS
+
+
+def build_stages(scrape_args=(), task2_args=()) -> dict:
+    """
+    The pipeline graph: stage name -> spec dict.
+
+    A spec lists the module to run and its arguments, the stages it
+    depends on, the files it reads (inputs), its own source files (code:
+    the module's import closure plus any extra files listed here), the
+    parameters that change its results (params), the files or directories
+    it writes (outputs) and, for a stage writing elsewhere, a probe
+    returning the state of what it writes.
+    """
+    from src.db import connection_params
+
+    raw = scrape_reviews.RAW_CSV
+    clean = preprocess.CLEANED_FILE
+    t2 = task2_sentiment_theme
+    db = connection_params()
+    stages = {
+        "scrape": {
+            "module": "src.scrape_reviews",
+            "args": list(scrape_args),
+            "deps": [],
+            "inputs": [scrape_reviews.APPS_CONFIG],
+            "code": [],
+            "params": {"args": list(scrape_args)},
+            "outputs": [raw, parquet_path(raw)],
+            # the source is the Play Store: only run when asked to
+            "on_request": True,
+        },
+        "preprocess": {
+            "module": "src.preprocess",
+            "args": [],
+            "deps": ["scrape"],
+            "inputs": [raw, parquet_path(raw)],
+            "code": [],
+            "params": {"near_dup_threshold": preprocess.NEAR_DUP_THRESHOLD},
+            "outputs": [clean, parquet_path(clean),
+                        preprocess.NEAR_DUP_AUDIT],
+        },
+        "task2": {
+            "module": "src.task2_sentiment_theme",
+            "args": list(task2_args),
+            "deps": ["preprocess"],
+            "inputs": [clean, parquet_path(clean)],
+            "code": [],
+            "params": {"model": t2.DISTILBERT_MODEL,
+                       "backend": t2.SENTIMENT_BACKEND,
+                       "theme_clusters": N_CLUSTERS,
+                       "args": list(task2_args)},
+            "outputs": [t2.OUT_REVIEWS, t2.OUT_SUMMARY, t2.OUT_KEYWORDS,
+                        t2.OUT_CLUSTERS, t2.KEYWORD_INDEX],
+        },
+        "insert_reviews": {
+            "module": "src.insert_reviews",
+            "args": ["--input", REVIEWS_OUT],
+            "deps": ["task2"],
+            "inputs": [REVIEWS_OUT],
+            # the schema the loader applies before inserting
+            "code": ["migrations"],
+            # a different database has to be loaded again
+            "params": {"db": [db["host"], db["port"], db["dbname"]]},
+            "outputs": [],
+            "probe": database_marker,
+        },
+        "task4": {
+            "module": "src.task4_insights",
+            "args": [],
+            "deps": ["task2"],
+            "inputs": [REVIEWS_OUT],
+            "code": [],
+            "params": {"use_rollups": task4_insights.USE_ROLLUPS},
+            "outputs": [task4_insights.OUTPUT_DIR],
+        },
+    }
+    for spec in stages.values():
+        spec["code"] = spec["code"] + source_files(spec["module"])
+    if task4_insights.USE_ROLLUPS:
+        # the trend chart reads the rollups insert_reviews maintains
+        stages["task4"]["deps"].append("insert_reviews")
+    return stages
+
+
+def _module_path(module: str):
+    """Source file of a src module, or None for anything else."""
+    parts = module.split(".")
+    if parts[0] != "src" or len(parts) < 2:
+        return None
+    path = os.path.join(*parts) + ".py"
+    return path if os.path.exists(path) else None
+
+
+def source_files(module: str) -> list:
+    """
+    Source files of `module` and of every src module it imports, directly
+    or through other src modules. Imports inside functions (the lazy
+    ones) count too, so a stage's fingerprint covers all of its code.
+    """
+    seen, todo = set(), [module]
+    while todo:
+        path = _module_path(todo.pop())
+        if path is None or path in seen:
+            continue
+        seen.add(path)
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                todo += [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module:
+                # `from src import x` imports the module src.x
+                todo.append(node.module)
+                todo += [f"{node.module}.{alias.name}"
+                         for alias in node.names]
+    return sorted(seen)
+
+
+def database_marker() -> str:
+    """
+    Row count and last review_id of the reviews table, the output of
+    insert_reviews. Returns "unavailable: ..." if the database cannot be
+    queried, so the stage runs (and reports the actual error).
+    """
+    try:
+        from src.db import get_connection
+
+        conn = get_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT COUNT(*), MAX(review_id) FROM reviews")
+                count, last_id = cur.fetchone()
+        finally:
+            conn.close()
+    except Exception as exc:
+        return f"unavailable: {type(exc).__name__}"
+    return f"{count} rows, last review_id {last_id}"
+
+
+def topological_order(stages: dict) -> list:
+    """Stage names with every stage after its dependencies."""
+    order, visiting = [], set()
+
+    def visit(name):
+        if name in order:
+            return
+        if name in visiting:
+            raise ValueError(f"Pipeline dependency cycle at {name!r}")
+        visiting.add(name)
+        for dep in stages[name]["deps"]:
+            visit(dep)
+        visiting.discard(name)
+        order.append(name)
+
+    for name in stages:
+        visit(name)
+    return order
+
+
+# -----------------------------
+# Fingerprints
+# -----------------------------
+class FileHasher:
+    """
+    SHA-256 of files and directories. Digests are remembered by path,
+    size and mtime (also across runs, via the state file), so unchanged
+    large files are not read again.
+    """
+
+    def __init__(self, known: dict = None):
+        self.known = dict(known or {})
+        self._lock = threading.Lock()
+
+    def file_digest(self, path: str) -> str:
+        st = os.stat(path)
+        with self._lock:
+            entry = self.known.get(path)
+        if entry and entry[:2] == [st.st_size, st.st_mtime_ns]:
+            return entry[2]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK), b""):
+                h.update(block)
+        digest = h.hexdigest()
+        with self._lock:
+            self.known[path] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
+
+    def digest(self, path: str) -> str:
+        """Digest of a file, a directory tree, or "missing"."""
+        if os.path.isdir(path):
+            h = hashlib.sha256()
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    full = os.path.join(root, name)
+                    rel = os.path.relpath(full, path)
+                    h.update(f"{rel}:{self.file_digest(full)}\n".encode())
+            return h.hexdigest()
+        if os.path.exists(path):
+            return self.file_digest(path)
+        return "missing"
+
+
+def fingerprint(name: str, spec: dict, hasher: FileHasher) -> str:
+    """Hash of a stage's command, parameters, code and input files."""
+    payload = {
+        "stage": name,
+        "module": spec["module"],
+        "params": spec["params"],
+        "code": {p: hasher.digest(p) for p in spec["code"]},
+        "inputs": {p: hasher.digest(p) for p in spec["inputs"]},
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def output_digests(spec: dict, hasher: FileHasher) -> dict:
+    digests = {p: hasher.digest(p) for p in spec["outputs"]}
+    if spec.get("probe"):
+        # what the stage writes outside the file system (the database)
+        digests["probe"] = spec["probe"]()
+    return digests
+
+
+# -----------------------------
+# State and output cache
+# -----------------------------
+def load_state(path: str = STATE_PATH) -> dict:
+    if not os.path.exists(path):
+        return {"stages": {}, "files": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state: dict, path: str = STATE_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _copy(src: str, dst: str):
+    """Copy a file or tree; copies get fresh mtimes (see FileHasher)."""
+    if os.path.isdir(dst):
+        shutil.rmtree(dst)
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    if os.path.isdir(src):
+        shutil.copytree(src, dst, copy_function=shutil.copy)
+    else:
+        shutil.copy(src, dst)
+
+
+def store_outputs(name: str, spec: dict, fp: str,
+                  cache_dir: str = CACHE_DIR, keep: int = CACHE_KEEP):
+    """Copy a stage's outputs to cache_dir/<stage>/<fingerprint>/."""
+    if not spec["outputs"] or keep <= 0:
+        return
+    entry = os.path.join(cache_dir, name, fp)
+    tmp_entry = entry + ".tmp"
+    if os.path.exists(tmp_entry):
+        shutil.rmtree(tmp_entry)
+    for i, path in enumerate(spec["outputs"]):
+        if os.path.exists(path):
+            _copy(path, os.path.join(tmp_entry, str(i)))
+    if os.path.exists(entry):
+        shutil.rmtree(entry)
+    os.makedirs(tmp_entry, exist_ok=True)
+    os.replace(tmp_entry, entry)
+    # keep the most recent entries of this stage
+    stage_dir = os.path.join(cache_dir, name)
+    entries = sorted((os.path.join(stage_dir, e)
+                      for e in os.listdir(stage_dir)
+                      if not e.endswith(".tmp")),
+                     key=os.path.getmtime, reverse=True)
+    for old in entries[keep:]:
+        shutil.rmtree(old)
+
+
+def restore_outputs(name: str, spec: dict, fp: str,
+                    cache_dir: str = CACHE_DIR) -> bool:
+    """Copy cached outputs for `fp` back in place; False if not cached."""
+    entry = os.path.join(cache_dir, name, fp)
+    if not spec["outputs"] or not os.path.isdir(entry):
+        return False
+    for i, path in enumerate(spec["outputs"]):
+        cached = os.path.join(entry, str(i))
+        if os.path.exists(cached):
+            _copy(cached, path)
+    os.utime(entry)  # most recently used
+    return True
+
+
+# -----------------------------
+# Running
+# -----------------------------
+class Pipeline:
+    """
+    Runs the stages in dependency order, independent ones concurrently.
+
+    Args:
+        stages (dict): Graph from build_stages()
+        workers (int): Stages running at the same time
+        force (iterable): Stages to rerun even if unchanged
+        skip (iterable): Stages not to run (their outputs are used as is)
+        run_on_request (iterable): on_request stages to run (e.g. scrape)
+        dry_run (bool): Only print what would happen
+    """
+
+    def __init__(self, stages: dict, workers: int = PIPELINE_WORKERS,
+                 force=(), skip=(), run_on_request=(), dry_run=False,
+                 state_path: str = STATE_PATH, cache_dir: str = CACHE_DIR):
+        self.stages = stages
+        self.order = topological_order(stages)
+        self.workers = max(1, workers)
+        self.force = set(force)
+        self.skip = set(skip)
+        self.run_on_request = set(run_on_request)
+        self.dry_run = dry_run
+        self.state_path = state_path
+        self.cache_dir = cache_dir
+        self.state = load_state(state_path)
+        self.hasher = FileHasher(self.state.get("files"))
+        self.results = {}
+        self._lock = threading.Lock()
+        self._print_lock = threading.Lock()
+
+    def _log(self, name: str, message: str):
+        with self._print_lock:
+            print(f"[{name}] {message}", flush=True)
+
+    def _save(self):
+        with self._lock:
+            self.state["files"] = self.hasher.known
+            save_state(self.state, self.state_path)
+
+    def decide(self, name: str):
+        """
+        What to do with a stage whose dependencies are done.
+
+        Returns:
+            tuple: (action, fingerprint) with action one of "skip",
+                "unchanged", "restore" or "run"
+        """
+        spec = self.stages[name]
+        if name in self.skip:
+            return "skip", None
+        outputs_exist = all(os.path.exists(p) for p in spec["outputs"])
+        if (spec.get("on_request") and name not in self.run_on_request
+                and name not in self.force and outputs_exist):
+            return "skip", None
+        fp = fingerprint(name, spec, self.hasher)
+        if name in self.force:
+            return "run", fp
+        record = self.state["stages"].get(name)
+        if (record and record["fingerprint"] == fp and outputs_exist
+                and record["outputs"] == output_digests(spec, self.hasher)):
+            return "unchanged", fp
+        if os.path.isdir(os.path.join(self.cache_dir, name, fp)):
+            return "restore", fp
+        return "run", fp
+
+    def _execute(self, name: str, action: str, fp: str) -> str:
+        spec = self.stages[name]
+        if action == "restore" and not self.dry_run:
+            restore_outputs(name, spec, fp, self.cache_dir)
+        elif action == "run" and not self.dry_run:
+            cmd = [sys.executable, "-m", spec["module"], *spec["args"]]
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE,
+                                    stderr=subprocess.STDOUT, text=True,
+                                    encoding="utf-8", errors="replace")
+            for line in proc.stdout:
+                self._log(name, line.rstrip())
+            if proc.wait() != 0:
+                raise subprocess.CalledProcessError(proc.returncode, cmd)
+            store_outputs(name, spec, fp, self.cache_dir)
+        if action in ("run", "restore") and not self.dry_run:
+            with self._lock:
+                self.state["stages"][name] = {
+                    "fingerprint": fp,
+                    "outputs": output_digests(spec, self.hasher),
+                    "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                }
+            self._save()
+        return action
+
+    def _start(self, pool, name: str):
+        """Decide and submit one stage; return its future."""
+        action, fp = self.decide(name)
+        if self.dry_run and action in ("unchanged", "restore") and any(
+                self.results.get(d) == "run"
+                for d in self.stages[name]["deps"]):
+            # its inputs are about to change
+            action = "run"
+        verb = {"skip": "skipped", "unchanged": "unchanged, skipped",
+                "restore": "restoring cached outputs",
+                "run": "running"}[action]
+        self._log(name, verb + (" (dry run)" if self.dry_run else ""))
+
+        def job():
+            with stage(name):
+                return self._execute(name, action, fp)
+
+        return pool.submit(job)
+
+    def run(self) -> dict:
+        """
+        Run the graph. A failed stage stops its dependents; independent
+        stages still finish.
+
+        Returns:
+            dict: Stage name -> "skip", "unchanged", "restore", "run",
+                "failed" or "blocked"
+        """
+        pending = list(self.order)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while pending or running:
+                for name in list(pending):
+                    deps = [self.results.get(d)
+                            for d in self.stages[name]["deps"]]
+                    if any(d in ("failed", "blocked") for d in deps):
+                        self.results[name] = "blocked"
+                        self._log(name, "blocked by a failed dependency")
+                        pending.remove(name)
+                    elif (all(d is not None for d in deps)
+                          and len(running) < self.workers):
+                        running[self._start(pool, name)] = name
+                        pending.remove(name)
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        self.results[name] = future.result()
+                    except Exception as exc:
+                        self.results[name] = "failed"
+                        self._log(name, f"failed: {exc}")
+        return self.results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scrape", action="store_true",
+                        help="scrape new reviews first")
+    parser.add_argument("--incremental", action="store_true",
+                        help="scrape incrementally (implies --scrape)")
+    parser.add_argument("--stream", action="store_true",
+                        help="run task2 in streaming mode")
+    parser.add_argument("--force", nargs="*", metavar="STAGE",
+                        help="rerun these stages (all if none given)")
+    parser.add_argument("--skip", nargs="+", default=[], metavar="STAGE",
+                        help="do not run these stages, e.g. insert_reviews")
+    parser.add_argument("--workers", type=int, default=PIPELINE_WORKERS,
+                        help="stages run concurrently")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="print what would run, change nothing")
+    args = parser.parse_args()
+
+    stages = build_stages(
+        scrape_args=["--incremental"] if args.incremental else [],
+        task2_args=["--stream"] if args.stream else [],
+    )
+    force = args.force
+    if force is not None and not force:
+        force = [n for n in stages if not stages[n].get("on_request")]
+    unknown = set(force or []) | set(args.skip)
+    unknown -= set(stages)
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}; "
+                     f"stages: {', '.join(stages)}")
+
+    pipeline = Pipeline(
+        stages, workers=args.workers, force=force or [], skip=args.skip,
+        run_on_request=["scrape"] if args.scrape or args.incremental else [],
+        dry_run=args.dry_run,
+    )
+    with run_report("pipeline"):
+        results = pipeline.run()
+    print("Pipeline: " + ", ".join(f"{n} {r}" for n, r in results.items()))
+    sys.exit(1 if "failed" in results.values() else 0)
+
+
+if __name__ == "__main__":
+    main()
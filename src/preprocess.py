@@ -2,23 +2,38 @@
 """
 Preprocess raw Google Play reviews:
 - Remove duplicates and missing data
-- Filter English reviews
+- Remove near-duplicates (MinHash/LSH), keeping a `dup_cluster` id
+- Filter English reviews (language kept in a `lang` column)
 - Normalize dates to YYYY-MM-DD
-- Save cleaned CSV
+- Save cleaned CSV and a typed Parquet copy (see src/storage.py)
 """
 
+import numpy as np
 import pandas as pd
 from dateutil import parser
-from langdetect import detect, DetectorFactory
-from langdetect.lang_detect_exception import LangDetectException
 import os
+import warnings
+from src.langid import detect_languages, detect_language
+from src.near_duplicates import find_near_duplicates
+from src.instrumentation import run_report, stage
+from src.storage import parquet_path, prefer_parquet, read_reviews
+from src.storage import write_reviews
 
-DetectorFactory.seed = 0  # Ensure consistent language detection results
+RAW_FILE = "data/raw/raw_reviews.csv"
+CLEANED_FILE = "data/cleaned/clean_reviews.csv"
+NEAR_DUP_AUDIT = "data/cleaned/near_duplicates.csv"
+
+# Estimated Jaccard similarity above which reviews count as near-duplicates
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.85"))
+
+# Worker processes for language detection (1 = run in this process)
+LANGID_JOBS = int(os.getenv("LANGID_JOBS", "1"))
 
 
 def is_english(text):
     """
-    Checks if the given text is English using langdetect.
+    Checks if the given text is English using the shared language-ID
+    component (src/langid.py).
 
     Args:
         text (str): Text to check
@@ -26,49 +41,129 @@ def is_english(text):
     Returns:
         bool: True if English, False otherwise
     """
+    return detect_language(text) == "en"
+
+
+def _parse_date(value):
+    """Fallback parser for dates the vectorized path cannot handle."""
     try:
-        return detect(text) == "en"
-    except LangDetectException:
-        return False
+        return pd.Timestamp(parser.parse(str(value))).tz_localize(None)
+    except (ValueError, OverflowError, TypeError):
+        return pd.NaT
 
 
-def clean_reviews():
+def normalize_dates(dates: pd.Series) -> pd.Series:
+    """
+    Parse dates in one vectorized pass and truncate them to the day.
+    Only values the ISO8601 parser rejects go through dateutil.
+
+    Args:
+        dates (pd.Series): Raw date values
+
+    Returns:
+        pd.Series: datetime64 values at midnight (NaT if unparseable)
     """
-    Reads raw reviews CSV, preprocesses it, and saves cleaned CSV.
+    text = dates.astype(str)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # mixed time zones, handled below
+        parsed = pd.to_datetime(text, errors="coerce", format="ISO8601")
+    if not pd.api.types.is_datetime64_any_dtype(parsed):
+        # e.g. mixed time zones: parse everything with the fallback
+        parsed = pd.Series(pd.NaT, index=dates.index, dtype="datetime64[ns]")
+    elif parsed.dt.tz is not None:
+        parsed = parsed.dt.tz_localize(None)
+
+    failed = parsed.isna()
+    if failed.any():
+        fallback = pd.to_datetime(text[failed].map(_parse_date))
+        parsed = parsed.where(~failed, fallback.reindex(parsed.index))
+    return parsed.dt.normalize()
+
+
+def drop_near_duplicates(df, threshold=NEAR_DUP_THRESHOLD):
     """
-    # Read raw CSV
-    df = pd.read_csv("data/raw/raw_reviews.csv")
+    Keep the first review of every near-duplicate cluster.
 
-    # Drop missing review text
-    df = df.dropna(subset=["review"])
+    Adds a `dup_cluster` column (shared by all members of a cluster) and
+    writes the removed rows to data/cleaned/near_duplicates.csv for audit.
 
-    # Remove duplicates based on review text
-    df = df.drop_duplicates(subset=["review"])
+    Args:
+        df (pd.DataFrame): Reviews with a `review` column
+        threshold (float): Similarity threshold for find_near_duplicates
 
-    # Remove empty reviews
-    df = df[df["review"].str.strip() != ""]
+    Returns:
+        pd.DataFrame: Reviews without near-duplicates
+    """
+    df = df.reset_index(drop=True)
+    representatives = find_near_duplicates(df["review"], threshold)
+    df["dup_cluster"] = pd.factorize(representatives)[0]
 
-    # Filter only English reviews
-    df = df[df["review"].apply(is_english)]
+    keep = representatives == np.arange(len(df))
+    df[~keep].to_csv(NEAR_DUP_AUDIT, index=False, encoding="utf-8")
+    print(f"Removed {int((~keep).sum())} near-duplicate reviews "
+          f"(see {NEAR_DUP_AUDIT})")
+    return df[keep]
 
-    # Normalize dates to YYYY-MM-DD
-    df["date"] = df["date"].apply(
-        lambda x: parser.parse(str(x)).strftime("%Y-%m-%d")
-    )
 
-    # Reset index
-    df.reset_index(drop=True, inplace=True)
+def clean_reviews():
+    """
+    Reads raw reviews, preprocesses them, and saves cleaned CSV + Parquet.
+    """
+    # Read raw reviews (typed Parquet if the scraper wrote one)
+    with stage("read") as st:
+        df = read_reviews(prefer_parquet(RAW_FILE))
+        st.rows_out = len(df)
+
+    with stage("exact_dedup", rows_in=len(df)) as st:
+        # Drop missing review text
+        df = df.dropna(subset=["review"])
+
+        # Remove duplicates based on review text
+        df = df.drop_duplicates(subset=["review"])
+
+        # Remove empty reviews
+        df = df[df["review"].str.strip() != ""]
+        st.rows_out = len(df)
 
     # Ensure cleaned folder exists
     os.makedirs("data/cleaned", exist_ok=True)
 
-    # Save cleaned CSV
-    cleaned_file = "data/cleaned/clean_reviews.csv"
-    df.to_csv(cleaned_file, index=False, encoding="utf-8")
+    # Remove near-duplicates (spam, punctuation/emoji/whitespace variants)
+    with stage("near_dedup", rows_in=len(df)) as st:
+        df = drop_near_duplicates(df)
+        st.rows_out = len(df)
+
+    with stage("language_filter", rows_in=len(df)) as st:
+        # Detect language once and keep it so later stages can skip it
+        df["lang"] = detect_languages(df["review"], n_jobs=LANGID_JOBS)
+
+        # Filter only English reviews
+        df = df[df["lang"] == "en"]
+        st.rows_out = len(df)
+
+    # Normalize dates to YYYY-MM-DD (vectorized, dateutil fallback)
+    with stage("normalize_dates", rows_in=len(df)) as st:
+        df["date"] = normalize_dates(df["date"])
+        n_bad_dates = int(df["date"].isna().sum())
+        if n_bad_dates:
+            print(f"Dropping {n_bad_dates} reviews with unparseable dates")
+            df = df.dropna(subset=["date"])
+        st.rows_out = len(df)
+
+    # Reset index
+    df.reset_index(drop=True, inplace=True)
+
+    # Save cleaned CSV and typed Parquet
+    with stage("write", rows_in=len(df)):
+        df.to_csv(CLEANED_FILE, index=False, encoding="utf-8",
+                  date_format="%Y-%m-%d")
+        write_reviews(df, parquet_path(CLEANED_FILE))
 
-    print("Preprocessing complete. Saved to data/cleaned/clean_reviews.csv")
+    print(f"Preprocessing complete. Saved to {CLEANED_FILE} "
+          f"and {parquet_path(CLEANED_FILE)}")
     print(f"Total reviews after cleaning: {len(df)}")
 
 
 if __name__ == "__main__":
-    clean_reviews()
+    with run_report("preprocess"):
+        clean_reviews()
@@ -0,0 +1,317 @@
+# src/review_loader.py
+"""
+Bulk loader for cleaned reviews.
+
+Streams data/cleaned/clean_reviews.csv into a staging table in chunks
+(COPY ... FROM STDIN on PostgreSQL) and merges every chunk into `reviews`,
+skipping rows whose content hash (bank, review text, review date) is
+already stored. Re-running the loader is therefore idempotent.
+
+The same code runs against a sqlite3 connection, which is handy for
+local checks without a PostgreSQL server.
+"""
+
+import hashlib
+import io
+import sqlite3
+import time
+import pandas as pd
+from src.storage import iter_reviews, prefer_parquet
+
+INPUT_CLEAN = "data/cleaned/clean_reviews.csv"
+CHUNK_SIZE = 50000  # rows staged and merged per transaction
+
+STAGING_COLUMNS = [
+    "bank_id",
+    "review_text",
+    "rating",
+    "review_date",
+    "sentiment_label",
+    "sentiment_score",
+    "source",
+    "themes",
+    "content_hash",
+]
+
+# The reviews table itself is created by the versioned migrations in
+# migrations/ (see src/migrate.py); only the staging table lives here.
+PG_SCHEMA = [
+    """
+    CREATE TEMP TABLE IF NOT EXISTS reviews_staging (
+        staging_id SERIAL,
+        bank_id INT,
+        review_text TEXT,
+        rating INT,
+        review_date DATE,
+        sentiment_label VARCHAR(20),
+        sentiment_score FLOAT,
+        source VARCHAR(50),
+        themes TEXT,
+        content_hash CHAR(32)
+    );
+    """,
+]
+
+SQLITE_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS banks (
+        bank_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        bank_name TEXT NOT NULL UNIQUE,
+        app_name TEXT NOT NULL
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS reviews (
+        review_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        bank_id INTEGER REFERENCES banks(bank_id),
+        review_text TEXT,
+        rating INTEGER,
+        review_date TEXT NOT NULL,
+        sentiment_label TEXT,
+        sentiment_score REAL,
+        source TEXT,
+        themes TEXT,
+        content_hash TEXT NOT NULL,
+        UNIQUE (content_hash, review_date)
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_reviews_bank_date "
+    "ON reviews (bank_id, review_date);",
+    "CREATE INDEX IF NOT EXISTS idx_reviews_bank_sentiment "
+    "ON reviews (bank_id, sentiment_label);",
+    """
+    CREATE TEMP TABLE IF NOT EXISTS reviews_staging (
+        staging_id INTEGER PRIMARY KEY,
+        bank_id INTEGER,
+        review_text TEXT,
+        rating INTEGER,
+        review_date TEXT,
+        sentiment_label TEXT,
+        sentiment_score REAL,
+        source TEXT,
+        themes TEXT,
+        content_hash TEXT
+    );
+    """,
+]
+
+# Insert staged rows that are not stored yet. The unique
+# (content_hash, review_date) constraint rejects rows already in `reviews`
+# as well as repeats inside the chunk, where the first staged copy wins.
+MERGE_SQL = """
+INSERT INTO reviews (bank_id, review_text, rating, review_date,
+                     sentiment_label, sentiment_score, source, themes,
+                     content_hash)
+SELECT s.bank_id, s.review_text, s.rating, s.review_date,
+       s.sentiment_label, s.sentiment_score, s.source, s.themes,
+       s.content_hash
+FROM reviews_staging s
+WHERE s.content_hash IS NOT NULL
+ORDER BY s.staging_id
+ON CONFLICT DO NOTHING;
+"""
+
+
+def is_sqlite(conn) -> bool:
+    """Return True if `conn` is a sqlite3 connection."""
+    return isinstance(conn, sqlite3.Connection)
+
+
+def _sql(conn, query: str) -> str:
+    """Adapt psycopg2 `%s` placeholders to sqlite `?` when needed."""
+    return query.replace("%s", "?") if is_sqlite(conn) else query
+
+
+def ensure_schema(conn):
+    """
+    Create the banks, reviews and staging tables if they are missing.
+    On PostgreSQL pending migrations are applied first.
+    """
+    if is_sqlite(conn):
+        statements = SQLITE_SCHEMA
+    else:
+        from src.migrate import apply_migrations
+
+        apply_migrations(conn)
+        statements = PG_SCHEMA
+    cur = conn.cursor()
+    for stmt in statements:
+        cur.execute(stmt)
+    conn.commit()
+    cur.close()
+
+
+def upsert_banks(conn, bank_names) -> dict:
+    """
+    Insert any missing banks and return a mapping of bank name to bank_id.
+
+    Args:
+        conn: Open psycopg2 or sqlite3 connection
+        bank_names (iterable): Bank names found in the input
+
+    Returns:
+        dict: {bank_name: bank_id}
+    """
+    cur = conn.cursor()
+    for name in sorted(set(bank_names)):
+        cur.execute(
+            _sql(conn, """
+            INSERT INTO banks (bank_name, app_name)
+            VALUES (%s, %s)
+            ON CONFLICT (bank_name) DO NOTHING;
+            """),
+            (name, name + " App"),
+        )
+    cur.execute("SELECT bank_id, bank_name FROM banks;")
+    bank_map = {name: bank_id for bank_id, name in cur.fetchall()}
+    cur.close()
+    return bank_map
+
+
+def content_hash(bank_id, review_text, review_date: str) -> str:
+    """
+    Dedup key of a review: md5 of "bank_id|review_text|YYYY-MM-DD".
+    Matches the expression used to backfill migrations/002.
+    """
+    key = f"{bank_id}|{review_text}|{review_date}"
+    return hashlib.md5(key.encode("utf-8")).hexdigest()
+
+
+def to_staging_frame(chunk: pd.DataFrame, bank_map: dict) -> pd.DataFrame:
+    """
+    Map a chunk of clean_reviews.csv onto the staging table columns.
+    Malformed dates / ratings become null; rows without a bank_id or a
+    date get content_hash None and are rejected by the merge.
+    """
+    # ISO8601: plain dates and full timestamps may share a chunk
+    dates = pd.to_datetime(chunk["date"], errors="coerce", format="ISO8601")
+    out = pd.DataFrame({
+        "bank_id": chunk["bank"].astype(str).map(bank_map),
+        "review_text": chunk["review"],
+        "rating": pd.to_numeric(chunk["rating"],
+                                errors="coerce").astype("Int64"),
+        "review_date": dates.dt.strftime("%Y-%m-%d"),
+        "sentiment_label": chunk.get("sentiment_label"),
+        "sentiment_score": chunk.get("sentiment_score"),
+        "source": chunk["source"],
+        "themes": chunk.get("themes"),
+    })
+    valid = out["bank_id"].notna() & out["review_date"].notna()
+    out["content_hash"] = [
+        content_hash(int(b), "" if pd.isna(t) else t, d) if ok else None
+        for b, t, d, ok in zip(out["bank_id"], out["review_text"],
+                               out["review_date"], valid)
+    ]
+    return out[STAGING_COLUMNS]
+
+
+def stage_rows(conn, staging: pd.DataFrame):
+    """Write a staging frame into reviews_staging (COPY on PostgreSQL)."""
+    cur = conn.cursor()
+    if is_sqlite(conn):
+        rows = staging.astype(object).where(staging.notna(), None)
+        cur.executemany(
+            "INSERT INTO reviews_staging ({}) VALUES ({});".format(
+                ", ".join(STAGING_COLUMNS),
+                ", ".join("?" for _ in STAGING_COLUMNS),
+            ),
+            rows.itertuples(index=False, name=None),
+        )
+    else:
+        buf = io.StringIO()
+        staging.to_csv(buf, index=False, header=False)
+        buf.seek(0)
+        cur.copy_expert(
+            "COPY reviews_staging ({}) FROM STDIN WITH (FORMAT csv);".format(
+                ", ".join(STAGING_COLUMNS)
+            ),
+            buf,
+        )
+    cur.close()
+
+
+def ensure_partitions(conn, staging: pd.DataFrame):
+    """
+    Create the monthly `reviews` partitions a staged chunk needs (PG).
+    Implausibly old or far-future dates are not given partitions by
+    create_review_partitions and go to reviews_default instead.
+    """
+    dates = staging["review_date"].dropna()
+    if is_sqlite(conn) or dates.empty:
+        return
+    cur = conn.cursor()
+    cur.execute("SELECT create_review_partitions(%s, %s);",
+                (dates.min(), dates.max()))
+    cur.close()
+
+
+def merge_staged(conn) -> int:
+    """Merge reviews_staging into reviews and clear it; return rows added."""
+    cur = conn.cursor()
+    cur.execute(MERGE_SQL)
+    inserted = cur.rowcount
+    cur.execute("DELETE FROM reviews_staging;")
+    cur.close()
+    return inserted
+
+
+def load_reviews(conn, path: str = INPUT_CLEAN,
+                 chunk_size: int = CHUNK_SIZE) -> dict:
+    """
+    Bulk-load cleaned reviews into the database. The typed Parquet copy
+    of `path` is read instead of the CSV when it exists.
+
+    Every chunk is staged, merged and committed on its own, so a failure
+    only rolls back the chunk in flight and re-runs skip what is stored.
+
+    Args:
+        conn: Open psycopg2 or sqlite3 connection
+        path (str): Path to the cleaned reviews CSV
+        chunk_size (int): Number of CSV rows per staged chunk
+
+    Returns:
+        dict: rows_read, rows_inserted, rows_rejected (no valid bank or
+            date), rows_duplicate (already stored or repeated), seconds
+            and rows_per_sec
+    """
+    ensure_schema(conn)
+    rows_read = 0
+    rows_inserted = 0
+    rows_rejected = 0
+    start = time.perf_counter()
+
+    columns = ["bank", "review", "rating", "date", "source",
+               "sentiment_label", "sentiment_score", "themes"]
+    for chunk in iter_reviews(prefer_parquet(path), chunk_size, columns):
+        try:
+            banks = chunk["bank"].dropna().astype(str).unique()
+            bank_map = upsert_banks(conn, banks)
+            staging = to_staging_frame(chunk, bank_map)
+            rejected = staging["content_hash"].isna()
+            rows_rejected += int(rejected.sum())
+            staging = staging[~rejected]
+            ensure_partitions(conn, staging)
+            stage_rows(conn, staging)
+            rows_inserted += merge_staged(conn)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        rows_read += len(chunk)
+
+    seconds = time.perf_counter() - start
+    rows_per_sec = rows_read / seconds if seconds > 0 else 0.0
+    rows_duplicate = rows_read - rows_inserted - rows_rejected
+    print(
+        f"Loaded {rows_read} rows ({rows_inserted} new, {rows_duplicate} "
+        f"duplicates, {rows_rejected} rejected) in {seconds:.2f}s "
+        f"- {rows_per_sec:,.0f} rows/sec"
+    )
+    return {
+        "rows_read": rows_read,
+        "rows_inserted": rows_inserted,
+        "rows_rejected": rows_rejected,
+        "rows_duplicate": rows_duplicate,
+        "seconds": seconds,
+        "rows_per_sec": rows_per_sec,
+    }
@@ -0,0 +1,372 @@
+# src/review_query.py
+"""
+Read API over the stored reviews.
+
+ReviewQuery answers filtered queries (bank, date range, sentiment, theme)
+with keyset pagination on review_id: every page carries the cursor to
+pass as `after_id` for the next one, so page 1000 costs as much as page 1
+(no OFFSET scan).
+
+Two backends run the same SQL:
+- PostgresBackend borrows connections from a psycopg2 pool (src/db.py)
+  instead of connecting per query, and runs every distinct query shape as
+  a server-side prepared statement (PREPARE once per connection, then
+  EXECUTE), so repeated dashboard queries skip parsing and planning.
+- SQLiteBackend reads a local sqlite database written by
+  src/review_loader.py, for local checks without a server.
+
+Results are kept in a small TTL + LRU cache keyed by query and parameters.
+
+Usage:
+    python -m src.review_query --bank CBE --sentiment NEGATIVE --limit 20
+    python -m src.review_query --sqlite data/reviews.db \
+        --theme "Customer Support" --after 1200
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+import pandas as pd
+from src.review_loader import _sql
+
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+CACHE_SIZE = int(os.getenv("REVIEW_QUERY_CACHE_SIZE", "256"))  # results
+CACHE_TTL = float(os.getenv("REVIEW_QUERY_CACHE_TTL", "60"))  # seconds
+
+REVIEW_COLUMNS = """
+r.review_id, b.bank_name, r.review_text, r.rating, r.review_date,
+r.sentiment_label, r.sentiment_score, r.themes, r.source
+"""
+
+FROM_SQL = """
+FROM reviews r
+JOIN banks b ON b.bank_id = r.bank_id
+"""
+
+# rows and the review_id to pass as after_id for the next page (None on
+# the last page)
+ReviewPage = namedtuple("ReviewPage", ["rows", "next_after_id"])
+
+
+class TTLCache:
+    """
+    Least-recently-used cache whose entries also expire after `ttl`
+    seconds. Thread-safe.
+
+    Args:
+        maxsize (int): Entries kept; the least recently used goes first
+        ttl (float): Seconds an entry stays valid
+    """
+
+    def __init__(self, maxsize: int = CACHE_SIZE, ttl: float = CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Cached value of `key`, or None if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+def _numbered(query: str) -> str:
+    """Turn psycopg2 `%s` placeholders into PREPARE's $1, $2, ..."""
+    counter = iter(range(1, query.count("%s") + 1))
+    return re.sub(r"%s", lambda _: f"${next(counter)}", query)
+
+
+class PostgresBackend:
+    """
+    Pooled PostgreSQL reads with per-connection prepared statements.
+
+    Args:
+        pool: psycopg2 pool; a ThreadedConnectionPool from
+            src.db.get_pool() is created if omitted
+    """
+
+    def __init__(self, pool=None):
+        if pool is None:
+            from src.db import get_pool
+
+            pool = get_pool()
+        self.pool = pool
+        self._prepared = {}  # connection -> names PREPAREd on it
+        self._lock = threading.Lock()
+
+    def fetch(self, query: str, params: tuple):
+        """Run a read query; return (column names, rows)."""
+        name = "review_query_" + hashlib.md5(
+            query.encode("utf-8")).hexdigest()[:16]
+        conn = self.pool.getconn()
+        try:
+            # read-only statements: no transaction left open in the pool
+            if not conn.autocommit:
+                conn.autocommit = True
+            with self._lock:
+                prepared = self._prepared.setdefault(conn, set())
+            cur = conn.cursor()
+            if name not in prepared:
+                cur.execute(f"PREPARE {name} AS {_numbered(query)}")
+                prepared.add(name)
+            if params:
+                placeholders = ", ".join("%s" for _ in params)
+                cur.execute(f"EXECUTE {name} ({placeholders})", params)
+            else:
+                cur.execute(f"EXECUTE {name}")
+            columns = [d[0] for d in cur.description]
+            rows = cur.fetchall()
+            cur.close()
+        except Exception:
+            # drop the connection: its prepared statements are unknown now
+            with self._lock:
+                self._prepared.pop(conn, None)
+            self.pool.putconn(conn, close=True)
+            raise
+        self.pool.putconn(conn)
+        return columns, rows
+
+    def close(self):
+        self.pool.closeall()
+
+
+class SQLiteBackend:
+    """
+    Reads from a sqlite database with the review_loader schema. sqlite3
+    keeps compiled statements in its own per-connection cache.
+
+    Args:
+        path (str): Database file
+    """
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path, check_same_thread=False,
+                                    cached_statements=256)
+        self._lock = threading.Lock()
+
+    def fetch(self, query: str, params: tuple):
+        """Run a read query; return (column names, rows)."""
+        with self._lock:
+            cur = self.conn.execute(_sql(self.conn, query), params)
+            columns = [d[0] for d in cur.description]
+            rows = cur.fetchall()
+            cur.close()
+        return columns, rows
+
+    def close(self):
+        self.conn.close()
+
+
+def _as_date(value) -> str:
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+def _like_literal(value: str) -> str:
+    """Escape LIKE wildcards in `value` for use with ESCAPE '\\'."""
+    return (value.replace("\\", "\\\\").replace("%", "\\%")
+            .replace("_", "\\_"))
+
+
+def build_filters(bank=None, start_date=None, end_date=None,
+                  sentiment=None, theme=None):
+    """
+    WHERE clauses and parameters for the supported filters.
+
+    Args:
+        bank (str or list): Bank name(s)
+        start_date, end_date: Inclusive review_date bounds
+        sentiment (str): POSITIVE, NEGATIVE or NEUTRAL
+        theme (str): One theme name, e.g. "Customer Support"
+
+    Returns:
+        tuple: (list of SQL conditions, list of parameters)
+    """
+    clauses, params = [], []
+    if bank is not None:
+        banks = [bank] if isinstance(bank, str) else list(bank)
+        clauses.append("b.bank_name IN ({})".format(
+            ", ".join("%s" for _ in banks)))
+        params += banks
+    if start_date is not None:
+        clauses.append("r.review_date >= %s")
+        params.append(_as_date(start_date))
+    if end_date is not None:
+        clauses.append("r.review_date <= %s")
+        params.append(_as_date(end_date))
+    if sentiment is not None:
+        clauses.append("r.sentiment_label = %s")
+        params.append(sentiment.upper())
+    if theme is not None:
+        # themes are stored "; "-joined: match whole theme names only
+        clauses.append("('; ' || r.themes || '; ') LIKE %s ESCAPE '\\'")
+        params.append(f"%; {_like_literal(theme)}; %")
+    return clauses, params
+
+
+def _where(clauses: list) -> str:
+    return "WHERE " + " AND ".join(clauses) if clauses else ""
+
+
+class ReviewQuery:
+    """
+    Filtered, paginated and cached reads of the reviews table.
+
+    Args:
+        backend: PostgresBackend or SQLiteBackend
+        cache (TTLCache): Result cache; pass TTLCache(maxsize=0) to disable
+    """
+
+    def __init__(self, backend, cache: TTLCache = None):
+        self.backend = backend
+        self.cache = cache if cache is not None else TTLCache()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _frame(self, query: str, params: list) -> pd.DataFrame:
+        key = (query, tuple(params))
+        df = self.cache.get(key)
+        if df is None:
+            columns, rows = self.backend.fetch(query, tuple(params))
+            df = pd.DataFrame(rows, columns=columns)
+            if "review_date" in df.columns:
+                df["review_date"] = pd.to_datetime(df["review_date"])
+            self.cache.put(key, df)
+        # callers may modify the frame; the cached one stays intact
+        return df.copy()
+
+    def page(self, after_id: int = None, limit: int = PAGE_SIZE,
+             newest_first: bool = False, **filters) -> ReviewPage:
+        """
+        One page of reviews matching `filters` (see build_filters).
+
+        Args:
+            after_id (int): next_after_id of the previous page (None for
+                the first page)
+            limit (int): Reviews per page (at most MAX_PAGE_SIZE)
+            newest_first (bool): Page by descending review_id
+
+        Returns:
+            ReviewPage: rows DataFrame and the next cursor
+        """
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        clauses, params = build_filters(**filters)
+        if after_id is not None:
+            clauses.append("r.review_id < %s" if newest_first
+                           else "r.review_id > %s")
+            params.append(int(after_id))
+        query = "SELECT {}{}{}\nORDER BY r.review_id {}\nLIMIT %s".format(
+            REVIEW_COLUMNS, FROM_SQL, _where(clauses),
+            "DESC" if newest_first else "ASC",
+        )
+        rows = self._frame(query, params + [limit])
+        next_after_id = None
+        if len(rows) == limit:
+            next_after_id = int(rows["review_id"].iloc[-1])
+        return ReviewPage(rows, next_after_id)
+
+    def iter_pages(self, limit: int = PAGE_SIZE, newest_first: bool = False,
+                   **filters):
+        """Yield every page of reviews matching `filters`."""
+        after_id = None
+        while True:
+            page = self.page(after_id, limit, newest_first, **filters)
+            if len(page.rows):
+                yield page
+            if page.next_after_id is None:
+                return
+            after_id = page.next_after_id
+
+    def count(self, **filters) -> int:
+        """Number of reviews matching `filters`."""
+        clauses, params = build_filters(**filters)
+        query = "SELECT COUNT(*) AS n_reviews{}{}".format(
+            FROM_SQL, _where(clauses))
+        return int(self._frame(query, params)["n_reviews"].iloc[0])
+
+    def sentiment_summary(self, **filters) -> pd.DataFrame:
+        """Per bank and sentiment label: review count and mean score."""
+        clauses, params = build_filters(**filters)
+        query = """
+        SELECT b.bank_name, r.sentiment_label, COUNT(*) AS n_reviews,
+               AVG(r.sentiment_score) AS mean_sentiment_score
+        {}{}
+        GROUP BY b.bank_name, r.sentiment_label
+        ORDER BY b.bank_name, r.sentiment_label
+        """.format(FROM_SQL, _where(clauses))
+        return self._frame(query, params)
+
+    def close(self):
+        self.backend.close()
+
+
+def open_review_query(sqlite_path: str = None,
+                      cache: TTLCache = None) -> ReviewQuery:
+    """ReviewQuery over PostgreSQL, or over `sqlite_path` if given."""
+    if sqlite_path:
+        backend = SQLiteBackend(sqlite_path)
+    else:
+        backend = PostgresBackend()
+    return ReviewQuery(backend, cache)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query stored reviews.")
+    parser.add_argument("--sqlite", help="read this sqlite database instead "
+                                         "of PostgreSQL")
+    parser.add_argument("--bank", action="append",
+                        help="bank name (repeat for several)")
+    parser.add_argument("--start-date")
+    parser.add_argument("--end-date")
+    parser.add_argument("--sentiment",
+                        choices=["POSITIVE", "NEGATIVE", "NEUTRAL"])
+    parser.add_argument("--theme")
+    parser.add_argument("--after", type=int, help="cursor from last page")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--newest-first", action="store_true")
+    args = parser.parse_args()
+
+    filters = {"bank": args.bank, "start_date": args.start_date,
+               "end_date": args.end_date, "sentiment": args.sentiment,
+               "theme": args.theme}
+    with open_review_query(args.sqlite) as rq:
+        page = rq.page(args.after, args.limit, args.newest_first, **filters)
+        print(page.rows.to_string(index=False))
+        print(f"{rq.count(**filters)} matching reviews; "
+              f"next page: --after {page.next_after_id}")
+
+
+if __name__ == "__main__":
+    main()
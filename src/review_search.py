@@ -0,0 +1,387 @@
+# src/review_search.py
+"""
+Full-text search over review text, backed by a persistent inverted index.
+
+- PostgreSQL: the `review_tsv` tsvector column with a GIN index
+  (migrations/005_review_search.sql). The column is generated, so rows
+  are indexed as they are inserted. Results are ranked with ts_rank_cd
+  (PostgreSQL has no built-in BM25).
+- SQLite: an FTS5 table (porter stemming) over `reviews`, ranked with
+  FTS5's bm25(). update_search_index() indexes reviews added since the
+  last call; src/insert_reviews.py runs it after every load.
+
+Queries accept words, "quoted phrases", AND (implicit between terms),
+OR, NOT / -word and parentheses, e.g.
+
+    "otp not received" OR "otp never arrives"
+    transfer AND failed NOT deducted
+    (login OR password) -fingerprint
+
+and the bank / date / sentiment / theme filters of src/review_query.py.
+
+Usage:
+    python -m src.review_search '"transfer failed"' --bank CBE --limit 10
+    python -m src.review_search 'login OR otp' --sqlite data/reviews.db
+"""
+
+import argparse
+import re
+from src.review_loader import is_sqlite
+from src.review_query import (
+    PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    ReviewQuery,
+    SQLiteBackend,
+    _where,
+    build_filters,
+    open_review_query,
+)
+
+INDEX_NAME = "reviews_fts"
+
+# PostgreSQL gets its index from migrations/005_review_search.sql.
+# External-content FTS5 table: the text stays in `reviews` only.
+SQLITE_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5(
+        review_text,
+        content='reviews',
+        content_rowid='review_id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS search_state (
+        index_name TEXT PRIMARY KEY,
+        last_review_id INTEGER NOT NULL
+    );
+    """,
+]
+
+RESULT_COLUMNS = """
+r.review_id, b.bank_name, r.review_date, r.rating, r.sentiment_label,
+r.review_text
+"""
+
+SQLITE_SEARCH_SQL = """
+SELECT {columns}, -bm25(reviews_fts) AS score
+FROM reviews_fts
+JOIN reviews r ON r.review_id = reviews_fts.rowid
+JOIN banks b ON b.bank_id = r.bank_id
+WHERE reviews_fts MATCH %s{filters}
+ORDER BY bm25(reviews_fts)
+LIMIT %s
+"""
+
+PG_SEARCH_SQL = """
+SELECT {columns}, ts_rank_cd(r.review_tsv, q, 32) AS score
+FROM reviews r
+JOIN banks b ON b.bank_id = r.bank_id
+CROSS JOIN to_tsquery('english', %s) AS q
+WHERE r.review_tsv @@ q{filters}
+ORDER BY score DESC, r.review_id
+LIMIT %s
+"""
+
+SQLITE_COUNT_SQL = """
+SELECT COUNT(*) AS n_matches
+FROM reviews_fts
+JOIN reviews r ON r.review_id = reviews_fts.rowid
+JOIN banks b ON b.bank_id = r.bank_id
+WHERE reviews_fts MATCH %s{filters}
+"""
+
+PG_COUNT_SQL = """
+SELECT COUNT(*) AS n_matches
+FROM reviews r
+JOIN banks b ON b.bank_id = r.bank_id
+CROSS JOIN to_tsquery('english', %s) AS q
+WHERE r.review_tsv @@ q{filters}
+"""
+
+# ---- query language ----
+
+_TOKEN = re.compile(r'"([^"]*)"|(\()|(\))|(\S+?)(?=[\s()"]|$)')
+_WORD = re.compile(r"\w+")
+
+
+def _tokenize(query: str) -> list:
+    tokens = []
+    for phrase, lparen, rparen, word in _TOKEN.findall(query):
+        if lparen or rparen:
+            tokens.append(lparen or rparen)
+        elif word in ("AND", "OR", "NOT"):
+            tokens.append(word)
+        else:
+            negate = bool(word) and word.startswith("-")
+            words = _WORD.findall(phrase or word)
+            if not words:
+                continue
+            if negate:
+                tokens.append("NOT")
+            tokens.append(("term", tuple(w.lower() for w in words)))
+    return tokens
+
+
+def parse_query(query: str):
+    """
+    Parse a search query into a tree of ("term", words), ("and", nodes),
+    ("or", nodes) and ("not", node) tuples. A term with several words is
+    a phrase.
+
+    Raises:
+        ValueError: On empty or unbalanced queries
+    """
+    tokens = _tokenize(query)
+    pos = 0
+
+    def peek():
+        return tokens[pos] if pos < len(tokens) else None
+
+    def parse_or():
+        nonlocal pos
+        nodes = [parse_and()]
+        while peek() == "OR":
+            pos += 1
+            nodes.append(parse_and())
+        return nodes[0] if len(nodes) == 1 else ("or", nodes)
+
+    def parse_and():
+        nonlocal pos
+        nodes = [parse_unary()]
+        while peek() not in (None, "OR", ")"):
+            if peek() == "AND":
+                pos += 1
+            nodes.append(parse_unary())
+        return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+    def parse_unary():
+        nonlocal pos
+        token = peek()
+        pos += 1
+        if token == "NOT":
+            return ("not", parse_unary())
+        if token == "(":
+            node = parse_or()
+            if peek() != ")":
+                raise ValueError(f"Unbalanced parentheses in {query!r}")
+            pos += 1
+            return node
+        if isinstance(token, tuple):
+            return token
+        raise ValueError(f"Unexpected {token or 'end of query'!r} "
+                         f"in {query!r}")
+
+    if not tokens:
+        raise ValueError("Empty search query")
+    tree = parse_or()
+    if pos != len(tokens):
+        raise ValueError(f"Unexpected {tokens[pos]!r} in {query!r}")
+    _check_negations(tree)
+    return tree
+
+
+def _check_negations(node, allowed: bool = False):
+    """NOT only excludes from the other terms of an AND (as in FTS5)."""
+    kind = node[0]
+    if kind == "not":
+        if not allowed:
+            raise ValueError("NOT needs other terms to exclude from, "
+                             "e.g. 'transfer NOT failed'")
+        _check_negations(node[1])
+    elif kind == "and":
+        if all(n[0] == "not" for n in node[1]):
+            raise ValueError("NOT needs other terms to exclude from")
+        for n in node[1]:
+            _check_negations(n, allowed=True)
+    elif kind == "or":
+        for n in node[1]:
+            _check_negations(n)
+
+
+def to_fts5(node) -> str:
+    """Render a parsed query as an FTS5 MATCH expression."""
+    kind = node[0]
+    if kind == "term":
+        return '"' + " ".join(node[1]) + '"'
+    if kind == "or":
+        return "(" + " OR ".join(to_fts5(n) for n in node[1]) + ")"
+    # FTS5's NOT is binary: (included terms) NOT excluded
+    positive = [n for n in node[1] if n[0] != "not"]
+    expr = "(" + " AND ".join(to_fts5(n) for n in positive) + ")"
+    for n in node[1]:
+        if n[0] == "not":
+            expr = f"({expr} NOT {to_fts5(n[1])})"
+    return expr
+
+
+def to_tsquery(node) -> str:
+    """Render a parsed query for to_tsquery('english', ...)."""
+    kind = node[0]
+    if kind == "term":
+        return "(" + " <-> ".join(f"'{w}'" for w in node[1]) + ")"
+    if kind == "not":
+        return "!" + to_tsquery(node[1])
+    if kind == "or":
+        return "(" + " | ".join(to_tsquery(n) for n in node[1]) + ")"
+    return "(" + " & ".join(to_tsquery(n) for n in node[1]) + ")"
+
+
+# ---- index maintenance ----
+
+def ensure_search_index(conn):
+    """Create the FTS5 table on sqlite (PostgreSQL uses migrations)."""
+    if not is_sqlite(conn):
+        return
+    cur = conn.cursor()
+    for stmt in SQLITE_SCHEMA:
+        cur.execute(stmt)
+    cur.close()
+
+
+def _save_watermark(cur, last_id: int):
+    cur.execute("""
+        INSERT INTO search_state (index_name, last_review_id)
+        VALUES (?, ?)
+        ON CONFLICT (index_name) DO UPDATE SET
+            last_review_id = excluded.last_review_id;
+    """, (INDEX_NAME, last_id))
+
+
+def update_search_index(conn) -> int:
+    """
+    Index reviews added since the last update. Reviews are append-only,
+    so only review_ids above the stored watermark are read. Runs inside
+    the caller's transaction.
+
+    On PostgreSQL rows are indexed on insert and nothing is done.
+
+    Returns:
+        int: Number of reviews indexed
+    """
+    if not is_sqlite(conn):
+        return 0
+    ensure_search_index(conn)
+    cur = conn.cursor()
+    cur.execute("SELECT last_review_id FROM search_state "
+                "WHERE index_name = ?;", (INDEX_NAME,))
+    row = cur.fetchone()
+    last_id = row[0] if row else 0
+    cur.execute("SELECT MAX(review_id), COUNT(*) FROM reviews "
+                "WHERE review_id > ?;", (last_id,))
+    max_id, n_new = cur.fetchone()
+    if n_new:
+        cur.execute("""
+            INSERT INTO reviews_fts (rowid, review_text)
+            SELECT review_id, COALESCE(review_text, '') FROM reviews
+            WHERE review_id > ? AND review_id <= ?;
+        """, (last_id, max_id))
+        _save_watermark(cur, max_id)
+    cur.close()
+    return int(n_new)
+
+
+def rebuild_search_index(conn, optimize: bool = True) -> int:
+    """Rebuild the FTS5 index from `reviews` (sqlite); return rows."""
+    if not is_sqlite(conn):
+        return 0
+    ensure_search_index(conn)
+    cur = conn.cursor()
+    cur.execute("INSERT INTO reviews_fts (reviews_fts) VALUES ('rebuild');")
+    if optimize:
+        # merge the index b-trees into one for faster queries
+        cur.execute(
+            "INSERT INTO reviews_fts (reviews_fts) VALUES ('optimize');")
+    cur.execute("SELECT MAX(review_id), COUNT(*) FROM reviews;")
+    max_id, n = cur.fetchone()
+    _save_watermark(cur, max_id or 0)
+    cur.close()
+    return int(n)
+
+
+# ---- search API ----
+
+class ReviewSearch(ReviewQuery):
+    """
+    Ranked full-text search on top of ReviewQuery (same backends, pool,
+    prepared statements and result cache).
+    """
+
+    def _search_sql(self, query: str, template_sqlite: str,
+                    template_pg: str, filters: dict):
+        tree = parse_query(query)
+        clauses, params = build_filters(**filters)
+        extra = _where(clauses).replace("WHERE ", "\n  AND ", 1)
+        if isinstance(self.backend, SQLiteBackend):
+            return (template_sqlite.format(columns=RESULT_COLUMNS,
+                                           filters=extra),
+                    [to_fts5(tree)] + params)
+        return (template_pg.format(columns=RESULT_COLUMNS, filters=extra),
+                [to_tsquery(tree)] + params)
+
+    def search(self, query: str, limit: int = PAGE_SIZE, **filters):
+        """
+        Best-ranked reviews matching `query` (highest score first).
+
+        Args:
+            query (str): Words, "phrases", AND / OR / NOT, parentheses
+            limit (int): Results returned (at most MAX_PAGE_SIZE)
+            **filters: bank, start_date, end_date, sentiment, theme
+
+        Returns:
+            pd.DataFrame: review_id, bank_name, review_date, rating,
+                sentiment_label, review_text, score
+        """
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        sql, params = self._search_sql(query, SQLITE_SEARCH_SQL,
+                                       PG_SEARCH_SQL, filters)
+        return self._frame(sql, params + [limit])
+
+    def count_matches(self, query: str, **filters) -> int:
+        """Number of reviews matching `query` and `filters`."""
+        sql, params = self._search_sql(query, SQLITE_COUNT_SQL,
+                                       PG_COUNT_SQL, filters)
+        return int(self._frame(sql, params)["n_matches"].iloc[0])
+
+
+def open_review_search(sqlite_path: str = None, cache=None) -> ReviewSearch:
+    """ReviewSearch over PostgreSQL, or over `sqlite_path` if given."""
+    rq = open_review_query(sqlite_path, cache)
+    return ReviewSearch(rq.backend, rq.cache)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search review text.")
+    parser.add_argument("query")
+    parser.add_argument("--sqlite", help="search this sqlite database "
+                                         "instead of PostgreSQL")
+    parser.add_argument("--bank", action="append")
+    parser.add_argument("--start-date")
+    parser.add_argument("--end-date")
+    parser.add_argument("--sentiment",
+                        choices=["POSITIVE", "NEGATIVE", "NEUTRAL"])
+    parser.add_argument("--theme")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--rebuild", action="store_true",
+                        help="rebuild the sqlite FTS5 index first")
+    args = parser.parse_args()
+
+    if args.sqlite and args.rebuild:
+        import sqlite3
+
+        conn = sqlite3.connect(args.sqlite)
+        print(f"Indexed {rebuild_search_index(conn)} reviews")
+        conn.commit()
+        conn.close()
+
+    filters = {"bank": args.bank, "start_date": args.start_date,
+               "end_date": args.end_date, "sentiment": args.sentiment,
+               "theme": args.theme}
+    with open_review_search(args.sqlite) as rs:
+        results = rs.search(args.query, args.limit, **filters)
+        print(results.to_string(index=False))
+        print(f"{rs.count_matches(args.query, **filters)} matching reviews")
+
+
+if __name__ == "__main__":
+    main()
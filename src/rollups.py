@@ -0,0 +1,292 @@
+# src/rollups.py
+"""
+Incrementally maintained rollups of the reviews table.
+
+review_daily_rollup keeps, per bank, day and rating, the review count,
+the sentiment score sum/count and the POSITIVE/NEGATIVE/NEUTRAL tallies.
+Only the bank-days of reviews added since the last run (review_id above
+the watermark in rollup_state) are recomputed, so updating after a load
+costs as much as the load, not as much as the table.
+
+review_ids are drawn when a row is inserted, not when its transaction
+commits, so a concurrent load can commit ids below the watermark after
+an update has passed them. Every update therefore also recomputes the
+bank-days of the last ROLLUP_SAFETY_WINDOW ids below the watermark;
+recomputing a day is idempotent, so late rows are counted exactly once.
+
+Reviews whose sentiment is changed in place (src/update_sentiment.py)
+have their days recomputed with refresh_days().
+
+Bank x rating and bank x month summaries are read from the rollup, which
+holds a few thousand rows instead of every review.
+
+Usage:
+    python -m src.rollups            # fold new reviews into the rollup
+    python -m src.rollups --rebuild  # recompute the rollup from scratch
+"""
+
+import argparse
+import os
+import pandas as pd
+from src.review_loader import _sql, is_sqlite
+
+ROLLUP_NAME = "review_daily_rollup"
+# ids below the watermark whose bank-days are recomputed on every update
+ROLLUP_SAFETY_WINDOW = int(os.getenv("ROLLUP_SAFETY_WINDOW", "50000"))
+
+# PostgreSQL gets these tables from migrations/003_review_rollups.sql
+SQLITE_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS review_daily_rollup (
+        bank_id INTEGER NOT NULL REFERENCES banks(bank_id),
+        review_date TEXT NOT NULL,
+        rating INTEGER NOT NULL,
+        n_reviews INTEGER NOT NULL,
+        score_sum REAL NOT NULL,
+        score_n INTEGER NOT NULL,
+        positive_count INTEGER NOT NULL,
+        negative_count INTEGER NOT NULL,
+        neutral_count INTEGER NOT NULL,
+        PRIMARY KEY (bank_id, review_date, rating)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS rollup_state (
+        rollup_name TEXT PRIMARY KEY,
+        last_review_id INTEGER NOT NULL,
+        updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    );
+    """,
+]
+
+AGGREGATE_SELECT = """
+SELECT bank_id, review_date, COALESCE(rating, 0) AS rating,
+       COUNT(*),
+       COALESCE(SUM(sentiment_score), 0),
+       COUNT(sentiment_score),
+       SUM(CASE WHEN UPPER(sentiment_label) = 'POSITIVE' THEN 1 ELSE 0 END),
+       SUM(CASE WHEN UPPER(sentiment_label) = 'NEGATIVE' THEN 1 ELSE 0 END),
+       SUM(CASE WHEN UPPER(sentiment_label) = 'NEUTRAL' THEN 1 ELSE 0 END)
+FROM reviews
+WHERE {where}
+GROUP BY bank_id, review_date, COALESCE(rating, 0)
+"""
+
+ROLLUP_COLUMNS = """
+INSERT INTO review_daily_rollup (bank_id, review_date, rating, n_reviews,
+                                 score_sum, score_n, positive_count,
+                                 negative_count, neutral_count)
+"""
+
+# Bank-days holding a review with from_id < review_id <= to_id
+TOUCHED_DAYS = """
+(bank_id, review_date) IN (
+    SELECT DISTINCT bank_id, review_date FROM reviews
+    WHERE review_id > %s AND review_id <= %s
+)
+"""
+
+# Recompute those bank-days from every review up to the new watermark:
+# params (from_id, to_id) for the delete, (to_id, from_id, to_id) for the
+# insert.
+DELETE_DAYS_SQL = "DELETE FROM review_daily_rollup WHERE" + TOUCHED_DAYS + ";"
+RECOMPUTE_DAYS_SQL = ROLLUP_COLUMNS + AGGREGATE_SELECT.format(
+    where="review_id <= %s AND" + TOUCHED_DAYS
+) + ";"
+
+# Recompute one bank-day from the reviews already folded in.
+REFRESH_DAY_SQL = ROLLUP_COLUMNS + AGGREGATE_SELECT.format(
+    where="bank_id = %s AND review_date = %s AND review_id <= %s"
+) + ";"
+
+SAVE_STATE_SQL = """
+INSERT INTO rollup_state (rollup_name, last_review_id)
+VALUES (%s, %s)
+ON CONFLICT (rollup_name) DO UPDATE SET
+    last_review_id = excluded.last_review_id,
+    updated_at = CURRENT_TIMESTAMP;
+"""
+
+
+def ensure_rollup_schema(conn):
+    """Create the rollup tables on sqlite (PostgreSQL uses migrations)."""
+    if not is_sqlite(conn):
+        return
+    cur = conn.cursor()
+    for stmt in SQLITE_SCHEMA:
+        cur.execute(stmt)
+    cur.close()
+
+
+def get_watermark(conn) -> int:
+    """Highest review_id already folded into the rollup (0 if none)."""
+    cur = conn.cursor()
+    cur.execute(
+        _sql(conn, "SELECT last_review_id FROM rollup_state "
+                   "WHERE rollup_name = %s;"),
+        (ROLLUP_NAME,),
+    )
+    row = cur.fetchone()
+    cur.close()
+    return int(row[0]) if row else 0
+
+
+def update_rollups(conn, safety_window: int = ROLLUP_SAFETY_WINDOW) -> int:
+    """
+    Fold reviews inserted since the last update into the rollup.
+
+    The bank-days of the new reviews and of the `safety_window` ids below
+    the watermark are recomputed, which also picks up reviews committed
+    late by a concurrent load.
+
+    Runs inside the caller's transaction (nothing is committed), so the
+    watermark only moves together with the rollup rows.
+
+    Args:
+        conn: Open psycopg2 or sqlite3 connection
+        safety_window (int): ids below the watermark to re-scan
+
+    Returns:
+        int: Number of reviews above the old watermark
+    """
+    ensure_rollup_schema(conn)
+    last_id = get_watermark(conn)
+    cur = conn.cursor()
+    cur.execute(
+        _sql(conn, "SELECT MAX(review_id), COUNT(*) FROM reviews "
+                   "WHERE review_id > %s;"),
+        (last_id,),
+    )
+    max_id, n_new = cur.fetchone()
+    to_id = max(int(max_id or 0), last_id)
+    from_id = last_id - safety_window
+    cur.execute(_sql(conn, DELETE_DAYS_SQL), (from_id, to_id))
+    cur.execute(_sql(conn, RECOMPUTE_DAYS_SQL), (to_id, from_id, to_id))
+    if n_new:
+        cur.execute(_sql(conn, SAVE_STATE_SQL), (ROLLUP_NAME, to_id))
+    cur.close()
+    return int(n_new)
+
+
+def refresh_days(conn, review_ids) -> int:
+    """
+    Recompute the rollup rows of the bank-days holding `review_ids`,
+    after those reviews were updated in place (e.g. sentiment backfill).
+    Reviews not folded in yet are left to the next update_rollups().
+
+    Returns:
+        int: Number of bank-days recomputed
+    """
+    review_ids = [int(i) for i in review_ids]
+    if not review_ids:
+        return 0
+    ensure_rollup_schema(conn)
+    last_id = get_watermark(conn)
+    cur = conn.cursor()
+    placeholders = ", ".join("%s" for _ in review_ids)
+    cur.execute(
+        _sql(conn, "SELECT DISTINCT bank_id, review_date FROM reviews "
+                   f"WHERE review_id IN ({placeholders}) "
+                   "AND review_id <= %s;"),
+        review_ids + [last_id],
+    )
+    days = cur.fetchall()
+    for bank_id, review_date in days:
+        cur.execute(
+            _sql(conn, "DELETE FROM review_daily_rollup "
+                       "WHERE bank_id = %s AND review_date = %s;"),
+            (bank_id, review_date),
+        )
+        cur.execute(_sql(conn, REFRESH_DAY_SQL),
+                    (bank_id, review_date, last_id))
+    cur.close()
+    return len(days)
+
+
+def rebuild_rollups(conn) -> int:
+    """Drop all rollup rows and fold in every review again."""
+    ensure_rollup_schema(conn)
+    cur = conn.cursor()
+    cur.execute("DELETE FROM review_daily_rollup;")
+    cur.execute(
+        _sql(conn, "DELETE FROM rollup_state WHERE rollup_name = %s;"),
+        (ROLLUP_NAME,),
+    )
+    cur.close()
+    return update_rollups(conn)
+
+
+def read_daily_rollup(conn) -> pd.DataFrame:
+    """The daily rollup rows joined with bank names."""
+    ensure_rollup_schema(conn)
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT b.bank_name, r.review_date, r.rating, r.n_reviews,
+               r.score_sum, r.score_n, r.positive_count,
+               r.negative_count, r.neutral_count
+        FROM review_daily_rollup r
+        JOIN banks b ON b.bank_id = r.bank_id;
+    """)
+    columns = [d[0] for d in cur.description]
+    df = pd.DataFrame(cur.fetchall(), columns=columns)
+    cur.close()
+    df["review_date"] = pd.to_datetime(df["review_date"])
+    return df
+
+
+def _summarize(daily: pd.DataFrame, keys: list) -> pd.DataFrame:
+    sums = daily.groupby(keys, observed=True)[
+        ["n_reviews", "score_sum", "score_n", "rating_sum", "rated_n",
+         "positive_count", "negative_count", "neutral_count"]
+    ].sum()
+    sums["mean_sentiment_score"] = sums["score_sum"] / sums["score_n"]
+    sums["mean_rating"] = sums["rating_sum"] / sums["rated_n"]
+    return sums[["mean_sentiment_score", "mean_rating", "positive_count",
+                 "negative_count", "neutral_count", "n_reviews"]].reset_index()
+
+
+def _with_rating_sums(daily: pd.DataFrame) -> pd.DataFrame:
+    daily = daily.copy()
+    # rating 0 marks reviews without a rating
+    daily["rating_sum"] = daily["rating"] * daily["n_reviews"]
+    daily["rated_n"] = daily["n_reviews"].where(daily["rating"] > 0, 0)
+    return daily
+
+
+def bank_rating_summary(conn) -> pd.DataFrame:
+    """Per bank and rating: mean sentiment score and label counts."""
+    daily = _with_rating_sums(read_daily_rollup(conn))
+    return _summarize(daily, ["bank_name", "rating"]).drop(
+        columns=["mean_rating"])
+
+
+def bank_month_summary(conn) -> pd.DataFrame:
+    """Per bank and month: mean rating, mean sentiment and label counts."""
+    daily = _with_rating_sums(read_daily_rollup(conn))
+    daily["month"] = daily["review_date"].dt.to_period("M")
+    return _summarize(daily, ["bank_name", "month"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Update review rollups.")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="recompute the rollup from all reviews")
+    args = parser.parse_args()
+
+    from src.db import get_connection
+
+    conn = get_connection()
+    try:
+        n = rebuild_rollups(conn) if args.rebuild else update_rollups(conn)
+        conn.commit()
+        print(f"Folded {n} reviews into {ROLLUP_NAME}")
+        print(bank_rating_summary(conn).to_string(index=False))
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
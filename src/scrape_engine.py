@@ -0,0 +1,171 @@
+# src/scrape_engine.py
+"""
+Concurrent scraping engine.
+
+Runs one scrape job per app on a thread pool. Every request to the Play
+endpoint goes through a shared adaptive token bucket: the request rate is
+cut on errors (with exponential backoff before the retry) and slowly
+raised again while requests succeed. Per-app throughput metrics are
+collected for the run summary. An app that still fails after its retries
+is reported in its metrics and does not affect the other apps.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by all scrape workers.
+
+    The refill rate adapts between `min_rate` and `max_rate`: every error
+    halves it and every success raises it by `recovery` requests/sec.
+    """
+
+    def __init__(self, rate=2.0, capacity=4, min_rate=0.2, max_rate=None,
+                 recovery=0.1):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.min_rate = float(min_rate)
+        self.max_rate = float(max_rate if max_rate is not None else rate)
+        self.recovery = float(recovery)
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity,
+                           self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self):
+        """Block until a request token is available."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def on_success(self):
+        """Additive increase of the request rate."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.recovery)
+
+    def on_error(self):
+        """Multiplicative decrease of the request rate."""
+        with self._lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+
+
+def rate_limited(fetch, limiter, metrics, max_retries=5, base_delay=1.0):
+    """
+    Wrap a `google_play_scraper.reviews` compatible function so every call
+    takes a limiter token and failed calls are retried with backoff.
+
+    Args:
+        fetch (callable): Function doing the actual request
+        limiter (TokenBucket): Shared limiter
+        metrics (dict): Per-app counters updated in place
+        max_retries (int): Retries before the error is re-raised
+        base_delay (float): First backoff delay in seconds
+
+    Returns:
+        callable: Wrapped fetch function with the same signature
+    """
+    def wrapped(*args, **kwargs):
+        for attempt in range(max_retries + 1):
+            limiter.acquire()
+            metrics["requests"] += 1
+            try:
+                result = fetch(*args, **kwargs)
+            except Exception:
+                metrics["errors"] += 1
+                limiter.on_error()
+                if attempt == max_retries:
+                    raise
+                # Exponential backoff with jitter
+                time.sleep(base_delay * (2 ** attempt) * random.uniform(1, 2))
+                continue
+            limiter.on_success()
+            return result
+
+    return wrapped
+
+
+def scrape_all(apps, scrape_fn, fetch, limiter=None, max_workers=8,
+               max_retries=5, base_delay=1.0):
+    """
+    Scrape several apps concurrently.
+
+    Args:
+        apps (dict): {bank_name: {"app_id": ..., ...}} as in config/apps.yaml
+        scrape_fn (callable): scrape_fn(bank, info, fetch) -> result; must
+            not sleep between pages since the limiter paces requests
+        fetch (callable): `google_play_scraper.reviews` compatible function
+        limiter (TokenBucket): Shared limiter; a default one is created
+            if omitted
+        max_workers (int): Maximum number of apps scraped at once
+        max_retries (int): Retries per request before the app fails
+        base_delay (float): First retry backoff delay in seconds
+
+    Returns:
+        tuple: ({bank_name: result} for the apps that succeeded,
+            {bank_name: metrics dict}); a failed app's metrics hold the
+            error message under "error"
+    """
+    limiter = limiter or TokenBucket()
+    results = {}
+    metrics = {}
+
+    def run(bank, info):
+        m = {"requests": 0, "errors": 0}
+        metrics[bank] = m
+        start = time.perf_counter()
+        try:
+            return scrape_fn(bank, info, rate_limited(
+                fetch, limiter, m, max_retries, base_delay))
+        finally:
+            m["seconds"] = time.perf_counter() - start
+
+    workers = max(1, min(max_workers, len(apps)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(run, bank, info): bank for bank, info in apps.items()
+        }
+        for future in as_completed(futures):
+            bank = futures[future]
+            try:
+                results[bank] = future.result()
+            except Exception as exc:
+                metrics[bank]["error"] = f"{type(exc).__name__}: {exc}"
+
+    return results, metrics
+
+
+def print_metrics(metrics, counts):
+    """Print per-app throughput given {bank: n_reviews} counts."""
+    for bank in sorted(metrics):
+        m = metrics[bank]
+        seconds = m.get("seconds", 0.0)
+        rate = counts.get(bank, 0) / seconds if seconds > 0 else 0.0
+        if "error" in m:
+            print(f"{bank}: FAILED after {m['requests']} requests "
+                  f"({m['errors']} errors) - {m['error']}")
+            continue
+        print(
+            f"{bank}: {counts.get(bank, 0)} reviews, {m['requests']} "
+            f"requests ({m['errors']} errors) in {seconds:.1f}s "
+            f"- {rate:,.1f} reviews/sec"
+        )
+
+
+def failed_apps(metrics):
+    """Names of the apps whose scrape failed, from scrape_all metrics."""
+    return sorted(bank for bank, m in metrics.items() if "error" in m)
@@ -2,14 +2,57 @@
 """
 Scrape reviews from Google Play Store for multiple bank apps.
 Saves raw reviews to a CSV file.
+
+Incremental mode (`python -m src.scrape_reviews --incremental`) keeps a
+per-app watermark in data/raw/watermarks.json, stops paging as soon as it
+reaches reviews it has already seen and appends only the new rows to a
+store partitioned by bank and review month under data/raw/reviews/.
+
+Apps are read from config/apps.yaml and scraped concurrently through the
+rate-limited engine in src/scrape_engine.py.
 """
 
 from google_play_scraper import Sort, reviews
 import pandas as pd
+import argparse
+import glob
+import json
+import os
+import sys
 import time
+import yaml
+from src.scrape_engine import (TokenBucket, failed_apps, print_metrics,
+                               scrape_all)
+from src.instrumentation import run_report, stage
+from src.storage import parquet_path, write_reviews
+
+APPS_CONFIG = "config/apps.yaml"
+RAW_CSV = "data/raw/raw_reviews.csv"
+RAW_STORE_DIR = "data/raw/reviews"
+WATERMARK_PATH = "data/raw/watermarks.json"
+
+
+def review_to_row(r, bank_name):
+    """
+    Convert a google-play-scraper review dict into a raw CSV row.
 
+    Returns:
+        dict or None: Row dict, or None if the review text is empty
+    """
+    review_text = (r.get("content") or "").strip()
+    if not review_text:
+        return None
+    return {
+        "review": review_text,
+        "rating": r.get("score"),
+        "date": r.get("at"),
+        "bank": bank_name,
+        "source": "Google Play",
+    }
 
-def scrape_bank_reviews(app_id, bank_name, target_count=450, batch_size=200):
+
+def scrape_bank_reviews(app_id, bank_name, target_count=450, batch_size=200,
+                        fetch=reviews, delay=1.0):
     """
     Scrapes reviews for a single bank app from Google Play Store.
 
@@ -18,6 +61,8 @@ def scrape_bank_reviews(app_id, bank_name, target_count=450, batch_size=200):
         bank_name (str): Name of the bank
         target_count (int): Minimum number of reviews to collect
         batch_size (int): Number of reviews per API call
+        fetch (callable): `google_play_scraper.reviews` compatible function
+        delay (float): Seconds to sleep between pages
 
     Returns:
         pd.DataFrame: DataFrame containing scraped reviews
@@ -29,7 +74,7 @@ def scrape_bank_reviews(app_id, bank_name, target_count=450, batch_size=200):
     print(f"Starting scrape for {bank_name}...")
 
     while len(all_reviews) < target_count and attempts < 10:
-        result, token = reviews(
+        result, token = fetch(
             app_id,
             lang="en",
             country="us",
@@ -43,56 +88,365 @@ def scrape_bank_reviews(app_id, bank_name, target_count=450, batch_size=200):
             break
 
         for r in result:
-            review_text = r.get("content", "").strip()
-            if review_text:  # Keep all non-empty reviews
-                all_reviews.append(
-                    {
-                        "review": review_text,
-                        "rating": r.get("score"),
-                        "date": r.get("at"),
-                        "bank": bank_name,
-                        "source": "Google Play",
-                    }
-                )
+            row = review_to_row(r, bank_name)
+            if row:  # Keep all non-empty reviews
+                all_reviews.append(row)
                 if len(all_reviews) >= target_count:
                     break
 
         attempts += 1
-        time.sleep(1)  # Polite delay to avoid API rate limits
+        if delay:
+            time.sleep(delay)  # Polite delay to avoid API rate limits
 
     print(f"{bank_name}: {len(all_reviews)} reviews collected.")
 
     return pd.DataFrame(all_reviews)
 
 
-def main():
+def load_watermarks(path=WATERMARK_PATH):
+    """Load per-app watermarks, or an empty dict on the first run."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_watermarks(watermarks, path=WATERMARK_PATH):
+    """Persist per-app watermarks atomically."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(watermarks, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _is_seen(r, watermark):
+    """True if review `r` is at or behind the stored watermark."""
+    if not watermark:
+        return False
+    at = pd.Timestamp(r.get("at"))
+    latest_at = pd.Timestamp(watermark["latest_at"])
+    if at < latest_at:
+        return True
+    return at == latest_at and r.get("reviewId") in watermark["latest_ids"]
+
+
+def _resume_token(token, batch_size):
+    """Rebuild a continuation token saved as its string form."""
+    from google_play_scraper.features.reviews import _ContinuationToken
+
+    return _ContinuationToken(token, "en", "us", Sort.NEWEST.value,
+                              batch_size, None, None)
+
+
+def _page_until(app_id, stop, token, max_pages, batch_size, fetch, delay):
     """
-    Main function to scrape all banks and save raw CSV.
+    Page newest-first from `token` until a review at or behind the
+    watermark-shaped `stop` dict.
+
+    Returns:
+        tuple: (raw reviews, last token string, status, pages used) with
+            status "caught_up", "ended" (no more pages) or "truncated"
+            (max_pages ran out)
     """
-    apps = {
-        "CBE": {"app_id": "com.combanketh.mobilebanking", "target_count": 800},
-        "BOA": {"app_id": "com.boa.boaMobileBanking", "target_count": 800},
-        "Dashen": {"app_id": "com.dashen.dashensuperapp", "target_count": 800},
-    }
+    found = []
+    pages = 0
+    while pages < max_pages:
+        result, token = fetch(
+            app_id,
+            lang="en",
+            country="us",
+            sort=Sort.NEWEST,
+            count=batch_size,
+            continuation_token=token,
+        )
+        pages += 1
+        for r in result:
+            if _is_seen(r, stop):
+                return found, None, "caught_up", pages
+            found.append(r)
+        if not result or getattr(token, "token", None) is None:
+            return found, None, "ended", pages
+        if delay:
+            time.sleep(delay)  # Polite delay to avoid API rate limits
+    return found, getattr(token, "token", None), "truncated", pages
+
+
+def scrape_bank_reviews_incremental(app_id, bank_name, watermark=None,
+                                    batch_size=200, max_pages=50,
+                                    fetch=reviews, delay=1.0):
+    """
+    Scrapes only reviews newer than the app's watermark.
+
+    Pages through the newest reviews and stops at the first review that
+    is at or behind the watermark, so a daily refresh usually costs one
+    or two requests.
+
+    If `max_pages` runs out before the watermark is reached, the reviews
+    between the oldest one fetched and the old watermark are recorded as
+    a gap in the new watermark, with the continuation token to resume
+    from. Later runs first fetch the new head, then keep paging open gaps
+    with the pages left, so no review is skipped.
+
+    Args:
+        app_id (str): Google Play app ID
+        bank_name (str): Name of the bank
+        watermark (dict): Previous watermark for the app, or None
+        batch_size (int): Number of reviews per API call
+        max_pages (int): Upper bound on API calls for this run
+        fetch (callable): `google_play_scraper.reviews` compatible function
+        delay (float): Seconds to sleep between pages
+
+    Returns:
+        tuple: (pd.DataFrame of new reviews, updated watermark dict)
+    """
+    print(f"Starting incremental scrape for {bank_name}...")
+    watermark = watermark or {}
+
+    head, token, status, pages = _page_until(
+        app_id, watermark if "latest_at" in watermark else None, None,
+        max_pages, batch_size, fetch, delay)
+    fetched = list(head)
+    gaps = []
+    if status == "truncated" and "latest_at" in watermark:
+        # resume here next time, down to the old watermark
+        gaps.append({"token": token,
+                     "latest_at": watermark["latest_at"],
+                     "latest_ids": watermark["latest_ids"]})
+
+    for gap in watermark.get("gaps", []):
+        if pages >= max_pages:
+            gaps.append(gap)
+            continue
+        found, token, status, used = _page_until(
+            app_id, gap, _resume_token(gap["token"], batch_size),
+            max_pages - pages, batch_size, fetch, delay)
+        pages += used
+        fetched += found
+        if status == "truncated":
+            gaps.append(dict(gap, token=token))
+        elif status == "ended":
+            # e.g. an expired token: nothing more can be resumed
+            print(f"{bank_name}: gap down to {gap['latest_at']} could not "
+                  f"be resumed; run a full scrape to fill it.")
+
+    new_reviews = [row for row in (review_to_row(r, bank_name)
+                                   for r in fetched) if row]
+    if head:
+        latest_at = max(pd.Timestamp(r["at"]) for r in head)
+        updated = {
+            "latest_at": latest_at.isoformat(),
+            "latest_ids": [
+                r.get("reviewId") for r in head
+                if pd.Timestamp(r["at"]) == latest_at
+            ],
+        }
+    else:
+        updated = {k: v for k, v in watermark.items()
+                   if k in ("latest_at", "latest_ids")}
+    updated["gaps"] = gaps
 
-    df_list = []
+    print(f"{bank_name}: {len(new_reviews)} new reviews "
+          f"in {pages} request(s).")
+    if gaps:
+        print(f"{bank_name}: {len(gaps)} gap(s) left to resume next run.")
 
-    for bank, info in apps.items():
-        df = scrape_bank_reviews(
+    return pd.DataFrame(new_reviews), updated
+
+
+def append_to_raw_store(df, store_dir=RAW_STORE_DIR):
+    """
+    Append reviews to the raw store, one CSV per bank and review month.
+
+    Returns:
+        list: Partition files that were written to
+    """
+    if df.empty:
+        return []
+    df = df.copy()
+    month = pd.to_datetime(df["date"]).dt.strftime("%Y-%m")
+    written = []
+    for (bank, m), part in df.groupby([df["bank"], month]):
+        part_dir = os.path.join(store_dir, f"bank={bank}")
+        os.makedirs(part_dir, exist_ok=True)
+        part_file = os.path.join(part_dir, f"{m}.csv")
+        part.to_csv(part_file, mode="a", index=False, encoding="utf-8",
+                    header=not os.path.exists(part_file))
+        written.append(part_file)
+    return written
+
+
+def read_raw_store(store_dir=RAW_STORE_DIR):
+    """Read every partition of the raw store into one DataFrame."""
+    files = sorted(glob.glob(os.path.join(store_dir, "bank=*", "*.csv")))
+    if not files:
+        return pd.DataFrame(
+            columns=["review", "rating", "date", "bank", "source"])
+    return pd.concat((pd.read_csv(f) for f in files), ignore_index=True)
+
+
+def load_app_config(path=APPS_CONFIG):
+    """
+    Load the apps to scrape and the scraper settings.
+
+    Returns:
+        dict: Config with "apps", "rate_limit" and "max_workers" keys
+    """
+    with open(path, encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+    if not config.get("apps"):
+        raise ValueError(f"No apps configured in {path}")
+    config.setdefault("rate_limit", {})
+    config.setdefault("max_workers", 8)
+    return config
+
+
+def _make_limiter(config):
+    """Build the shared token bucket from the rate_limit settings."""
+    rate_limit = config["rate_limit"]
+    return TokenBucket(
+        rate=rate_limit.get("requests_per_second", 2.0),
+        capacity=rate_limit.get("burst", 4),
+        min_rate=rate_limit.get("min_requests_per_second", 0.2),
+    )
+
+
+def _scrape_apps(config, scrape_fn, fetch):
+    """Run scrape_all with the limiter and retry settings from config."""
+    rate_limit = config["rate_limit"]
+    return scrape_all(
+        config["apps"], scrape_fn, fetch,
+        limiter=_make_limiter(config),
+        max_workers=config["max_workers"],
+        max_retries=rate_limit.get("max_retries", 5),
+        base_delay=rate_limit.get("retry_base_delay", 1.0),
+    )
+
+
+def _report_failures(failed):
+    """Print the apps whose scrape failed."""
+    if failed:
+        print(f"WARNING: scrape failed for {', '.join(failed)}; "
+              "their previous data was kept.")
+
+
+def main_incremental(config_path=APPS_CONFIG, fetch=reviews):
+    """
+    Incrementally scrape all banks into the raw store and refresh
+    data/raw/raw_reviews.csv from it.
+
+    Apps that fail keep their old watermark and are retried in full on
+    the next run; the other apps are saved as usual.
+
+    Returns:
+        list: Names of the banks whose scrape failed
+    """
+    config = load_app_config(config_path)
+    apps = config["apps"]
+    watermarks = load_watermarks()
+
+    def scrape_fn(bank, info, limited_fetch):
+        return scrape_bank_reviews_incremental(
             info["app_id"],
             bank,
-            target_count=info["target_count"],
+            watermark=watermarks.get(info["app_id"]),
+            fetch=limited_fetch,
+            delay=0,
         )
-        df_list.append(df)
 
-    final_df = pd.concat(df_list, ignore_index=True)
+    with stage("scrape") as st:
+        results, metrics = _scrape_apps(config, scrape_fn, fetch)
+        st.rows_out = sum(len(df) for df, _ in results.values())
+    failed = failed_apps(metrics)
+
+    total_new = 0
+    with stage("append_raw_store", rows_in=st.rows_out):
+        for bank, (df, watermark) in results.items():
+            append_to_raw_store(df)
+            # Commit the watermark only once the rows are on disk
+            watermarks[apps[bank]["app_id"]] = watermark
+            save_watermarks(watermarks)
+            total_new += len(df)
+
+    with stage("write") as st:
+        final_df = read_raw_store()
+        os.makedirs(os.path.dirname(RAW_CSV), exist_ok=True)
+        final_df.to_csv(RAW_CSV, index=False, encoding="utf-8")
+        write_reviews(final_df, parquet_path(RAW_CSV))
+        st.rows_out = len(final_df)
+
+    print_metrics(metrics, {b: len(r[0]) for b, r in results.items()})
+    print(f"Incremental scrape complete. {total_new} new reviews.")
+    print(f"Total reviews in raw store: {len(final_df)}")
+    _report_failures(failed)
+    return failed
+
+
+def main(config_path=APPS_CONFIG, fetch=reviews):
+    """
+    Main function to scrape all banks and save raw CSV.
+
+    Banks whose scrape fails keep their rows from the previous
+    data/raw/raw_reviews.csv, if there is one.
+
+    Returns:
+        list: Names of the banks whose scrape failed
+    """
+    config = load_app_config(config_path)
+    apps = config["apps"]
+
+    def scrape_fn(bank, info, limited_fetch):
+        return scrape_bank_reviews(
+            info["app_id"],
+            bank,
+            target_count=info.get("target_count", 450),
+            fetch=limited_fetch,
+            delay=0,
+        )
+
+    with stage("scrape") as st:
+        results, metrics = _scrape_apps(config, scrape_fn, fetch)
+        st.rows_out = sum(len(df) for df in results.values())
+    failed = failed_apps(metrics)
+    if not results:
+        raise RuntimeError(f"Scrape failed for every app: {', '.join(failed)}")
+
+    previous = pd.DataFrame(columns=["bank"])
+    if failed and os.path.exists(RAW_CSV):
+        previous = pd.read_csv(RAW_CSV)
+
+    # Keep the config order in the output
+    final_df = pd.concat(
+        [results[bank] if bank in results
+         else previous[previous["bank"] == bank]
+         for bank in apps],
+        ignore_index=True,
+    )
 
     # Save raw CSV
-    final_df.to_csv("data/raw/raw_reviews.csv", index=False, encoding="utf-8")
+    with stage("write", rows_in=len(final_df)):
+        os.makedirs(os.path.dirname(RAW_CSV), exist_ok=True)
+        final_df.to_csv(RAW_CSV, index=False, encoding="utf-8")
+        write_reviews(final_df, parquet_path(RAW_CSV))
 
+    print_metrics(metrics, {bank: len(df) for bank, df in results.items()})
     print("Scraping complete. Saved to data/raw/raw_reviews.csv")
     print(f"Total reviews collected: {len(final_df)}")
+    _report_failures(failed)
+    return failed
 
 
 if __name__ == "__main__":
-    main()
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only fetch reviews newer than the stored watermarks",
+    )
+    args = arg_parser.parse_args()
+    with run_report("scrape_reviews"):
+        if args.incremental:
+            failed = main_incremental()
+        else:
+            failed = main()
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,145 @@
+# src/sentiment_cache.py
+"""
+Persistent cache for sentiment classifier results.
+
+Results are stored in a SQLite file keyed by a SHA-256 hash of the model
+name, model revision and normalized review text, so unchanged reviews are
+never sent to the model twice. The cache is size-bounded: once it holds
+more than `max_entries` rows the least recently used ones are evicted.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+import unicodedata
+
+CACHE_PATH = "data/cache/sentiment_cache.sqlite"
+MAX_ENTRIES = 2000000
+QUERY_CHUNK = 500  # keys per SELECT ... IN (...) query
+
+
+def normalize_text(text) -> str:
+    """Normalize unicode and collapse whitespace before hashing."""
+    return " ".join(unicodedata.normalize("NFC", str(text)).split())
+
+
+def model_revision(classifier, default="main") -> str:
+    """Best-effort resolved revision (commit hash) of a pipeline's model."""
+    if getattr(classifier, "revision", None):
+        # ONNX backends and SentimentPool resolve it when they load
+        return classifier.revision
+    config = getattr(getattr(classifier, "model", None), "config", None)
+    return getattr(config, "_commit_hash", None) or default
+
+
+class SentimentCache:
+    """
+    SQLite-backed cache of raw classifier outputs ({"label", "score"}).
+
+    Args:
+        path (str): Cache file location
+        model_name (str): Model identifier, part of every key
+        revision (str): Model revision, part of every key
+        max_entries (int): Rows kept after eviction
+    """
+
+    def __init__(self, path=CACHE_PATH, model_name="", revision="main",
+                 max_entries=MAX_ENTRIES):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS sentiment_cache (
+                key TEXT PRIMARY KEY,
+                label TEXT NOT NULL,
+                score REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_sentiment_cache_last_used
+            ON sentiment_cache (last_used)
+        """)
+        self.conn.commit()
+        self.prefix = f"{model_name}@{revision}\n"
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, text) -> str:
+        """Cache key for a review text."""
+        payload = self.prefix + normalize_text(text)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_many(self, texts) -> list:
+        """
+        Look up cached results.
+
+        Returns:
+            list: One {"label", "score"} dict per text, None on a miss
+        """
+        keys = [self.key(t) for t in texts]
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        for i in range(0, len(unique), QUERY_CHUNK):
+            chunk = unique[i:i + QUERY_CHUNK]
+            rows = self.conn.execute(
+                "SELECT key, label, score FROM sentiment_cache "
+                f"WHERE key IN ({', '.join('?' for _ in chunk)})",
+                chunk,
+            ).fetchall()
+            found.update({k: {"label": lab, "score": sc}
+                          for k, lab, sc in rows})
+
+        if found:
+            now = time.time()
+            self.conn.executemany(
+                "UPDATE sentiment_cache SET last_used = ? WHERE key = ?",
+                [(now, k) for k in found],
+            )
+            self.conn.commit()
+
+        results = [found.get(k) for k in keys]
+        n_hits = sum(r is not None for r in results)
+        self.hits += n_hits
+        self.misses += len(results) - n_hits
+        return results
+
+    def put_many(self, texts, results):
+        """Store classifier results for the given texts and evict."""
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO sentiment_cache "
+            "(key, label, score, last_used) VALUES (?, ?, ?, ?)",
+            [
+                (self.key(t), r["label"], float(r["score"]), now)
+                for t, r in zip(texts, results)
+            ],
+        )
+        self.conn.commit()
+        self.evict()
+
+    def evict(self):
+        """Drop least recently used rows beyond `max_entries`."""
+        (count,) = self.conn.execute(
+            "SELECT COUNT(*) FROM sentiment_cache").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self.conn.execute(
+                "DELETE FROM sentiment_cache WHERE key IN ("
+                "SELECT key FROM sentiment_cache "
+                "ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+            self.conn.commit()
+
+    def summary(self) -> str:
+        """One-line hit/miss summary for the run log."""
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return (f"Sentiment cache: {self.hits} hits, {self.misses} misses "
+                f"({rate:.1%} hit rate)")
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,116 @@
+# src/sentiment_pool.py
+"""
+Multi-process CPU inference pool for the sentiment stage.
+
+Each worker process loads the DistilBERT model once (with any backend from
+src/inference_backends.py) and then classifies whole batches pulled from
+the pool's task queue. Intra-op thread counts are
+split between workers so they do not oversubscribe the cores. The batches
+are built in the parent exactly as the serial path builds them, so the
+results match the serial path.
+"""
+
+import functools
+import multiprocessing as mp
+import os
+import time
+
+_classifier = None  # per-worker classifier
+
+
+def _init_worker(model_name: str, threads: int, backend: str):
+    """Pin thread counts and load the model once per worker."""
+    global _classifier
+    # must be set before torch is imported in this process
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    from src.inference_backends import load_backend
+
+    if backend == "pipeline":
+        import torch
+
+        torch.set_num_threads(threads)
+    _classifier = load_backend(backend, model_name, threads)
+
+
+def _classify_batch(batch: list, **kwargs) -> list:
+    return _classifier(batch, **kwargs)
+
+
+class SentimentPool:
+    """
+    Process pool that can stand in for the classifier in compute_sentiment.
+
+    Args:
+        model_name (str): Hugging Face model id loaded by every worker
+        n_workers (int): Number of worker processes
+        threads_per_worker (int): Intra-op threads per worker; defaults to an
+            even split of the available cores
+        backend (str): Inference backend (see src/inference_backends.py)
+    """
+
+    def __init__(self, model_name: str, n_workers: int,
+                 threads_per_worker: int = None, backend: str = "pipeline"):
+        from transformers import AutoTokenizer
+        from src.inference_backends import prepare_backend, resolve_revision
+
+        # export once here, not concurrently in every worker
+        prepare_backend(backend, model_name)
+        self.backend = backend
+        # model revision for the sentiment cache keys (model_revision)
+        self.revision = resolve_revision(backend, model_name)
+        self.n_workers = max(1, n_workers)
+        self.threads = threads_per_worker or max(
+            1, (os.cpu_count() or 1) // self.n_workers)
+        # tokenizer only, used by the parent to build length buckets
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self._started = time.perf_counter()
+        self._pool = mp.get_context("spawn").Pool(
+            self.n_workers,
+            initializer=_init_worker,
+            initargs=(model_name, self.threads, backend),
+        )
+        self.startup_seconds = None
+        self.steady_seconds = 0.0
+        self.steady_texts = 0
+
+    def map_batches(self, batches: list, **kwargs) -> list:
+        """
+        Classify a list of batches in the pool; results keep order.
+        Keyword arguments (e.g. truncation) are passed to every call.
+        """
+        outputs = []
+        first_done = None
+        n_texts = 0
+        task = functools.partial(_classify_batch, **kwargs)
+        for out in self._pool.imap(task, batches):
+            now = time.perf_counter()
+            if self.startup_seconds is None:
+                # model loading dominates the time to the first result
+                self.startup_seconds = now - self._started
+            if first_done is None:
+                first_done = now
+            else:
+                n_texts += len(out)
+            outputs.append(out)
+        if first_done is not None:
+            self.steady_seconds += time.perf_counter() - first_done
+            self.steady_texts += n_texts
+        return outputs
+
+    def __call__(self, batch: list, **kwargs) -> list:
+        return self.map_batches([batch], **kwargs)[0]
+
+    def summary(self) -> str:
+        """Startup and steady-state throughput for the run log."""
+        rate = (self.steady_texts / self.steady_seconds
+                if self.steady_seconds > 0 else 0.0)
+        startup = self.startup_seconds or 0.0
+        return (f"Sentiment pool ({self.backend}): {self.n_workers} workers x "
+                f"{self.threads} threads, startup {startup:.1f}s, "
+                f"steady state {rate:,.0f} reviews/sec")
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
@@ -0,0 +1,86 @@
+# src/storage.py
+"""
+Typed columnar storage for raw and cleaned reviews.
+
+Reviews are written as zstd-compressed Parquet with categorical
+`bank`/`source`/`lang`, int8 `rating` and a real date column, so later
+stages neither re-parse types nor read columns they do not need. The
+readers accept either Parquet or the legacy CSV files.
+"""
+
+import os
+import pandas as pd
+import pyarrow.parquet as pq
+
+CATEGORICAL_COLUMNS = ["bank", "source", "lang"]
+
+
+def parquet_path(csv_path: str) -> str:
+    """Parquet sibling of a CSV path (clean_reviews.csv -> .parquet)."""
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def prefer_parquet(csv_path: str) -> str:
+    """Return the Parquet sibling of `csv_path` if it exists."""
+    path = parquet_path(csv_path)
+    return path if os.path.exists(path) else csv_path
+
+
+def is_parquet(path: str) -> bool:
+    return path.endswith(".parquet")
+
+
+def to_typed(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast review columns to their compact storage types."""
+    df = df.copy()
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    if "rating" in df.columns:
+        rating = pd.to_numeric(df["rating"])
+        # nullable Int8 only when some ratings are missing
+        df["rating"] = rating.astype("Int8" if rating.isna().any() else "int8")
+    if "date" in df.columns:
+        # CSV round trips write midnight timestamps without a time part
+        df["date"] = pd.to_datetime(df["date"], format="ISO8601")
+    return df
+
+
+def write_reviews(df: pd.DataFrame, path: str):
+    """Write reviews as typed, compressed Parquet."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    to_typed(df).to_parquet(path, index=False, compression="zstd")
+
+
+def available_columns(path: str) -> list:
+    """Column names stored in a Parquet or CSV file."""
+    if is_parquet(path):
+        return pq.read_schema(path).names
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+
+def read_reviews(path: str, columns: list = None) -> pd.DataFrame:
+    """
+    Read reviews from Parquet or CSV, loading only `columns` if given.
+    Columns that are missing from the file are silently skipped.
+    """
+    if columns is not None:
+        stored = set(available_columns(path))
+        columns = [c for c in columns if c in stored]
+    if is_parquet(path):
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
+
+
+def iter_reviews(path: str, chunk_size: int, columns: list = None):
+    """Yield DataFrame chunks of at most `chunk_size` reviews."""
+    if columns is not None:
+        stored = set(available_columns(path))
+        columns = [c for c in columns if c in stored]
+    if is_parquet(path):
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size,
+                                               columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size, usecols=columns)
@@ -0,0 +1,244 @@
+# src/synthetic.py
+"""
+Synthetic Google Play reviews for benchmarks and load tests.
+
+Generated rows look like the scraper output (review, rating, date, bank,
+source) and mimic what the pipeline sees in real data:
+- bank volume shares of the scraped apps (CBE largest),
+- a J-shaped rating skew (mostly 5 and 1 stars), with review wording
+  that follows the rating and mentions the usual themes (login, OTP,
+  transfers, crashes, ...),
+- dates spread over a few years with volume growing towards the end,
+- noise: Amharic / Afaan Oromo reviews, emoji-only and one-word reviews,
+  exact duplicates and punctuation / case variants of earlier reviews.
+
+Generation is vectorized and chunked, so millions of rows can be written
+without holding them all in memory.
+
+Usage:
+    python -m src.synthetic --n 1000000 --out data/raw/raw_reviews.csv
+    python -m src.synthetic --n 100000 --clean \
+        --out data/cleaned/clean_reviews.csv
+"""
+
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+BANK_SHARES = {"CBE": 0.5, "BOA": 0.25, "Dashen": 0.25}
+# probability of 1..5 stars per bank
+RATING_PROBS = {
+    "CBE": [0.28, 0.06, 0.06, 0.08, 0.52],
+    "BOA": [0.38, 0.08, 0.07, 0.07, 0.40],
+    "Dashen": [0.18, 0.04, 0.05, 0.09, 0.64],
+}
+DATE_START = "2022-01-01"
+DATE_END = "2025-06-30"
+NOISE_SHARE = 0.15  # rows replaced by non-English / degenerate / dup text
+CHUNK_SIZE = 500000  # rows generated per chunk by iter_synthetic_reviews
+
+POSITIVE_OPENERS = np.array([
+    "Great app", "Very good app", "I love this app", "Excellent service",
+    "Nice and easy to use", "Best banking app", "Good job", "Amazing app",
+    "Works well", "Really helpful app",
+])
+NEGATIVE_OPENERS = np.array([
+    "Worst app ever", "Very bad app", "This app is useless", "Not working",
+    "Terrible experience", "Please fix this app", "Disappointed",
+    "The app keeps failing", "Poor service", "So frustrating",
+])
+NEUTRAL_OPENERS = np.array([
+    "It is ok", "Average app", "Not bad", "Needs improvement",
+    "Good but", "Fine for now", "Could be better", "Okay app",
+])
+POSITIVE_TOPICS = np.array([
+    "transfers are fast", "the interface is clean and simple",
+    "payment of bills is easy", "checking my balance is quick",
+    "customer support answered quickly", "login with fingerprint works",
+    "the new design looks modern", "airtime top up works every time",
+])
+NEGATIVE_TOPICS = np.array([
+    "login fails every time", "the otp code never arrives",
+    "transfer is slow and sometimes failed", "it crashes after the update",
+    "I cannot see my balance", "customer support does not answer",
+    "payment failed but money was deducted", "there is a bug on the ui",
+    "it says connection error all the time", "the password reset is broken",
+])
+NEUTRAL_TOPICS = np.array([
+    "please add a fingerprint feature", "the design could be nicer",
+    "transfer takes some time", "login is slow sometimes",
+    "add more features like statements", "it needs a dark mode",
+])
+CLOSERS = np.array([
+    "", "", "", ".", "!", " thanks", " please fix it", " 👍", " 🙏",
+    " for real", " since last week", " on my phone", " after the update",
+])
+# free-text details; they make most generated reviews unique
+DETAIL_WORDS = np.array("""
+account agent airtime always amount android app balance bank birr branch
+but call card cash cbe code connection customer daily data days deducted
+deposit device did does error every everything family fee fees find
+fingerprint first fix free friends hours how internet just keep last
+limit loading loan long make many message mobile money month more my
+network never new night number office open otp our password pay payment
+people phone pin please problem qr receipt register reset response
+salary same screen see send service shows sim slow sms statement still
+support system take telebirr time times today transaction transfer
+try trying update use used useful user very wait wallet week when why
+with work working year yesterday
+""".split())
+NOISE_TEXTS = np.array([
+    # Amharic
+    "በጣም ጥሩ መተግበሪያ ነው", "አይሰራም እባካችሁ አስተካክሉ",
+    "ገንዘብ ማስተላለፍ አልቻልኩም", "ምርጥ ባንክ",
+    # Afaan Oromo
+    "Appiin kun baay'ee gaarii dha", "Hin hojjetu maaloo sirreessaa",
+    "Tajaajila gaarii", "Galatoomaa",
+    # emoji only, very short, transliterated Amharic
+    "👍", "👍👍👍", "😡😡", "❤️", "ok", "good", "nice", "wow",
+    "betam arif new", "ayseram",
+])
+
+REVIEW_COLUMNS = ["review", "rating", "date", "bank", "source"]
+
+
+def _pick(rng, choices: np.ndarray, size: int) -> np.ndarray:
+    return choices[rng.integers(0, len(choices), size=size)]
+
+
+def _sentiment_text(rng, ratings: np.ndarray) -> np.ndarray:
+    """Opener + topic + closer, worded after each row's rating."""
+    n = len(ratings)
+    kinds = np.where(ratings >= 4, 0, np.where(ratings <= 2, 1, 2))
+    openers = np.empty(n, dtype=object)
+    topics = np.empty(n, dtype=object)
+    # POSITIVE / NEGATIVE / NEUTRAL wording for 4-5 / 1-2 / 3 stars
+    for kind, (opener, topic) in enumerate([
+        (POSITIVE_OPENERS, POSITIVE_TOPICS),
+        (NEGATIVE_OPENERS, NEGATIVE_TOPICS),
+        (NEUTRAL_OPENERS, NEUTRAL_TOPICS),
+    ]):
+        rows = np.flatnonzero(kinds == kind)
+        openers[rows] = _pick(rng, opener, len(rows))
+        topics[rows] = _pick(rng, topic, len(rows))
+
+    # long tail of review lengths: free-text details of varying length
+    n_words = rng.geometric(0.2, size=n) - 1
+    words = _pick(rng, DETAIL_WORDS, int(n_words.sum())).tolist()
+    ends = np.cumsum(n_words).tolist()
+    details = np.array(
+        [" " + " ".join(words[end - k:end]) if k else ""
+         for k, end in zip(n_words.tolist(), ends)],
+        dtype=object,
+    )
+    return openers + ", " + topics + details + _pick(rng, CLOSERS, n)
+
+
+def _dates(rng, n: int) -> np.ndarray:
+    """Timestamps with volume growing linearly over the date span."""
+    start = pd.Timestamp(DATE_START).value
+    span = pd.Timestamp(DATE_END).value - start
+    # sqrt of a uniform has a linearly increasing density
+    offsets = (np.sqrt(rng.random(n)) * span).astype(np.int64)
+    return (start + offsets).astype("datetime64[ns]").astype("datetime64[s]")
+
+
+def _add_noise(rng, text: np.ndarray, share: float) -> np.ndarray:
+    """Replace a share of rows with noise, duplicates and variants."""
+    n = len(text)
+    noisy = np.flatnonzero(rng.random(n) < share)
+    kind = rng.integers(0, 3, size=len(noisy))
+    # non-English, emoji-only and one-word reviews
+    rows = noisy[kind == 0]
+    text[rows] = _pick(rng, NOISE_TEXTS, len(rows))
+    # exact copies and case / punctuation variants of other reviews
+    for k, suffix in ((1, ""), (2, "!!")):
+        rows = noisy[kind == k]
+        sources = text[rng.integers(0, n, size=len(rows))]
+        if k == 2:
+            sources = np.array([s.upper() for s in sources], dtype=object)
+        text[rows] = sources + suffix
+    return text
+
+
+def generate_reviews(n: int, seed: int = 0, noise: float = NOISE_SHARE,
+                     clean: bool = False) -> pd.DataFrame:
+    """
+    Generate n synthetic reviews.
+
+    Args:
+        n (int): Number of reviews
+        seed (int): Random seed; the same seed gives the same reviews
+        noise (float): Share of rows replaced by noise (ignored if clean)
+        clean (bool): Return rows shaped like preprocess output instead:
+            English only, dates truncated to the day, `lang` column
+
+    Returns:
+        pd.DataFrame: review, rating, date, bank, source (+ lang if clean)
+    """
+    rng = np.random.default_rng(seed)
+    banks = np.array(list(BANK_SHARES))
+    bank = banks[rng.choice(len(banks), size=n,
+                            p=list(BANK_SHARES.values()))]
+    rating = np.empty(n, dtype=np.int64)
+    for b in banks:
+        rows = np.flatnonzero(bank == b)
+        rating[rows] = rng.choice(np.arange(1, 6), size=len(rows),
+                                  p=RATING_PROBS[b])
+    text = _sentiment_text(rng, rating)
+    if not clean and noise > 0:
+        text = _add_noise(rng, text, noise)
+
+    df = pd.DataFrame({
+        "review": text,
+        "rating": rating,
+        "date": _dates(rng, n),
+        "bank": bank,
+        "source": "Google Play",
+    })
+    if clean:
+        df["date"] = df["date"].dt.normalize()
+        df["lang"] = "en"
+    return df
+
+
+def iter_synthetic_reviews(n: int, seed: int = 0, chunk_size: int = CHUNK_SIZE,
+                           **kwargs):
+    """Yield generate_reviews frames of at most chunk_size rows, n in all."""
+    seeds = np.random.SeedSequence(seed).spawn(-(-n // chunk_size) or 1)
+    for i, start in enumerate(range(0, n, chunk_size)):
+        size = min(chunk_size, n - start)
+        chunk_seed = int(seeds[i].generate_state(1)[0])
+        yield generate_reviews(size, seed=chunk_seed, **kwargs)
+
+
+def write_synthetic_reviews(path: str, n: int, seed: int = 0,
+                            chunk_size: int = CHUNK_SIZE, **kwargs) -> int:
+    """Write n synthetic reviews to a CSV, chunk by chunk."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    written = 0
+    for chunk in iter_synthetic_reviews(n, seed, chunk_size, **kwargs):
+        chunk.to_csv(path, mode="w" if written == 0 else "a",
+                     header=written == 0, index=False, encoding="utf-8")
+        written += len(chunk)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic reviews.")
+    parser.add_argument("--n", type=int, default=100000)
+    parser.add_argument("--out", default="data/raw/raw_reviews.csv")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--noise", type=float, default=NOISE_SHARE)
+    parser.add_argument("--clean", action="store_true",
+                        help="write rows shaped like preprocess output")
+    args = parser.parse_args()
+
+    n = write_synthetic_reviews(args.out, args.n, seed=args.seed,
+                                noise=args.noise, clean=args.clean)
+    print(f"Wrote {n} synthetic reviews to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,22 +7,34 @@ Outputs:
  - data/processed/reviews_sentiment_themes.csv
  - data/processed/sentiment_summary.csv
  - data/processed/themes_keywords_by_bank.csv
+ - data/processed/theme_clusters.csv (unsupervised themes: HashingVectorizer
+   + MiniBatchKMeans, assigned as cluster_id / cluster_terms per review)
+
+`--stream` processes the input in chunks through generator stages and
+appends each finished chunk to the output, so memory stays bounded and an
+interrupted run resumes from the last committed chunk.
 """
 
-from transformers import pipeline
 import pandas as pd
 import numpy as np
+import argparse
+import json
 import os
-from tqdm import tqdm
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import KMeans
-import spacy
-# from task2_utils import is_english
-from src.task2_utils import is_english
-
-
-# Ensure reproducible progress bar behavior
-tqdm.pandas()
+# from task2_utils import filter_english
+from src.task2_utils import filter_english
+from src.instrumentation import run_report, stage, timed
+from src.inference_backends import cache_model_name, load_backend
+from src.sentiment_cache import CACHE_PATH, SentimentCache, model_revision
+from src.sentiment_pool import SentimentPool
+from src.theme_matcher import ThemeMatcher
+from src.theme_discovery import discover_themes, discover_themes_csv
+from src.keyword_engine import (
+    INDEX_DIR as KEYWORD_INDEX,
+    META_COLUMNS as KEYWORD_META_COLUMNS,
+    KeywordIndex,
+    build_index,
+)
+from src.storage import iter_reviews, prefer_parquet, read_reviews
 
 # ---- CONFIG ----
 INPUT_CLEAN = "data/cleaned/clean_reviews.csv"
@@ -30,108 +42,254 @@ OUT_DIR = "data/processed"
 OUT_REVIEWS = os.path.join(OUT_DIR, "reviews_sentiment_themes.csv")
 OUT_SUMMARY = os.path.join(OUT_DIR, "sentiment_summary.csv")
 OUT_KEYWORDS = os.path.join(OUT_DIR, "themes_keywords_by_bank.csv")
+OUT_CLUSTERS = os.path.join(OUT_DIR, "theme_clusters.csv")
+STREAM_CHECKPOINT = os.path.join(OUT_DIR, "task2_stream_checkpoint.json")
+STREAM_CHUNK_SIZE = 5000  # reviews per chunk in streaming mode
 
 DISTILBERT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
-BATCH_SIZE = 32  # model batch size for inference
+MAX_BATCH_SIZE = 256  # upper bound for batches of very short reviews
+MAX_BATCH_TOKENS = 4096  # padded tokens per batch (size x longest review)
+# longer reviews are truncated to DistilBERT's 512 position embeddings
+MAX_TOKENS = 512
+SENTIMENT_LABELS = ["POSITIVE", "NEGATIVE", "NEUTRAL"]
+USE_SENTIMENT_CACHE = True  # reuse results for unchanged reviews
+# worker processes for CPU inference (1 = run in this process)
+SENTIMENT_WORKERS = int(os.getenv("SENTIMENT_WORKERS", "1"))
+# pipeline (PyTorch), onnx (ONNX Runtime) or int8 (quantized ONNX); see
+# src/inference_backends.py
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "pipeline")
 
 # ---- Ensure output dir exists ----
 os.makedirs(OUT_DIR, exist_ok=True)
 
 
-def load_data(path: str) -> pd.DataFrame:
-    """Load cleaned reviews CSV."""
-    df = pd.read_csv(path)
-    # Basic guard: ensure expected columns exist
-    expected = {"review", "rating", "date", "bank", "source"}
+INPUT_COLUMNS = ["review", "rating", "date", "bank", "source"]
+OPTIONAL_COLUMNS = ["lang"]  # written by preprocess when available
+
+
+def _check_columns(df: pd.DataFrame):
+    """Basic guard: ensure expected columns exist."""
+    expected = set(INPUT_COLUMNS)
     if not expected.issubset(set(df.columns)):
         raise ValueError(f"Input CSV must contain columns: {expected}")
-    # Keep minimal columns
-    return df[["review", "rating", "date", "bank", "source"]].copy()
 
 
-def init_sentiment_model():
-    """Initialize transformers sentiment pipeline (DistilBERT)."""
-    # This will download model weights first time if not cached
-    classifier = pipeline("sentiment-analysis", model=DISTILBERT_MODEL)
-    return classifier
+@timed()
+def load_data(path: str) -> pd.DataFrame:
+    """
+    Load cleaned reviews, preferring the typed Parquet copy of `path`.
+    Only the columns used by the pipeline are read.
+    """
+    df = read_reviews(prefer_parquet(path),
+                      columns=INPUT_COLUMNS + OPTIONAL_COLUMNS)
+    _check_columns(df)
+    return df
 
 
-def compute_sentiment(df: pd.DataFrame, classifier) -> pd.DataFrame:
-    """Apply classification in batches and add label/score columns."""
+def init_sentiment_model(n_workers: int = 1,
+                         backend: str = SENTIMENT_BACKEND):
+    """
+    Initialize the DistilBERT sentiment classifier on `backend`
+    (transformers pipeline by default).
+    With n_workers > 1, return a SentimentPool of worker processes instead.
+    """
+    if n_workers > 1:
+        return SentimentPool(DISTILBERT_MODEL, n_workers, backend=backend)
+    # loaded lazily and shared process-wide by the model registry
+    return load_backend(backend, DISTILBERT_MODEL)
+
+
+def token_lengths(texts: list, classifier) -> list:
+    """Token count per text, using the pipeline tokenizer when available."""
+    tokenizer = getattr(classifier, "tokenizer", None)
+    if tokenizer is None:
+        # rough estimate: words + [CLS]/[SEP]
+        return [len(t.split()) + 2 for t in texts]
+    input_ids = tokenizer(texts, truncation=True,
+                          max_length=MAX_TOKENS)["input_ids"]
+    return [len(ids) for ids in input_ids]
+
+
+def make_length_batches(lengths: list, max_batch_size: int = MAX_BATCH_SIZE,
+                        max_tokens: int = MAX_BATCH_TOKENS) -> list:
+    """
+    Group text indices into batches of similar length.
+
+    Indices are sorted by length and a batch is closed once adding the
+    next text would exceed `max_batch_size` texts or `max_tokens` padded
+    tokens, so short reviews share large batches and long ones small.
+    """
+    order = sorted(range(len(lengths)), key=lengths.__getitem__)
+    batches = []
+    current = []
+    for i in order:
+        # sorted ascending, so the new text is the longest in the batch
+        padded = lengths[i] * (len(current) + 1)
+        if current and (len(current) >= max_batch_size
+                        or padded > max_tokens):
+            batches.append(current)
+            current = []
+        current.append(i)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def classify_texts(texts: list, classifier) -> list:
+    """
+    Classify texts in length-bucketed batches; results keep input order.
+    Reviews longer than MAX_TOKENS tokens are truncated.
+    """
+    if not texts:
+        return []
+    results = [None] * len(texts)
+    lengths = token_lengths(texts, classifier)
+    batch_indices = make_length_batches(lengths)
+    batches = [[texts[i] for i in idx] for idx in batch_indices]
+    # a SentimentPool classifies the same batches across processes
+    map_batches = getattr(classifier, "map_batches", None)
+    if map_batches:
+        outputs = map_batches(batches, truncation=True,
+                              max_length=MAX_TOKENS)
+    else:
+        outputs = (classifier(batch, truncation=True, max_length=MAX_TOKENS)
+                   for batch in batches)
+    for batch_idx, out in zip(batch_indices, outputs):
+        for i, res in zip(batch_idx, out):
+            results[i] = res
+    return results
+
+
+def classify_with_cache(texts: list, classifier, cache) -> list:
+    """Classify texts, sending only cache misses to the model."""
+    results = cache.get_many(texts)
+    miss_idx = [i for i, res in enumerate(results) if res is None]
+    if miss_idx:
+        # classify each distinct missing text once
+        miss_texts = list(dict.fromkeys(texts[i] for i in miss_idx))
+        fresh = classify_texts(miss_texts, classifier)
+        cache.put_many(miss_texts, fresh)
+        by_text = dict(zip(miss_texts, fresh))
+        for i in miss_idx:
+            results[i] = by_text[texts[i]]
+    return results
+
+
+@timed()
+def compute_sentiment(df: pd.DataFrame, classifier,
+                      cache=None) -> pd.DataFrame:
+    """
+    Apply classification in batches and add label/score columns.
+    If a SentimentCache is given, only uncached reviews hit the model.
+    """
     reviews = df["review"].astype(str).tolist()
     labels = []
     scores = []
 
-    # iterate in batches
-    for i in range(0, len(reviews), BATCH_SIZE):
-        batch = reviews[i : i + BATCH_SIZE]
-        results = classifier(batch)
-        for res in results:
-            lab = res.get("label", "POSITIVE")
-            score = float(res.get("score", 0.0))
-            # map to numeric score: POSITIVE -> positive, NEGATIVE -> negative
-            if lab == "NEGATIVE":
-                numeric = -score
-            else:
-                numeric = score
-            # apply a heuristic for NEUTRAL: low confidence near 0.5
-            if score < 0.60:
-                sentiment_label = "NEUTRAL"
-                sentiment_score = 0.0
-            else:
-                sentiment_label = lab
-                sentiment_score = numeric
-            labels.append(sentiment_label)
-            scores.append(sentiment_score)
-
-    df["sentiment_label"] = labels
+    if cache is not None:
+        results = classify_with_cache(reviews, classifier, cache)
+    else:
+        results = classify_texts(reviews, classifier)
+
+    for res in results:
+        lab = res.get("label", "POSITIVE")
+        score = float(res.get("score", 0.0))
+        # map to numeric score: POSITIVE -> positive, NEGATIVE -> negative
+        if lab == "NEGATIVE":
+            numeric = -score
+        else:
+            numeric = score
+        # apply a heuristic for NEUTRAL: low confidence near 0.5
+        if score < 0.60:
+            sentiment_label = "NEUTRAL"
+            sentiment_score = 0.0
+        else:
+            sentiment_label = lab
+            sentiment_score = numeric
+        labels.append(sentiment_label)
+        scores.append(sentiment_score)
+
+    # categorical labels let aggregate_sentiment skip hashing strings
+    df["sentiment_label"] = pd.Categorical(labels, categories=SENTIMENT_LABELS)
     df["sentiment_score"] = scores
     return df
 
 
-def aggregate_sentiment(df: pd.DataFrame) -> pd.DataFrame:
-    """Aggregate sentiment by bank and rating."""
-    agg = (
-        df.groupby(["bank", "rating"])
-        .agg(
-            mean_sentiment_score=("sentiment_score", "mean"),
-            positive_count=("sentiment_label", lambda x: (x == "POSITIVE").sum()),
-            negative_count=("sentiment_label", lambda x: (x == "NEGATIVE").sum()),
-            neutral_count=("sentiment_label", lambda x: (x == "NEUTRAL").sum()),
-            n_reviews=("sentiment_label", "count"),
-        )
-        .reset_index()
-    )
-    return agg
-
+@timed()
+def aggregate_sentiment(df: pd.DataFrame,
+                        dims=("bank", "rating")) -> pd.DataFrame:
+    """
+    Aggregate sentiment by bank and rating, or by any other `dims`
+    (e.g. add a month column, or group an exploded theme column).
 
-def preprocess_for_tfidf(texts):
-    """Minimal preprocess for TF-IDF: lowercase & remove extra spaces."""
-    return [str(t).lower().strip() for t in texts]
+    Each review gets one integer cell code for its combination of `dims`
+    values; label counts are then a single np.bincount over
+    (cell, label code) pairs instead of one comparison pass per label
+    and group.
+    """
+    dims = list(dims)
+    key_codes, key_levels = [], []
+    for dim in dims:
+        codes, levels = pd.factorize(df[dim], sort=True)
+        key_codes.append(codes)
+        key_levels.append(levels)
+    # reviews with a missing key are dropped, as groupby does
+    keep = np.logical_and.reduce([codes >= 0 for codes in key_codes])
+    shape = tuple(max(len(levels), 1) for levels in key_levels)
+    cell = np.ravel_multi_index([codes[keep] for codes in key_codes], shape)
+    occurring = None
+    if np.prod(shape, dtype=np.float64) > max(len(cell), 1):
+        # sparse combinations: number only the cells that occur
+        occurring, cell = np.unique(cell, return_inverse=True)
+
+    # same cython mean as groupby, so results match it exactly
+    mean_score = pd.Series(
+        df["sentiment_score"].to_numpy(dtype=np.float64)[keep]
+    ).groupby(cell).mean()
+    cells = mean_score.index.to_numpy()
+    n_cells = int(cell.max()) + 1 if len(cell) else 0
+
+    # one hashing pass over the labels; code -1 marks a missing label and
+    # picks the trailing -1 of `lookup`, as do labels outside the set
+    raw_codes, raw_labels = pd.factorize(df["sentiment_label"])
+    raw_codes = raw_codes[keep]
+    lookup = np.array([SENTIMENT_LABELS.index(lab)
+                       if lab in SENTIMENT_LABELS else -1
+                       for lab in raw_labels] + [-1], dtype=np.int64)
+    label_codes = lookup[raw_codes]
+    labelled = label_codes >= 0
+    counts = np.bincount(
+        cell[labelled] * len(SENTIMENT_LABELS) + label_codes[labelled],
+        minlength=n_cells * len(SENTIMENT_LABELS),
+    ).reshape(n_cells, len(SENTIMENT_LABELS))[cells]
+    n_reviews = np.bincount(cell[raw_codes >= 0], minlength=n_cells)[cells]
+
+    flat_cells = cells if occurring is None else occurring[cells]
+    positions = np.unravel_index(flat_cells, shape)
+
+    agg = pd.DataFrame({
+        dim: levels.take(pos)
+        for dim, levels, pos in zip(dims, key_levels, positions)
+    })
+    agg["mean_sentiment_score"] = mean_score.to_numpy()
+    for j, lab in enumerate(SENTIMENT_LABELS):
+        agg[f"{lab.lower()}_count"] = counts[:, j]
+    agg["n_reviews"] = n_reviews
+    return agg
 
 
-def extract_tfidf_keywords(df: pd.DataFrame, top_n: int = 20) -> pd.DataFrame:
+@timed()
+def extract_tfidf_keywords(df: pd.DataFrame, top_n: int = 20,
+                           index: KeywordIndex = None) -> pd.DataFrame:
     """
-    Compute TF-IDF across the corpus grouped by bank.
+    Top TF-IDF keywords per bank, from one vocabulary and IDF fitted on
+    the whole corpus. Pass a KeywordIndex already built from `df` to skip
+    tokenizing it again.
     Return a DataFrame with bank and top keywords.
     """
-    ngram_range = (1, 2)
-    vectorizer = TfidfVectorizer(max_features=2000, ngram_range=ngram_range)
-    df["clean_text"] = preprocess_for_tfidf(df["review"].tolist())
-
-    keywords_rows = []
-    for bank in df["bank"].unique():
-        bank_texts = df.loc[df["bank"] == bank, "clean_text"].tolist()
-        if not bank_texts:
-            continue
-        X = vectorizer.fit_transform(bank_texts)
-        feature_names = vectorizer.get_feature_names_out()
-        # sum TF-IDF over docs to get importance by corpus
-        sums = np.asarray(X.sum(axis=0)).ravel()
-        indices = sums.argsort()[::-1][:top_n]
-        top_kw = [feature_names[i] for i in indices]
-        keywords_rows.append({"bank": bank, "top_keywords": "; ".join(top_kw)})
-    return pd.DataFrame(keywords_rows)
+    if index is None:
+        index = build_index(df)
+    return index.top_keywords("bank", top_n)
 
 
 def map_keywords_to_themes(df_keywords: pd.DataFrame) -> dict:
@@ -163,47 +321,232 @@ def map_keywords_to_themes(df_keywords: pd.DataFrame) -> dict:
     return mapping
 
 
+@timed()
 def assign_themes_to_reviews(df: pd.DataFrame, mapping: dict) -> pd.DataFrame:
     """Assign themes to each review using presence of mapped keywords."""
-    # load spaCy for tokenization/lemmatization
-    nlp = spacy.load("en_core_web_sm", disable=["ner", "parser"])
-    theme_list = []
-
-    # lower keys for matching
-    lower_map = {k.lower(): v for k, v in mapping.items()}
-    kw_set = list(lower_map.keys())
-
-    for text in tqdm(df["review"].astype(str), desc="Assigning themes"):
-        text_l = text.lower()
-        assigned = set()
-        # quick substring matching (fast and interpretable)
-        for kw in kw_set:
-            if kw in text_l:
-                assigned.add(lower_map[kw])
-        if not assigned:
-            assigned.add("Other")
-        theme_list.append("; ".join(sorted(assigned)))
-    df["themes"] = theme_list
+    # one compiled word-prefix pattern for all keywords
+    matcher = ThemeMatcher(mapping)
+    df["themes"] = matcher.match_series(df["review"])
     return df
 
 
+def open_sentiment_model():
+    """Create the classifier (or worker pool) and the optional cache."""
+    print("Initializing sentiment model (this may take a moment)...")
+    classifier = init_sentiment_model(SENTIMENT_WORKERS, SENTIMENT_BACKEND)
+    cache = None
+    if USE_SENTIMENT_CACHE:
+        model_name = cache_model_name(DISTILBERT_MODEL, SENTIMENT_BACKEND)
+        cache = SentimentCache(CACHE_PATH, model_name=model_name,
+                               revision=model_revision(classifier))
+    return classifier, cache
+
+
+def close_sentiment_model(classifier, cache):
+    """Print cache / pool statistics and release their resources."""
+    if cache is not None:
+        print(cache.summary())
+        cache.close()
+    if isinstance(classifier, SentimentPool):
+        print(classifier.summary())
+        classifier.close()
+
+
+# ---- Streaming mode ----
+def read_chunks(path: str, chunk_size: int, start_chunk: int = 0):
+    """Yield (chunk_index, DataFrame) pairs, skipping committed chunks."""
+    chunks = iter_reviews(prefer_parquet(path), chunk_size,
+                          columns=INPUT_COLUMNS + OPTIONAL_COLUMNS)
+    for idx, chunk in enumerate(chunks):
+        if idx < start_chunk:
+            continue
+        _check_columns(chunk)
+        yield idx, chunk.reset_index(drop=True)
+
+
+def filter_english_stage(chunks):
+    for idx, df in chunks:
+        yield idx, filter_english(df)
+
+
+def sentiment_stage(chunks, classifier, cache=None):
+    for idx, df in chunks:
+        yield idx, compute_sentiment(df, classifier, cache=cache)
+
+
+def theme_stage(chunks, mapping: dict):
+    for idx, df in chunks:
+        yield idx, assign_themes_to_reviews(df, mapping)
+
+
+FRESH_CHECKPOINT = {"chunks_done": 0, "rows_written": 0, "output_bytes": 0}
+
+
+def input_identity(path: str) -> dict:
+    """Path, size and mtime of the file a streaming run reads."""
+    info = os.stat(path)
+    return {"path": os.path.abspath(path), "size": info.st_size,
+            "mtime_ns": info.st_mtime_ns}
+
+
+def load_checkpoint(path: str = STREAM_CHECKPOINT) -> dict:
+    """Return the last streaming checkpoint, or a fresh one."""
+    if not os.path.exists(path):
+        return dict(FRESH_CHECKPOINT)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(state: dict, path: str = STREAM_CHECKPOINT):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+@timed()
+def aggregate_sentiment_chunked(path: str,
+                                chunk_size: int = STREAM_CHUNK_SIZE):
+    """aggregate_sentiment over a CSV, read chunk by chunk."""
+    partials = []
+    for chunk in pd.read_csv(
+        path, chunksize=chunk_size,
+        usecols=["bank", "rating", "sentiment_label", "sentiment_score"],
+    ):
+        for lab in SENTIMENT_LABELS:
+            chunk[lab] = chunk["sentiment_label"] == lab
+        partials.append(
+            chunk.groupby(["bank", "rating"]).agg(
+                score_sum=("sentiment_score", "sum"),
+                score_n=("sentiment_score", "count"),
+                positive_count=("POSITIVE", "sum"),
+                negative_count=("NEGATIVE", "sum"),
+                neutral_count=("NEUTRAL", "sum"),
+                n_reviews=("sentiment_label", "count"),
+            )
+        )
+    agg = pd.concat(partials).groupby(level=["bank", "rating"]).sum()
+    agg.insert(0, "mean_sentiment_score", agg["score_sum"] / agg["score_n"])
+    return agg.drop(columns=["score_sum", "score_n"]).reset_index()
+
+
+def run_streaming(input_path: str = INPUT_CLEAN,
+                  chunk_size: int = STREAM_CHUNK_SIZE, resume: bool = True):
+    """
+    Run Task-2 chunk by chunk with bounded memory.
+
+    Each chunk flows through language filtering, sentiment and theme
+    assignment, is appended to OUT_REVIEWS, and then the checkpoint is
+    committed. On resume, output written after the last checkpoint is
+    truncated and processing restarts at the next chunk.
+
+    The checkpoint records the chunk size and the input file's identity;
+    if either changed since it was written, the run starts fresh, since
+    chunk numbers would no longer line up with the output.
+    """
+    run = {"chunk_size": chunk_size,
+           "input": input_identity(prefer_parquet(input_path))}
+    state = load_checkpoint() if resume else dict(FRESH_CHECKPOINT)
+    if state["chunks_done"] and any(state.get(k) != v
+                                    for k, v in run.items()):
+        print("Checkpoint was written for a different input or chunk "
+              "size; starting fresh.")
+        state = dict(FRESH_CHECKPOINT)
+    keyword_index = KeywordIndex()
+    if state["chunks_done"]:
+        print(f"Resuming after chunk {state['chunks_done']} "
+              f"({state['rows_written']} reviews already written)...")
+        with open(OUT_REVIEWS, "r+b") as f:
+            f.truncate(state["output_bytes"])
+        # re-tokenize the committed output once instead of saving the
+        # keyword index after every chunk; chunked, like the run itself
+        with stage("keyword_index", rows_in=state["rows_written"]):
+            for part in pd.read_csv(
+                    OUT_REVIEWS, chunksize=chunk_size,
+                    usecols=lambda c: c in ["review"] + KEYWORD_META_COLUMNS):
+                keyword_index.add(
+                    part["review"],
+                    part.reindex(columns=KEYWORD_META_COLUMNS))
+    elif os.path.exists(OUT_REVIEWS):
+        os.remove(OUT_REVIEWS)
+
+    classifier, cache = open_sentiment_model()
+    mapping = map_keywords_to_themes(pd.DataFrame())
+
+    chunks = read_chunks(input_path, chunk_size, state["chunks_done"])
+    chunks = filter_english_stage(chunks)
+    chunks = sentiment_stage(chunks, classifier, cache)
+    chunks = theme_stage(chunks, mapping)
+
+    try:
+        for idx, df in chunks:
+            with stage("write", rows_in=len(df)):
+                df.to_csv(OUT_REVIEWS, mode="a", index=False,
+                          encoding="utf-8",
+                          header=state["output_bytes"] == 0)
+            with stage("keyword_index", rows_in=len(df)):
+                keyword_index.add(df["review"],
+                                  df.reindex(columns=KEYWORD_META_COLUMNS))
+            state = {
+                **run,
+                "chunks_done": idx + 1,
+                "rows_written": state["rows_written"] + len(df),
+                "output_bytes": os.path.getsize(OUT_REVIEWS),
+            }
+            save_checkpoint(state)
+            print(f"Chunk {idx + 1}: {state['rows_written']} reviews written")
+    finally:
+        close_sentiment_model(classifier, cache)
+
+    if state["rows_written"] == 0:
+        print("No reviews to process.")
+        return
+
+    print("Aggregating sentiment by bank and rating...")
+    aggregate_sentiment_chunked(OUT_REVIEWS, chunk_size).to_csv(
+        OUT_SUMMARY, index=False, encoding="utf-8")
+
+    print("Extracting top TF-IDF keywords per bank...")
+    with stage("keyword_index"):
+        keyword_index.save(KEYWORD_INDEX)
+    kw_df = extract_tfidf_keywords(None, top_n=30, index=keyword_index)
+    kw_df.to_csv(OUT_KEYWORDS, index=False, encoding="utf-8")
+
+    # every chunk is committed; the next run starts from scratch
+    os.remove(STREAM_CHECKPOINT)
+
+    # two more streaming passes over the output: fit, then assign
+    print("Discovering themes with online clustering...")
+    discover_themes_csv(OUT_REVIEWS).to_csv(
+        OUT_CLUSTERS, index=False, encoding="utf-8")
+
+    print("Task-2 (streaming) completed.")
+    print(f"Wrote: {OUT_REVIEWS}")
+    print(f"Wrote: {OUT_SUMMARY}")
+    print(f"Wrote: {OUT_KEYWORDS}")
+    print(f"Wrote: {OUT_CLUSTERS}")
+
+
 def main():
     """Run Task-2 pipeline end-to-end."""
     print("Loading cleaned reviews...")
     df = load_data(INPUT_CLEAN)
 
-    # optional: ensure English only (most cleaned data already English)
-    df = df[df["review"].apply(is_english)].reset_index(drop=True)
+    # optional: ensure English only (skipped when preprocess stored `lang`)
+    df = filter_english(df)
 
     # Sentiment
-    print("Initializing sentiment model (this may take a moment)...")
-    classifier = init_sentiment_model()
+    classifier, cache = open_sentiment_model()
     print("Computing sentiment for reviews...")
-    df = compute_sentiment(df, classifier)
+    try:
+        df = compute_sentiment(df, classifier, cache=cache)
+    finally:
+        close_sentiment_model(classifier, cache)
 
     # Save intermediate
-    df.to_csv(os.path.join(OUT_DIR, "reviews_with_sentiment.csv"),
-              index=False, encoding="utf-8")
+    with stage("write", rows_in=len(df)):
+        df.to_csv(os.path.join(OUT_DIR, "reviews_with_sentiment.csv"),
+                  index=False, encoding="utf-8")
 
     # Aggregation
     print("Aggregating sentiment by bank and rating...")
@@ -212,20 +555,49 @@ def main():
 
     # Thematic (keywords + rule mapping)
     print("Extracting top TF-IDF keywords per bank...")
-    kw_df = extract_tfidf_keywords(df, top_n=30)
+    keyword_index = build_index(df)
+    with stage("keyword_index"):
+        keyword_index.save(KEYWORD_INDEX)
+    kw_df = extract_tfidf_keywords(df, top_n=30, index=keyword_index)
     kw_df.to_csv(OUT_KEYWORDS, index=False, encoding="utf-8")
 
     print("Mapping keywords to themes and assigning to reviews...")
     mapping = map_keywords_to_themes(kw_df)
     df = assign_themes_to_reviews(df, mapping)
 
+    print("Discovering themes with online clustering...")
+    df, clusters = discover_themes(df)
+    clusters.to_csv(OUT_CLUSTERS, index=False, encoding="utf-8")
+
     # Final save
-    df.to_csv(OUT_REVIEWS, index=False, encoding="utf-8")
+    with stage("write", rows_in=len(df)):
+        df.to_csv(OUT_REVIEWS, index=False, encoding="utf-8")
     print("Task-2 completed.")
     print(f"Wrote: {OUT_REVIEWS}")
     print(f"Wrote: {OUT_SUMMARY}")
     print(f"Wrote: {OUT_KEYWORDS}")
+    print(f"Wrote: {OUT_CLUSTERS}")
 
 
 if __name__ == "__main__":
-    main()
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="process the input in chunks and resume after a crash",
+    )
+    arg_parser.add_argument(
+        "--chunk-size", type=int, default=STREAM_CHUNK_SIZE,
+        help="reviews per chunk in streaming mode",
+    )
+    arg_parser.add_argument(
+        "--restart", action="store_true",
+        help="ignore the streaming checkpoint and start over",
+    )
+    args = arg_parser.parse_args()
+    with run_report("task2_sentiment_theme"):
+        if args.stream:
+            run_streaming(chunk_size=args.chunk_size,
+                          resume=not args.restart)
+        else:
+            main()
@@ -3,15 +3,25 @@
 Helper utilities for Task-2: sentiment and thematic analysis.
 """
 
-from langdetect.lang_detect_exception import LangDetectException
-from langdetect import detect, DetectorFactory
-
-DetectorFactory.seed = 0
+import pandas as pd
+from src.instrumentation import timed
+from src.langid import detect_language, detect_languages
 
 
 def is_english(text: str) -> bool:
     """Return True if text is detected as English, else False."""
-    try:
-        return detect(str(text)) == "en"
-    except LangDetectException:
-        return False
+    return detect_language(text) == "en"
+
+
+@timed()
+def filter_english(df: pd.DataFrame, n_jobs: int = 1) -> pd.DataFrame:
+    """
+    Keep English reviews only. Reuses the `lang` column written by
+    preprocess when present instead of detecting the language again.
+    """
+    if "lang" in df.columns:
+        langs = df["lang"]
+    else:
+        langs = pd.Series(detect_languages(df["review"], n_jobs=n_jobs),
+                          index=df.index)
+    return df[langs == "en"].reset_index(drop=True)
@@ -2,87 +2,43 @@
 """
 Task 4: Insights and Recommendations
 Generates insights, visualizations, and recommendations for CBE, BOA, and Dashen bank reviews.
+
+Charts are independent jobs rendered by a process pool with the
+non-interactive Agg backend. Each job's input data is fingerprinted and
+a chart is skipped when its PNG exists and the fingerprint matches the
+previous run (outputs/task4/chart_cache.json); use --force to redraw all.
+
+Usage:
+    python -m src.task4_insights
+    python -m src.task4_insights --workers 4 --force
 """
 
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from wordcloud import WordCloud
+import argparse
+import hashlib
+import json
 import os
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from src.instrumentation import run_report, stage
 
 # -----------------------------
 # Config
 # -----------------------------
-DATA_PATH = '../data/processed/reviews_sentiment_themes.csv'
-OUTPUT_DIR = '../outputs/task4'
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-sns.set(style="whitegrid")
-
-# -----------------------------
-# Load processed data
-# -----------------------------
-df = pd.read_csv(DATA_PATH)
-df['review_date'] = pd.to_datetime(df['review_date'])
-
-# -----------------------------
-# 1️⃣ Rating distribution per bank
-# -----------------------------
-plt.figure(figsize=(8,5))
-sns.boxplot(data=df, x='bank_name', y='rating', palette='Set2')
-plt.title('Rating Distribution per Bank', fontsize=14)
-plt.xlabel('Bank', fontsize=12)
-plt.ylabel('Rating', fontsize=12)
-plt.savefig(os.path.join(OUTPUT_DIR, 'rating_distribution.png'))
-plt.close()
-
-# -----------------------------
-# 2️⃣ Sentiment trend over time (monthly)
-# -----------------------------
-df['month'] = df['review_date'].dt.to_period('M')
-sentiment_trend = df.groupby(['bank_name', 'month'])['sentiment_score'].mean().reset_index()
-
-plt.figure(figsize=(10,6))
-sns.lineplot(data=sentiment_trend, x='month', y='sentiment_score', hue='bank_name', marker='o')
-plt.title('Sentiment Trend Over Time per Bank', fontsize=14)
-plt.xlabel('Month', fontsize=12)
-plt.ylabel('Average Sentiment Score', fontsize=12)
-plt.xticks(rotation=45)
-plt.legend(title='Bank')
-plt.savefig(os.path.join(OUTPUT_DIR, 'sentiment_trend.png'))
-plt.close()
-
-# -----------------------------
-# 3️⃣ WordCloud per bank
-# -----------------------------
-for bank in df['bank_name'].unique():
-    # Replace 'theme_keywords' with the correct column name in your CSV
-    text = " ".join(df[df['bank_name']==bank]['theme_keywords'].dropna().astype(str))
-    if text.strip():  # Only generate if text exists
-        wc = WordCloud(width=800, height=400, background_color='white', colormap='Set2').generate(text)
-        plt.figure(figsize=(10,5))
-        plt.imshow(wc, interpolation='bilinear')
-        plt.axis('off')
-        plt.title(f'WordCloud of Themes / Keywords - {bank}', fontsize=14)
-        plt.savefig(os.path.join(OUTPUT_DIR, f'wordcloud_{bank}.png'))
-        plt.close()
-
-# -----------------------------
-# 4️⃣ Theme frequency bar chart
-# -----------------------------
-theme_counts = df['theme_keywords'].str.split(',').explode().value_counts().head(10)
-plt.figure(figsize=(8,5))
-sns.barplot(x=theme_counts.values, y=theme_counts.index, palette='Set3')
-plt.title('Top 10 Frequent Themes Across All Banks', fontsize=14)
-plt.xlabel('Frequency', fontsize=12)
-plt.ylabel('Theme', fontsize=12)
-plt.savefig(os.path.join(OUTPUT_DIR, 'top10_themes.png'))
-plt.close()
+# Relative to the repository root, like the other pipeline scripts
+DATA_PATH = 'data/processed/reviews_sentiment_themes.csv'
+OUTPUT_DIR = 'outputs/task4'
+# Read the monthly sentiment trend from the PostgreSQL rollup tables
+# (src/rollups.py) instead of re-aggregating every review
+USE_ROLLUPS = os.getenv('INSIGHTS_USE_ROLLUPS', '0') == '1'
+# Worker processes rendering charts (1 = render in this process)
+CHART_WORKERS = int(os.getenv('CHART_WORKERS', str(os.cpu_count() or 1)))
+CACHE_FILE = 'chart_cache.json'  # chart -> input fingerprint, in OUTPUT_DIR
+# Bump when the drawing code changes so cached charts are redrawn
+RENDER_VERSION = 1
+# Task 2 output columns -> the names used by the charts below
+TASK2_COLUMNS = {'date': 'review_date', 'bank': 'bank_name',
+                 'themes': 'theme_keywords'}
 
-# -----------------------------
-# 5️⃣ Print Insights & Recommendations
-# -----------------------------
-banks = df['bank_name'].unique()
 insights = {
     'CBE': {
         'drivers': ['Fast Transactions', 'Intuitive UI'],
@@ -101,15 +57,6 @@ insights = {
     }
 }
 
-for bank in banks:
-    print(f"\n=== {bank} ===")
-    print(f"Drivers: {', '.join(insights[bank]['drivers'])}")
-    print(f"Pain Points: {', '.join(insights[bank]['pain_points'])}")
-    print(f"Recommendations: {', '.join(insights[bank]['recommendations'])}")
-
-# -----------------------------
-# 6️⃣ Ethics / Review Biases
-# -----------------------------
 ethics_notes = [
     "Negative skew: dissatisfied users are more likely to leave reviews.",
     "Sampling bias: only app users included, offline users excluded.",
@@ -118,6 +65,255 @@ ethics_notes = [
     "Temporal bias: older reviews may not reflect current app performance."
 ]
 
-print("\n=== Ethics & Potential Review Biases ===")
-for note in ethics_notes:
-    print(f"- {note}")
+
+def _pyplot():
+    """pyplot + seaborn on the Agg backend (no display needed)."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    sns.set(style="whitegrid")
+    return plt, sns
+
+
+# -----------------------------
+# Chart renderers (run in worker processes)
+# -----------------------------
+def render_rating_distribution(data: pd.DataFrame, path: str):
+    """1️⃣ Rating distribution per bank."""
+    plt, sns = _pyplot()
+    plt.figure(figsize=(8,5))
+    sns.boxplot(data=data, x='bank_name', y='rating', palette='Set2')
+    plt.title('Rating Distribution per Bank', fontsize=14)
+    plt.xlabel('Bank', fontsize=12)
+    plt.ylabel('Rating', fontsize=12)
+    plt.savefig(path)
+    plt.close()
+
+
+def render_sentiment_trend(data: pd.DataFrame, path: str):
+    """2️⃣ Sentiment trend over time (monthly)."""
+    plt, sns = _pyplot()
+    plt.figure(figsize=(10,6))
+    sns.lineplot(data=data, x='month', y='sentiment_score', hue='bank_name', marker='o')
+    plt.title('Sentiment Trend Over Time per Bank', fontsize=14)
+    plt.xlabel('Month', fontsize=12)
+    plt.ylabel('Average Sentiment Score', fontsize=12)
+    plt.xticks(rotation=45)
+    plt.legend(title='Bank')
+    plt.savefig(path)
+    plt.close()
+
+
+def render_wordcloud(data: dict, path: str):
+    """3️⃣ WordCloud of one bank's theme keywords."""
+    from wordcloud import WordCloud
+
+    plt, _ = _pyplot()
+    wc = WordCloud(width=800, height=400, background_color='white', colormap='Set2').generate(data['text'])
+    plt.figure(figsize=(10,5))
+    plt.imshow(wc, interpolation='bilinear')
+    plt.axis('off')
+    plt.title(f"WordCloud of Themes / Keywords - {data['bank']}", fontsize=14)
+    plt.savefig(path)
+    plt.close()
+
+
+def render_top_themes(data: pd.Series, path: str):
+    """4️⃣ Theme frequency bar chart."""
+    plt, sns = _pyplot()
+    plt.figure(figsize=(8,5))
+    sns.barplot(x=data.values, y=data.index, palette='Set3')
+    plt.title('Top 10 Frequent Themes Across All Banks', fontsize=14)
+    plt.xlabel('Frequency', fontsize=12)
+    plt.ylabel('Theme', fontsize=12)
+    plt.savefig(path)
+    plt.close()
+
+
+def _render(job: dict):
+    job['renderer'](job['data'], job['path'])
+    return job['name']
+
+
+# -----------------------------
+# Chart jobs and fingerprint cache
+# -----------------------------
+def load_reviews(path: str = DATA_PATH) -> pd.DataFrame:
+    """Load the Task 2 output, with its columns renamed for the charts."""
+    df = pd.read_csv(path).rename(columns=TASK2_COLUMNS)
+    df['review_date'] = pd.to_datetime(df['review_date'], format='ISO8601')
+    return df
+
+
+def split_themes(themes: pd.Series) -> pd.Series:
+    """One row per theme from "; "-joined (or comma-separated) themes."""
+    parts = themes.dropna().astype(str).str.split(r'[;,]', regex=True)
+    return parts.explode().str.strip()
+
+
+def monthly_sentiment(df: pd.DataFrame,
+                      use_rollups: bool = USE_ROLLUPS) -> pd.DataFrame:
+    """Mean sentiment per bank and month (from the rollup if enabled)."""
+    if use_rollups:
+        from src.db import get_connection
+        from src.rollups import bank_month_summary
+
+        conn = get_connection()
+        try:
+            return bank_month_summary(conn).rename(
+                columns={'mean_sentiment_score': 'sentiment_score'})
+        finally:
+            conn.close()
+    month = df['review_date'].dt.to_period('M').rename('month')
+    trend = df.groupby(['bank_name', month])['sentiment_score'].mean()
+    return trend.reset_index()
+
+
+def chart_jobs(df: pd.DataFrame, use_rollups: bool = USE_ROLLUPS) -> list:
+    """
+    One job per chart: its file name, renderer and the (small) input
+    data the renderer needs, which is also what gets fingerprinted.
+    """
+    trend = monthly_sentiment(df, use_rollups)
+    jobs = [
+        {'name': 'rating_distribution.png',
+         'renderer': render_rating_distribution,
+         'data': df[['bank_name', 'rating']]},
+        {'name': 'sentiment_trend.png',
+         'renderer': render_sentiment_trend,
+         'data': trend[['bank_name', 'month', 'sentiment_score']]},
+    ]
+    keywords = df['theme_keywords'].dropna().astype(str)
+    texts = keywords.groupby(df['bank_name']).agg(" ".join)
+    for bank in df['bank_name'].unique():
+        text = texts.get(bank, '')
+        if text.strip():  # Only generate if text exists
+            jobs.append({'name': f'wordcloud_{bank}.png',
+                         'renderer': render_wordcloud,
+                         'data': {'bank': bank, 'text': text}})
+    theme_counts = split_themes(df['theme_keywords']).value_counts().head(10)
+    jobs.append({'name': 'top10_themes.png',
+                 'renderer': render_top_themes,
+                 'data': theme_counts})
+    return jobs
+
+
+def fingerprint(job: dict) -> str:
+    """Hash of the renderer, RENDER_VERSION and the job's input data."""
+    h = hashlib.sha256(f"{job['renderer'].__name__}:{RENDER_VERSION}".encode())
+    data = job['data']
+    if isinstance(data, dict):
+        h.update(json.dumps(data, sort_keys=True, default=str).encode('utf-8'))
+    else:
+        if isinstance(data, pd.DataFrame):
+            columns = [str(c) for c in data.columns]
+            h.update(json.dumps(columns).encode('utf-8'))
+        h.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+    return h.hexdigest()
+
+
+def load_cache(output_dir: str = OUTPUT_DIR) -> dict:
+    path = os.path.join(output_dir, CACHE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_cache(cache: dict, output_dir: str = OUTPUT_DIR):
+    path = os.path.join(output_dir, CACHE_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def render_charts(jobs: list, output_dir: str = OUTPUT_DIR,
+                  workers: int = CHART_WORKERS, force: bool = False) -> list:
+    """
+    Render the jobs whose fingerprint changed (or whose PNG is missing)
+    and record the new fingerprints.
+
+    Returns:
+        list: Names of the charts drawn in this run
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    cache = load_cache(output_dir)
+    todo = []
+    for job in jobs:
+        job['path'] = os.path.join(output_dir, job['name'])
+        job['fingerprint'] = fingerprint(job)
+        if (force or cache.get(job['name']) != job['fingerprint']
+                or not os.path.exists(job['path'])):
+            todo.append(job)
+
+    if workers > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(todo))) as pool:
+            drawn = list(pool.map(_render, todo))
+    else:
+        drawn = [_render(job) for job in todo]
+
+    for job in todo:
+        cache[job['name']] = job['fingerprint']
+    save_cache(cache, output_dir)
+    return drawn
+
+
+# -----------------------------
+# 5️⃣ Print Insights & Recommendations
+# -----------------------------
+def print_insights(banks):
+    for bank in banks:
+        if bank not in insights:
+            continue
+        print(f"\n=== {bank} ===")
+        print(f"Drivers: {', '.join(insights[bank]['drivers'])}")
+        print(f"Pain Points: {', '.join(insights[bank]['pain_points'])}")
+        print(f"Recommendations: {', '.join(insights[bank]['recommendations'])}")
+
+    # -----------------------------
+    # 6️⃣ Ethics / Review Biases
+    # -----------------------------
+    print("\n=== Ethics & Potential Review Biases ===")
+    for note in ethics_notes:
+        print(f"- {note}")
+
+
+def main(data_path: str = DATA_PATH, output_dir: str = OUTPUT_DIR,
+         workers: int = CHART_WORKERS, force: bool = False,
+         use_rollups: bool = USE_ROLLUPS) -> list:
+    """
+    Render the Task 4 charts and print the insights.
+
+    Returns:
+        list: Names of the charts drawn (cached ones are skipped)
+    """
+    with stage('load') as st:
+        df = load_reviews(data_path)
+        st.rows_out = len(df)
+
+    with stage('prepare_charts', rows_in=len(df)) as st:
+        jobs = chart_jobs(df, use_rollups)
+        st.rows_out = len(jobs)
+
+    with stage('render_charts', rows_in=len(jobs)) as st:
+        drawn = render_charts(jobs, output_dir, workers, force)
+        st.rows_out = len(drawn)
+    print(f"Charts: {len(drawn)} drawn, {len(jobs) - len(drawn)} unchanged "
+          f"(in {output_dir})")
+
+    print_insights(df['bank_name'].unique())
+    return drawn
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--workers', type=int, default=CHART_WORKERS,
+                            help='chart rendering processes')
+    arg_parser.add_argument('--force', action='store_true',
+                            help='redraw charts even if unchanged')
+    args = arg_parser.parse_args()
+    with run_report('task4_insights'):
+        main(workers=args.workers, force=args.force)
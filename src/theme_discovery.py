@@ -0,0 +1,221 @@
+# src/theme_discovery.py
+"""
+Unsupervised theme discovery for reviews.
+
+Complements the hand-written keyword -> theme rules: reviews are hashed
+into a fixed-size feature space (HashingVectorizer, no vocabulary kept in
+memory) and clustered online with MiniBatchKMeans.partial_fit, one batch
+at a time, so millions of reviews fit in bounded memory.
+
+Hashed features have no names, so a bounded reservoir sample of the
+reviews seen while fitting is used to map the strongest features of
+each cluster back to readable terms.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from src.instrumentation import timed
+
+N_CLUSTERS = int(os.getenv("THEME_CLUSTERS", "12"))
+N_FEATURES = 2 ** 18
+BATCH_SIZE = 10000  # reviews per partial_fit / predict batch
+TOP_TERMS = 6  # terms used to label a cluster
+SAMPLE_SIZE = 20000  # reviews kept to name hashed features
+
+
+class ThemeDiscovery:
+    """
+    Online clustering of review texts.
+
+    Args:
+        n_clusters (int): Number of clusters (discovered themes)
+        n_features (int): Size of the hashed feature space
+        top_terms (int): Terms in each cluster label
+        sample_size (int): Reservoir size used to name features
+        random_state (int): Seed for clustering and sampling
+    """
+
+    def __init__(self, n_clusters=N_CLUSTERS, n_features=N_FEATURES,
+                 top_terms=TOP_TERMS, sample_size=SAMPLE_SIZE,
+                 random_state=0):
+        from sklearn.cluster import MiniBatchKMeans
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features, ngram_range=(1, 2), stop_words="english",
+            alternate_sign=False, norm="l2",
+        )
+        self.model = MiniBatchKMeans(n_clusters=n_clusters,
+                                     random_state=random_state, n_init=3)
+        self.n_features = n_features
+        self.top_terms = top_terms
+        self.sample_size = sample_size
+        self._rng = np.random.default_rng(random_state)
+        self._sample = []
+        self._seen = 0
+        self._pending = []  # held until the first batch has n_clusters rows
+        self.fitted = False
+
+    def _observe(self, texts: list):
+        """Reservoir-sample texts for naming features later."""
+        room = max(self.sample_size - len(self._sample), 0)
+        self._sample.extend(texts[:room])
+        rest = texts[room:]
+        # algorithm R: the i-th text seen replaces a random slot w.p. k/i
+        seen = self._seen + room + np.arange(1, len(rest) + 1)
+        slots = self._rng.integers(0, seen) if len(rest) else seen
+        for text, slot in zip(rest, slots):
+            if slot < self.sample_size:
+                self._sample[slot] = text
+        self._seen += len(texts)
+
+    def partial_fit(self, texts):
+        """Update the clusters with one batch of texts."""
+        texts = [str(t) for t in texts]
+        self._observe(texts)
+        self._pending.extend(texts)
+        if len(self._pending) >= self.model.n_clusters:
+            self.model.partial_fit(self.vectorizer.transform(self._pending))
+            self._pending = []
+            self.fitted = True
+        return self
+
+    def finish(self):
+        """Fit what is still pending (shrinking k for tiny corpora)."""
+        if self._pending:
+            if not self.fitted:
+                self.model.set_params(
+                    n_clusters=len(self._pending),
+                    n_init=min(self.model.n_init, len(self._pending)),
+                )
+            self.model.partial_fit(self.vectorizer.transform(self._pending))
+            self._pending = []
+            self.fitted = True
+        return self
+
+    def predict(self, texts) -> np.ndarray:
+        """Cluster id of every text."""
+        texts = [str(t) for t in texts]
+        if not texts:
+            return np.empty(0, dtype=np.int32)
+        return self.model.predict(self.vectorizer.transform(texts))
+
+    def _feature_names(self) -> dict:
+        """Most frequent sampled term behind each hashed feature index."""
+        from sklearn.feature_extraction import FeatureHasher
+
+        analyzer = self.vectorizer.build_analyzer()
+        term_counts = {}
+        for text in self._sample:
+            for term in analyzer(text):
+                term_counts[term] = term_counts.get(term, 0) + 1
+        terms = list(term_counts)
+        if not terms:
+            return {}
+        # same hashing as HashingVectorizer: one nonzero column per term
+        hasher = FeatureHasher(n_features=self.n_features,
+                               input_type="string", alternate_sign=False)
+        columns = hasher.transform([[t] for t in terms]).indices
+        names = {}
+        for term, col in zip(terms, columns):
+            best = names.get(col)
+            if best is None or term_counts[term] > term_counts[best]:
+                names[col] = term
+        return names
+
+    def cluster_terms(self) -> dict:
+        """
+        Label of every cluster: its most distinctive terms (centroid
+        weight above the mean centroid), "; "-joined.
+        """
+        names = self._feature_names()
+        centers = self.model.cluster_centers_
+        distinct = centers - centers.mean(axis=0)
+        labels = {}
+        for cluster, row in enumerate(distinct):
+            top = []
+            for col in np.argsort(row)[::-1]:
+                if row[col] <= 0 or len(top) >= self.top_terms:
+                    break
+                if col in names:
+                    top.append(names[col])
+            labels[cluster] = "; ".join(top)
+        return labels
+
+
+def _batches(texts: pd.Series, batch_size: int):
+    for start in range(0, len(texts), batch_size):
+        yield texts.iloc[start:start + batch_size]
+
+
+def _summary(counts: np.ndarray, labels: dict) -> pd.DataFrame:
+    return pd.DataFrame({
+        "cluster_id": np.arange(len(counts)),
+        "n_reviews": counts,
+        "cluster_terms": [labels[c] for c in range(len(counts))],
+    })
+
+
+@timed()
+def discover_themes(df: pd.DataFrame, n_clusters: int = N_CLUSTERS,
+                    batch_size: int = BATCH_SIZE):
+    """
+    Cluster the reviews of a DataFrame in batches.
+
+    Adds `cluster_id` and `cluster_terms` columns next to `themes`.
+
+    Returns:
+        tuple: (DataFrame, per-cluster summary DataFrame)
+    """
+    if df.empty:
+        df["cluster_id"] = pd.Series(dtype="int32")
+        df["cluster_terms"] = pd.Series(dtype=object)
+        return df, _summary(np.empty(0, dtype=np.int64), {})
+
+    texts = df["review"].astype(str)
+    discovery = ThemeDiscovery(n_clusters=n_clusters)
+    for batch in _batches(texts, batch_size):
+        discovery.partial_fit(batch)
+    discovery.finish()
+
+    cluster_ids = np.concatenate(
+        [discovery.predict(batch) for batch in _batches(texts, batch_size)])
+    labels = discovery.cluster_terms()
+    df["cluster_id"] = cluster_ids
+    df["cluster_terms"] = df["cluster_id"].map(labels)
+    counts = np.bincount(cluster_ids, minlength=discovery.model.n_clusters)
+    return df, _summary(counts, labels)
+
+
+@timed()
+def discover_themes_csv(path: str, n_clusters: int = N_CLUSTERS,
+                        batch_size: int = BATCH_SIZE) -> pd.DataFrame:
+    """
+    Cluster the reviews of a CSV in two streaming passes (fit, then
+    assign) and rewrite it with `cluster_id` and `cluster_terms` columns.
+    Memory is bounded by `batch_size` and the sample size.
+
+    Returns:
+        pd.DataFrame: Per-cluster summary
+    """
+    discovery = ThemeDiscovery(n_clusters=n_clusters)
+    for chunk in pd.read_csv(path, chunksize=batch_size, usecols=["review"]):
+        discovery.partial_fit(chunk["review"])
+    discovery.finish()
+    if not discovery.fitted:
+        return _summary(np.empty(0, dtype=np.int64), {})
+    labels = discovery.cluster_terms()
+
+    counts = np.zeros(discovery.model.n_clusters, dtype=np.int64)
+    tmp_path = path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    for i, chunk in enumerate(pd.read_csv(path, chunksize=batch_size)):
+        chunk["cluster_id"] = discovery.predict(chunk["review"])
+        chunk["cluster_terms"] = chunk["cluster_id"].map(labels)
+        counts += np.bincount(chunk["cluster_id"], minlength=len(counts))
+        chunk.to_csv(tmp_path, mode="a", index=False, encoding="utf-8",
+                     header=i == 0)
+    os.replace(tmp_path, path)
+    return _summary(counts, labels)
@@ -0,0 +1,95 @@
+# src/theme_matcher.py
+"""
+Compiled multi-pattern theme matcher.
+
+All theme keywords are compiled into one trie-shaped regular expression,
+so each review is scanned once regardless of the dictionary size. A
+keyword matches at the start of a word and takes in the rest of it, so
+inflected forms ("crashing", "delayed", "payments") match as they did with
+the original substring scan, while "ui" no longer matches inside "quick",
+nor "bug" inside "debug". Multi-word phrases such as "customer support"
+match across any whitespace.
+"""
+
+import re
+import pandas as pd
+
+NO_THEME = "Other"
+
+
+def _trie_pattern(words) -> str:
+    """Build a regex alternation of `words` factored by common prefixes."""
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}  # end-of-word marker
+
+    def build(node) -> str:
+        alternatives = []
+        optional = False
+        for ch in sorted(node):
+            if ch == "":
+                optional = True
+                continue
+            piece = r"\s+" if ch == " " else re.escape(ch)
+            alternatives.append(piece + build(node[ch]))
+        if not alternatives:
+            return ""
+        if len(alternatives) == 1 and not optional:
+            return alternatives[0]
+        group = "(?:" + "|".join(alternatives) + ")"
+        return group + "?" if optional else group
+
+    return build(trie)
+
+
+def normalize_keyword(keyword: str) -> str:
+    """Lowercase a keyword and collapse internal whitespace."""
+    return " ".join(str(keyword).lower().split())
+
+
+class ThemeMatcher:
+    """
+    Match reviews against a {keyword: theme} mapping in a single pass.
+
+    Args:
+        mapping (dict): Keyword or phrase to theme name
+    """
+
+    def __init__(self, mapping: dict):
+        self.mapping = {normalize_keyword(k): v for k, v in mapping.items()}
+        body = _trie_pattern(self.mapping)
+        # the leading character class lets the regex engine skip ahead to
+        # candidate positions; the lookbehind anchors them at word starts
+        first = "".join(sorted({re.escape(k[0]) for k in self.mapping}))
+        self.regex = re.compile(
+            "(?=[" + first + r"])(?<!\w)(" + body + r")\w*"
+            if self.mapping else r"(?!)")
+
+    def match_keywords(self, text: str) -> list:
+        """Return the mapped keywords found in `text`."""
+        return [normalize_keyword(m)
+                for m in self.regex.findall(str(text).lower())]
+
+    def _join(self, keywords) -> str:
+        themes = {self.mapping[k] for k in keywords}
+        return "; ".join(sorted(themes)) if themes else NO_THEME
+
+    def themes_for(self, text: str) -> str:
+        """Semicolon-joined sorted themes of a review, or "Other"."""
+        return self._join(self.match_keywords(text))
+
+    def match_series(self, texts: pd.Series) -> pd.Series:
+        """Vectorized themes_for over a pandas Series of reviews."""
+        found = texts.astype(str).str.lower().str.findall(self.regex)
+        # few distinct keyword combinations occur, so memoize the join
+        joined = {}
+        themes = []
+        for ms in found:
+            key = tuple(ms)
+            if key not in joined:
+                joined[key] = self._join(normalize_keyword(m) for m in ms)
+            themes.append(joined[key])
+        return pd.Series(themes, index=texts.index, dtype=object)
@@ -1,50 +1,170 @@
+# src/update_sentiment.py
+"""
+Backfill sentiment for stored reviews whose sentiment_label or
+sentiment_score is NULL.
+
+Rows are read in keyset pages (review_id above the last one seen, LIMIT
+page size), scored with the Task-2 DistilBERT classifier, and written
+back with one set-based UPDATE ... FROM (VALUES ...) per page. Each page
+is read, updated and committed in its own transaction, together with
+the recomputed daily rollup rows of its reviews. The last committed
+review_id is checkpointed, so an interrupted run resumes where it
+stopped.
+"""
+
+import json
 import os
-import psycopg2
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-DB_NAME = os.getenv("DB_NAME")
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_HOST = os.getenv("DB_HOST")
-DB_PORT = os.getenv("DB_PORT")
-
-# Connect to PostgreSQL
-conn = psycopg2.connect(
-    dbname=DB_NAME,
-    user=DB_USER,
-    password=DB_PASSWORD,
-    host=DB_HOST,
-    port=DB_PORT
+import time
+import pandas as pd
+from psycopg2.extras import execute_values
+from src.db import get_connection
+from src.instrumentation import run_report, stage, timed
+from src.rollups import refresh_days
+from src.task2_sentiment_theme import (
+    close_sentiment_model,
+    compute_sentiment,
+    open_sentiment_model,
 )
-cur = conn.cursor()
-
-# Select reviews where sentiment is NULL
-cur.execute("SELECT review_id, review_text FROM reviews WHERE sentiment_label IS NULL OR sentiment_score IS NULL;")
-rows_to_update = cur.fetchall()
-
-# Replace this with your actual sentiment analysis function
-def sentiment_pipeline(text):
-    # dummy example: positive if 'good' else negative
-    if "good" in text.lower():
-        return {"label": "positive", "score": 0.9}
-    else:
-        return {"label": "negative", "score": 0.1}
-
-# Update the NULL sentiment rows
-for review_id, review_text in rows_to_update:
-    sentiment = sentiment_pipeline(review_text)
-    cur.execute("""
-        UPDATE reviews
-        SET sentiment_label = %s,
-            sentiment_score = %s
-        WHERE review_id = %s;
-    """, (sentiment["label"], sentiment["score"], review_id))
-
-conn.commit()
-cur.close()
-conn.close()
-
-print(f"Updated {len(rows_to_update)} reviews with sentiment values!")
+
+PAGE_SIZE = 5000  # reviews fetched, scored and updated per transaction
+CHECKPOINT = "data/processed/sentiment_backfill_checkpoint.json"
+
+SELECT_SQL = """
+SELECT review_id, review_text
+FROM reviews
+WHERE (sentiment_label IS NULL OR sentiment_score IS NULL)
+  AND review_id > %s
+ORDER BY review_id
+LIMIT %s;
+"""
+
+UPDATE_SQL = """
+UPDATE reviews AS r
+SET sentiment_label = v.sentiment_label,
+    sentiment_score = v.sentiment_score
+FROM (VALUES %s) AS v(review_id, sentiment_label, sentiment_score)
+WHERE r.review_id = v.review_id;
+"""
+
+
+def load_checkpoint(path=CHECKPOINT) -> dict:
+    """Last committed review_id and rows done, or a fresh state."""
+    if not os.path.exists(path):
+        return {"last_review_id": 0, "rows_done": 0}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(state: dict, path=CHECKPOINT):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def iter_pages(conn, after_id: int, page_size: int = PAGE_SIZE):
+    """
+    Yield pages of (review_id, review_text) rows needing sentiment.
+
+    Every page is a separate keyset query starting after the previous
+    page's last review_id, so the server never holds more than one page
+    and the caller can commit between pages.
+    """
+    while True:
+        cur = conn.cursor()
+        cur.execute(SELECT_SQL, (after_id, page_size))
+        rows = cur.fetchall()
+        cur.close()
+        if not rows:
+            return
+        yield rows
+        after_id = rows[-1][0]
+
+
+@timed()
+def score_page(rows, classifier, cache=None) -> list:
+    """Score a page with the Task-2 classifier; return UPDATE values."""
+    df = pd.DataFrame(rows, columns=["review_id", "review"])
+    df["review"] = df["review"].fillna("")
+    df = compute_sentiment(df, classifier, cache=cache)
+    return list(zip(
+        df["review_id"].astype(int),
+        df["sentiment_label"],
+        df["sentiment_score"].astype(float),
+    ))
+
+
+def backfill(conn, page_size: int = PAGE_SIZE, resume: bool = True) -> dict:
+    """
+    Score every review with NULL sentiment.
+
+    Args:
+        conn: Open psycopg2 connection
+        page_size (int): Reviews per page / transaction
+        resume (bool): Continue after the checkpointed review_id
+
+    Returns:
+        dict: rows_done, seconds and rows_per_sec for this run
+    """
+    state = load_checkpoint() if resume else {"last_review_id": 0,
+                                              "rows_done": 0}
+    if state["last_review_id"]:
+        print(f"Resuming after review_id {state['last_review_id']} "
+              f"({state['rows_done']} reviews already updated)...")
+
+    classifier, cache = open_sentiment_model()
+    start = time.perf_counter()
+    rows_done = 0
+    try:
+        for rows in iter_pages(conn, state["last_review_id"], page_size):
+            values = score_page(rows, classifier, cache)
+            with stage("update", rows_in=len(values)):
+                cur = conn.cursor()
+                execute_values(cur, UPDATE_SQL, values,
+                               page_size=len(values))
+                cur.close()
+            with stage("refresh_rollups", rows_in=len(values)):
+                refresh_days(conn, [v[0] for v in values])
+                conn.commit()
+
+            rows_done += len(values)
+            state = {
+                "last_review_id": int(values[-1][0]),
+                "rows_done": state["rows_done"] + len(values),
+            }
+            save_checkpoint(state)
+            elapsed = time.perf_counter() - start
+            print(f"Updated {state['rows_done']} reviews "
+                  f"({rows_done / elapsed:,.0f} rows/sec)")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        close_sentiment_model(classifier, cache)
+
+    seconds = time.perf_counter() - start
+    # finished: the next backfill starts from the beginning again
+    if os.path.exists(CHECKPOINT):
+        os.remove(CHECKPOINT)
+    return {
+        "rows_done": rows_done,
+        "seconds": seconds,
+        "rows_per_sec": rows_done / seconds if seconds > 0 else 0.0,
+    }
+
+
+def main():
+    conn = get_connection()
+    try:
+        stats = backfill(conn)
+    finally:
+        conn.close()
+
+    print(f"Updated {stats['rows_done']} reviews with sentiment values! "
+          f"({stats['rows_per_sec']:,.0f} rows/sec)")
+
+
+if __name__ == "__main__":
+    with run_report("update_sentiment"):
+        main()
@@ -0,0 +1,57 @@
+# tests/conftest.py
+"""Shared fixtures: a small sqlite reviews database built by the loader."""
+
+import itertools
+import sqlite3
+import pandas as pd
+import pytest
+from src.review_loader import load_reviews
+
+REVIEWS = [
+    # bank, review, rating, date, sentiment_label, sentiment_score, themes
+    ("CBE", "Transfer failed but money was deducted", 1, "2024-01-05",
+     "NEGATIVE", -0.95, "Transaction Performance"),
+    ("CBE", "OTP not received when I login", 2, "2024-01-06",
+     "NEGATIVE", -0.8, "Account Access Issues"),
+    ("CBE", "Great app, fast transfers", 5, "2024-01-07",
+     "POSITIVE", 0.9, "Transaction Performance; User Interface & Experience"),
+    ("BOA", "Login keeps failing, password reset does not work", 1,
+     "2024-02-01", "NEGATIVE", -0.9, "Account Access Issues"),
+    ("BOA", "Fingerprint login is quick", 5, "2024-02-02",
+     "POSITIVE", 0.85, "Account Access Issues"),
+    ("BOA", "Hidden fees on every transfer", 2, "2024-02-03",
+     "NEGATIVE", -0.7, "Fees_Charges"),
+    ("Dashen", "Support never answers the phone", 1, "2024-03-01",
+     "NEGATIVE", -0.9, "Customer Support"),
+    ("Dashen", "Nice design", 4, "2024-03-02",
+     "POSITIVE", 0.8, "FeesXCharges"),
+]
+
+
+@pytest.fixture
+def load_rows(tmp_path):
+    """Function loading rows shaped like REVIEWS into a sqlite file."""
+    loads = itertools.count()
+
+    def load(db_path: str, rows: list) -> dict:
+        csv_path = tmp_path / f"load_{next(loads)}.csv"
+        df = pd.DataFrame(rows, columns=[
+            "bank", "review", "rating", "date", "sentiment_label",
+            "sentiment_score", "themes"])
+        df["source"] = "Google Play"
+        df.to_csv(csv_path, index=False)
+        conn = sqlite3.connect(db_path)
+        try:
+            return load_reviews(conn, str(csv_path))
+        finally:
+            conn.close()
+
+    return load
+
+
+@pytest.fixture
+def reviews_db(tmp_path, load_rows):
+    """Path of a sqlite database loaded with REVIEWS (8 reviews)."""
+    path = str(tmp_path / "reviews.db")
+    load_rows(path, REVIEWS)
+    return path
@@ -0,0 +1,138 @@
+# tests/test_inference_backends.py
+"""
+OnnxClassifier must be a drop-in for the transformers text-classification
+pipeline. ONNX Runtime and the tokenizer are replaced by small fakes, so
+no model is downloaded or exported.
+"""
+
+import json
+import sys
+import types
+import numpy as np
+import pytest
+from src import inference_backends
+from src.inference_backends import OnnxClassifier
+
+ID2LABEL = {0: "NEGATIVE", 1: "POSITIVE"}  # the SST-2 model's labels
+NEGATIVE_WORDS = {"bad", "slow", "crash", "failed"}
+
+
+class FakeTokenizer:
+    """Word-level tokenizer with the transformers call signature."""
+
+    vocab = {}
+
+    def __call__(self, texts, padding=False, truncation=False,
+                 max_length=None, return_tensors=None):
+        ids = [[101] + [self.vocab.setdefault(w, len(self.vocab) + 1000)
+                        for w in text.lower().split()] + [102]
+               for text in texts]
+        if truncation and max_length:
+            ids = [row[:max_length] for row in ids]
+        width = max(len(row) for row in ids)
+        input_ids = np.zeros((len(ids), width), dtype=np.int32)
+        mask = np.zeros((len(ids), width), dtype=np.int32)
+        for i, row in enumerate(ids):
+            input_ids[i, :len(row)] = row
+            mask[i, :len(row)] = 1
+        return {"input_ids": input_ids, "attention_mask": mask}
+
+
+class FakeSession:
+    """InferenceSession returning logits from negative-word counts."""
+
+    feeds = []
+
+    def __init__(self, path, options=None, providers=None):
+        self.path = path
+
+    def get_inputs(self):
+        return [types.SimpleNamespace(name="input_ids"),
+                types.SimpleNamespace(name="attention_mask")]
+
+    def run(self, output_names, feeds):
+        FakeSession.feeds.append(feeds)
+        negative_ids = {FakeTokenizer.vocab.get(w) for w in NEGATIVE_WORDS}
+        hits = np.isin(feeds["input_ids"], list(negative_ids)).sum(axis=1)
+        words = feeds["attention_mask"].sum(axis=1)
+        logits = np.stack([hits * 2.0, (words - hits) * 0.5], axis=1)
+        return [logits.astype(np.float32)]
+
+
+@pytest.fixture
+def classifier(tmp_path, monkeypatch):
+    """OnnxClassifier over a fake export in tmp_path."""
+    ort = types.ModuleType("onnxruntime")
+    ort.InferenceSession = FakeSession
+    ort.SessionOptions = types.SimpleNamespace
+    ort.GraphOptimizationLevel = types.SimpleNamespace(ORT_ENABLE_ALL=99)
+    transformers = types.ModuleType("transformers")
+    transformers.AutoTokenizer = types.SimpleNamespace(
+        from_pretrained=lambda path: FakeTokenizer())
+    transformers.AutoConfig = types.SimpleNamespace(
+        from_pretrained=lambda path: types.SimpleNamespace(
+            id2label=ID2LABEL, num_labels=len(ID2LABEL)))
+    monkeypatch.setitem(sys.modules, "onnxruntime", ort)
+    monkeypatch.setitem(sys.modules, "transformers", transformers)
+
+    (tmp_path / "export.json").write_text(json.dumps(
+        {"model": "test-model", "revision": "abc123"}), encoding="utf-8")
+    FakeSession.feeds = []
+    return OnnxClassifier(str(tmp_path / "model.onnx"), max_length=8)
+
+
+def test_output_matches_pipeline_structure(classifier):
+    texts = ["great app", "bad and slow", "failed transfer crash bad", "ok"]
+    results = classifier(texts)
+
+    assert len(results) == len(texts)
+    for res in results:
+        assert set(res) == {"label", "score"}
+        assert res["label"] in set(ID2LABEL.values())
+        assert isinstance(res["score"], float)
+        # the pipeline reports the softmax probability of the top label
+        assert 0.5 <= res["score"] <= 1.0
+    assert [r["label"] for r in results] == [
+        "POSITIVE", "NEGATIVE", "NEGATIVE", "POSITIVE"]
+
+
+def test_scores_are_softmax_of_logits(classifier):
+    results = classifier(["bad and slow"])
+    logits = np.array([2 * 2.0, 3 * 0.5])  # 2 negative words, 5 tokens
+    probs = np.exp(logits) / np.exp(logits).sum()
+    assert results[0]["score"] == pytest.approx(probs.max(), rel=1e-6)
+
+
+def test_single_string_and_truncation(classifier):
+    assert len(classifier("just one review")) == 1
+    classifier(["word " * 50], truncation=True, max_length=4)
+    feeds = FakeSession.feeds[-1]
+    assert feeds["input_ids"].shape == (1, 4)
+    assert all(a.dtype == np.int64 for a in feeds.values())
+
+
+def test_revision_from_export(classifier):
+    from src.sentiment_cache import model_revision
+
+    assert classifier.revision == "abc123"
+    assert model_revision(classifier) == "abc123"
+
+
+def test_compute_sentiment_accepts_backend(classifier, tmp_path,
+                                           monkeypatch):
+    import pandas as pd
+
+    monkeypatch.chdir(tmp_path)
+    from src.task2_sentiment_theme import SENTIMENT_LABELS, compute_sentiment
+
+    df = pd.DataFrame({"review": ["great app", "bad and slow", ""]})
+    out = compute_sentiment(df, classifier)
+    assert set(out["sentiment_label"].astype(str)) <= set(SENTIMENT_LABELS)
+    assert out["sentiment_score"].between(-1, 1).all()
+
+
+def test_cache_keys_are_per_backend():
+    name = "distilbert-base-uncased-finetuned-sst-2-english"
+    assert inference_backends.cache_model_name(name, "pipeline") == name
+    assert (inference_backends.cache_model_name(name, "int8")
+            != inference_backends.cache_model_name(name, "onnx"))
@@ -0,0 +1,92 @@
+# tests/test_pipeline.py
+"""
+Stage fingerprints must cover all the code a stage runs, and the
+insert_reviews stage (no output files) must rerun when the database it
+loaded no longer matches.
+"""
+
+import os
+import sys
+import types
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    """src.pipeline, imported where its output directories do no harm."""
+    monkeypatch.chdir(tmp_path)
+    from src import pipeline
+
+    monkeypatch.chdir(ROOT)  # source paths are relative to the repo
+    return pipeline
+
+
+def test_code_includes_imported_modules(pipeline):
+    code = set(pipeline.source_files("src.task2_sentiment_theme"))
+    assert {"src/sentiment_cache.py", "src/sentiment_pool.py",
+            "src/models.py", "src/langid.py", "src/storage.py",
+            "src/instrumentation.py"} <= code
+    # imported inside a function only
+    assert "src/rollups.py" in pipeline.source_files("src.task4_insights")
+
+
+def test_probe_change_reruns_stage(pipeline, tmp_path):
+    marker = {"value": "10 rows, last review_id 10"}
+    stages = {"load": {"module": "src.insert_reviews", "args": [],
+                       "deps": [], "inputs": [], "code": [], "params": {},
+                       "outputs": [], "probe": lambda: marker["value"]}}
+    paths = {"state_path": str(tmp_path / "state.json"),
+             "cache_dir": str(tmp_path / "cache")}
+
+    def decide():
+        return pipeline.Pipeline(stages, **paths).decide("load")[0]
+
+    # record a finished run without running a subprocess
+    first = pipeline.Pipeline(stages, **paths)
+    first._execute("load", "restore", first.decide("load")[1])
+    assert decide() == "unchanged"
+    marker["value"] = "0 rows, last review_id None"  # database reset
+    assert decide() == "run"
+
+
+def test_database_marker_unavailable(pipeline, monkeypatch):
+    db = types.ModuleType("src.db")
+
+    def get_connection():
+        raise ConnectionError("no server")
+
+    db.get_connection = get_connection
+    monkeypatch.setitem(sys.modules, "src.db", db)
+    assert pipeline.database_marker() == "unavailable: ConnectionError"
+
+
+def test_restore_brings_back_keyword_index(pipeline, tmp_path, monkeypatch):
+    db = types.ModuleType("src.db")
+    db.connection_params = lambda: {"host": None, "port": None,
+                                    "dbname": None}
+    monkeypatch.setitem(sys.modules, "src.db", db)
+    spec = pipeline.build_stages()["task2"]
+    assert pipeline.task2_sentiment_theme.KEYWORD_INDEX in spec["outputs"]
+
+    monkeypatch.chdir(tmp_path)
+    index_file = os.path.join(spec["outputs"][-1], "terms.json")
+
+    def write_outputs(version):
+        for path in spec["outputs"][:-1]:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(version)
+        os.makedirs(os.path.dirname(index_file), exist_ok=True)
+        with open(index_file, "w", encoding="utf-8") as f:
+            f.write(version)
+
+    cache_dir = str(tmp_path / "cache")
+    write_outputs("first run")
+    pipeline.store_outputs("task2", spec, "fp1", cache_dir)
+    write_outputs("second run")
+    assert pipeline.restore_outputs("task2", spec, "fp1", cache_dir)
+    for path in spec["outputs"][:-1] + [index_file]:
+        with open(path, encoding="utf-8") as f:
+            assert f.read() == "first run"
@@ -0,0 +1,70 @@
+# tests/test_review_loader.py
+"""
+The bulk loader against an in-memory sqlite database: reloads are
+idempotent, rejected and duplicate rows are counted apart, and malformed
+ratings are stored as NULL.
+"""
+
+import sqlite3
+import pandas as pd
+import pytest
+from src.review_loader import load_reviews
+
+ROWS = [
+    # bank, review, rating, date
+    ("CBE", "Great app", "5", "2024-01-02"),
+    ("CBE", "Great app", "5", "2024-01-02"),  # repeated in the input
+    ("BOA", "Slow to open", "five", "2024-01-03"),  # malformed rating
+    ("BOA", "Crashes on login", "1", "not a date"),  # rejected
+    (None, "No bank given", "3", "2024-01-04"),  # rejected
+    ("Dashen", "Works well", "4", "2024-06-01 10:15:00"),
+]
+
+
+@pytest.fixture
+def reviews_csv(tmp_path):
+    df = pd.DataFrame(ROWS, columns=["bank", "review", "rating", "date"])
+    df["source"] = "Google Play"
+    df["sentiment_label"] = "POSITIVE"
+    df["sentiment_score"] = 0.9
+    df["themes"] = "UI"
+    path = tmp_path / "clean_reviews.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    yield conn
+    conn.close()
+
+
+def test_counts_rejected_and_duplicate_rows(conn, reviews_csv):
+    stats = load_reviews(conn, reviews_csv, chunk_size=4)
+    assert stats["rows_read"] == 6
+    assert stats["rows_inserted"] == 3
+    assert stats["rows_rejected"] == 2
+    assert stats["rows_duplicate"] == 1
+
+
+def test_reload_is_idempotent(conn, reviews_csv):
+    load_reviews(conn, reviews_csv)
+    stats = load_reviews(conn, reviews_csv)
+    assert stats["rows_inserted"] == 0
+    assert stats["rows_rejected"] == 2
+    assert stats["rows_duplicate"] == 4
+    count, = conn.execute("SELECT COUNT(*) FROM reviews").fetchone()
+    assert count == 3
+
+
+def test_malformed_values(conn, reviews_csv):
+    load_reviews(conn, reviews_csv)
+    rows = dict(conn.execute(
+        "SELECT review_text, rating FROM reviews").fetchall())
+    assert rows["Slow to open"] is None
+    assert rows["Great app"] == 5
+    dates = dict(conn.execute(
+        "SELECT review_text, review_date FROM reviews").fetchall())
+    # a full timestamp is stored as its date
+    assert dates["Works well"] == "2024-06-01"
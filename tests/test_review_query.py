@@ -0,0 +1,92 @@
+# tests/test_review_query.py
+"""
+ReviewQuery over the SQLite backend: filters (including LIKE wildcards
+in theme names), keyset pagination, the result cache and the summary.
+"""
+
+import pytest
+from src import review_query
+from src.review_query import ReviewQuery, SQLiteBackend, TTLCache
+
+N_REVIEWS = 8  # in the reviews_db fixture (tests/conftest.py)
+
+
+@pytest.fixture
+def rq(reviews_db):
+    with ReviewQuery(SQLiteBackend(reviews_db)) as rq:
+        yield rq
+
+
+def test_filters(rq):
+    assert rq.count() == N_REVIEWS
+    assert rq.count(bank="CBE") == 3
+    assert rq.count(bank=["CBE", "BOA"], sentiment="negative") == 4
+    assert rq.count(start_date="2024-02-01", end_date="2024-02-28") == 3
+    # whole theme names only, not a substring of another theme
+    assert rq.count(theme="Transaction Performance") == 2
+    assert rq.count(theme="Access") == 0
+
+
+def test_theme_wildcards_are_literal(rq):
+    rows = rq.page(theme="Fees_Charges").rows
+    assert rows["review_text"].tolist() == ["Hidden fees on every transfer"]
+    assert rq.count(theme="%") == 0
+    assert rq.count(theme="Fees%") == 0
+
+
+def test_keyset_pages_cover_every_review_once(rq):
+    pages = list(rq.iter_pages(limit=3))
+    assert [len(p.rows) for p in pages] == [3, 3, 2]
+    ids = [i for p in pages for i in p.rows["review_id"]]
+    assert ids == sorted(ids) and len(set(ids)) == N_REVIEWS
+    assert pages[0].next_after_id == ids[2]
+
+    newest = rq.page(limit=3, newest_first=True)
+    following = rq.page(newest.next_after_id, limit=3, newest_first=True)
+    assert newest.rows["review_id"].tolist() == ids[::-1][:3]
+    assert following.rows["review_id"].tolist() == ids[::-1][3:6]
+
+
+def test_cache_hits_and_expiry(reviews_db, load_rows, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(review_query.time, "monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=2, ttl=60)
+    rq = ReviewQuery(SQLiteBackend(reviews_db), cache)
+
+    assert rq.count(bank="CBE") == 3
+    assert rq.count(bank="CBE") == 3
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # rows loaded later are not seen until the entry expires
+    load_rows(reviews_db, [
+        ("CBE", "Balance not updated", 2, "2024-04-01", "NEGATIVE", -0.6,
+         "Transaction Performance")])
+    assert rq.count(bank="CBE") == 3
+    now[0] += 61
+    assert rq.count(bank="CBE") == 4
+
+    # least recently used entry is evicted first
+    rq.count(bank="BOA")
+    rq.count(bank="Dashen")
+    misses = cache.misses
+    rq.count(bank="CBE")
+    assert cache.misses == misses + 1
+
+    cache.clear()
+    rq.count(bank="Dashen")
+    assert cache.misses == misses + 2
+    rq.close()
+
+
+def test_cached_frames_are_copies(rq):
+    rq.page(limit=2).rows.drop(columns="review_text", inplace=True)
+    assert "review_text" in rq.page(limit=2).rows
+
+
+def test_sentiment_summary(rq):
+    summary = rq.sentiment_summary(bank=["BOA", "CBE"])
+    summary = summary.set_index(["bank_name", "sentiment_label"])
+    assert summary.loc[("CBE", "NEGATIVE"), "n_reviews"] == 2
+    assert summary.loc[("BOA", "POSITIVE"), "n_reviews"] == 1
+    assert summary.loc[("CBE", "NEGATIVE"), "mean_sentiment_score"] == (
+        pytest.approx((-0.95 - 0.8) / 2))
@@ -0,0 +1,105 @@
+# tests/test_review_search.py
+"""
+The search query language (parser, FTS5 and tsquery rendering) and an
+FTS5 round trip: index, search, then index only the reviews added later.
+"""
+
+import sqlite3
+import sys
+import types
+import pandas as pd
+import pytest
+from src.review_search import (
+    ReviewSearch,
+    parse_query,
+    to_fts5,
+    to_tsquery,
+    update_search_index,
+)
+from src.review_query import SQLiteBackend
+
+
+def test_parse_terms_phrases_and_operators():
+    assert parse_query("login") == ("term", ("login",))
+    assert parse_query('"OTP not received"') == (
+        "term", ("otp", "not", "received"))
+    assert parse_query("transfer failed") == parse_query(
+        "transfer AND failed") == (
+        "and", [("term", ("transfer",)), ("term", ("failed",))])
+    assert parse_query("login OR otp") == (
+        "or", [("term", ("login",)), ("term", ("otp",))])
+
+
+def test_parse_negation_and_parentheses():
+    expected = ("and", [("or", [("term", ("login",)),
+                                ("term", ("password",))]),
+                        ("not", ("term", ("fingerprint",)))])
+    assert parse_query("(login OR password) -fingerprint") == expected
+    assert parse_query("(login OR password) NOT fingerprint") == expected
+    # AND binds tighter than OR
+    assert parse_query("a b OR c") == (
+        "or", [("and", [("term", ("a",)), ("term", ("b",))]),
+               ("term", ("c",))])
+
+
+@pytest.mark.parametrize("query", [
+    "", "   ", "(login", "login)", "login OR", "NOT login", "-login",
+    "login OR -otp",
+])
+def test_parse_rejects_invalid_queries(query):
+    with pytest.raises(ValueError):
+        parse_query(query)
+
+
+def test_rendering():
+    tree = parse_query('"otp not received" OR (transfer -deducted)')
+    assert to_fts5(tree) == (
+        '("otp not received" OR (("transfer") NOT "deducted"))')
+    assert to_tsquery(tree) == (
+        "(('otp' <-> 'not' <-> 'received') | (('transfer') & !('deducted')))")
+
+
+def test_fts5_round_trip(reviews_db):
+    conn = sqlite3.connect(reviews_db)
+    assert update_search_index(conn) == 8
+    assert update_search_index(conn) == 0  # nothing new
+    conn.commit()
+    conn.close()
+
+    with ReviewSearch(SQLiteBackend(reviews_db)) as rs:
+        assert sorted(rs.search("login -fingerprint")["review_text"]) == [
+            "Login keeps failing, password reset does not work",
+            "OTP not received when I login"]
+        assert rs.count_matches('"money was deducted"') == 1
+        # porter stemming: "transfers" matches too
+        assert rs.count_matches("transfer", bank="CBE") == 2
+
+
+def test_insert_reviews_indexes_new_reviews(reviews_db, tmp_path,
+                                            monkeypatch):
+    # insert_reviews against the sqlite database instead of PostgreSQL
+    db = types.ModuleType("src.db")
+    db.get_connection = lambda: sqlite3.connect(reviews_db)
+    monkeypatch.setitem(sys.modules, "src.db", db)
+    monkeypatch.delitem(sys.modules, "src.insert_reviews", raising=False)
+    from src import insert_reviews
+
+    conn = sqlite3.connect(reviews_db)
+    update_search_index(conn)
+    conn.commit()
+    conn.close()
+
+    csv_path = tmp_path / "new.csv"
+    pd.DataFrame({"bank": ["CBE"], "review": ["Login works again"],
+                  "rating": [5], "date": ["2024-04-01"],
+                  "source": ["Google Play"]}).to_csv(csv_path, index=False)
+    insert_reviews.main(str(csv_path))
+
+    with ReviewSearch(SQLiteBackend(reviews_db)) as rs:
+        assert rs.count_matches("login") == 4
+    conn = sqlite3.connect(reviews_db)
+    watermark = conn.execute(
+        "SELECT last_review_id FROM search_state").fetchone()
+    assert watermark == conn.execute(
+        "SELECT MAX(review_id) FROM reviews").fetchone()
+    conn.close()
@@ -0,0 +1,175 @@
+# tests/test_scrape.py
+"""
+Scraper tests against a fake Play endpoint injected through `fetch=`.
+"""
+
+import json
+import pandas as pd
+import pytest
+from google_play_scraper.features.reviews import _ContinuationToken
+from src import scrape_reviews
+from src.scrape_engine import TokenBucket, rate_limited, scrape_all
+
+
+class FakePlayStore:
+    """
+    `google_play_scraper.reviews` stand-in serving newest-first pages.
+
+    Args:
+        apps (dict): {app_id: number of reviews}
+        failing (set): App ids whose every request raises
+        flaky (int): Number of requests that fail before any succeeds
+    """
+
+    def __init__(self, apps, failing=(), flaky=0):
+        start = pd.Timestamp("2024-06-01")
+        self.reviews = {
+            app_id: [{"reviewId": f"{app_id}-{i}",
+                      "content": f"review {i} of {app_id}",
+                      "score": i % 5 + 1,
+                      "at": start - pd.Timedelta(hours=i)}
+                     for i in range(n)]
+            for app_id, n in apps.items()
+        }
+        self.failing = set(failing)
+        self.flaky = flaky
+        self.calls = 0
+
+    def add(self, app_id, n):
+        """Publish n reviews newer than the existing ones."""
+        old = self.reviews[app_id]
+        newest = old[0]["at"] if old else pd.Timestamp("2024-06-01")
+        self.reviews[app_id] = [
+            {"reviewId": f"{app_id}-new-{len(old) + i}",
+             "content": f"new review {i}", "score": 5,
+             "at": newest + pd.Timedelta(minutes=n - i)}
+            for i in range(n)
+        ] + old
+
+    def __call__(self, app_id, lang, country, sort, count,
+                 continuation_token=None):
+        self.calls += 1
+        if self.flaky:
+            self.flaky -= 1
+            raise ConnectionError("temporary failure")
+        if app_id in self.failing:
+            raise ConnectionError(f"{app_id} unavailable")
+        offset = int(continuation_token.token) if continuation_token else 0
+        page = self.reviews[app_id][offset:offset + count]
+        end = offset + len(page)
+        more = end < len(self.reviews[app_id])
+        return page, _ContinuationToken(str(end) if more else None, lang,
+                                        country, sort, count, None, None)
+
+
+APPS = {"A": {"app_id": "app.a", "target_count": 30},
+        "B": {"app_id": "app.b", "target_count": 30},
+        "C": {"app_id": "app.c", "target_count": 30}}
+
+
+@pytest.fixture
+def config_path(tmp_path, monkeypatch):
+    """Apps config in a temporary working directory, without delays."""
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "apps.yaml"
+    path.write_text(json.dumps({
+        "apps": APPS,
+        "rate_limit": {"requests_per_second": 1000, "burst": 1000,
+                       "max_retries": 1, "retry_base_delay": 0},
+    }), encoding="utf-8")
+    return str(path)
+
+
+def test_rate_limited_retries_until_success():
+    store = FakePlayStore({"app.a": 5}, flaky=2)
+    metrics = {"requests": 0, "errors": 0}
+    fetch = rate_limited(store, TokenBucket(rate=1000, capacity=1000),
+                         metrics, max_retries=3, base_delay=0)
+    page, _ = fetch("app.a", lang="en", country="us", sort=None, count=10)
+    assert len(page) == 5
+    assert metrics == {"requests": 3, "errors": 2}
+
+
+def test_scrape_all_keeps_other_apps_when_one_fails():
+    store = FakePlayStore({"app.a": 20, "app.b": 20, "app.c": 20},
+                          failing={"app.b"})
+
+    def scrape_fn(bank, info, fetch):
+        return scrape_reviews.scrape_bank_reviews(
+            info["app_id"], bank, target_count=20, batch_size=10,
+            fetch=fetch, delay=0)
+
+    results, metrics = scrape_all(
+        APPS, scrape_fn, store, TokenBucket(rate=1000, capacity=1000),
+        max_retries=1, base_delay=0)
+    assert sorted(results) == ["A", "C"]
+    assert all(len(results[bank]) == 20 for bank in results)
+    assert "app.b unavailable" in metrics["B"]["error"]
+    assert metrics["B"]["requests"] == 2
+    assert "error" not in metrics["A"]
+
+
+def test_main_incremental_saves_apps_that_succeed(config_path):
+    store = FakePlayStore({"app.a": 15, "app.b": 15, "app.c": 15},
+                          failing={"app.b"})
+    failed = scrape_reviews.main_incremental(config_path, fetch=store)
+
+    assert failed == ["B"]
+    watermarks = scrape_reviews.load_watermarks()
+    assert sorted(watermarks) == ["app.a", "app.c"]
+    raw = pd.read_csv(scrape_reviews.RAW_CSV)
+    assert raw["bank"].value_counts().to_dict() == {"A": 15, "C": 15}
+
+    # B recovers: it is scraped in full, A and C only fetch new reviews
+    store.failing.clear()
+    store.add("app.a", 3)
+    assert scrape_reviews.main_incremental(config_path, fetch=store) == []
+    raw = pd.read_csv(scrape_reviews.RAW_CSV)
+    assert raw["bank"].value_counts().to_dict() == {"A": 18, "B": 15,
+                                                    "C": 15}
+
+
+def test_main_keeps_previous_rows_of_failed_app(config_path):
+    store = FakePlayStore({"app.a": 30, "app.b": 30, "app.c": 30})
+    assert scrape_reviews.main(config_path, fetch=store) == []
+
+    store.failing.add("app.c")
+    assert scrape_reviews.main(config_path, fetch=store) == ["C"]
+    raw = pd.read_csv(scrape_reviews.RAW_CSV)
+    assert raw["bank"].value_counts().to_dict() == {"A": 30, "B": 30,
+                                                    "C": 30}
+
+
+def test_main_fails_when_every_app_fails(config_path):
+    store = FakePlayStore({"app.a": 5, "app.b": 5, "app.c": 5},
+                          failing={"app.a", "app.b", "app.c"})
+    with pytest.raises(RuntimeError, match="every app"):
+        scrape_reviews.main(config_path, fetch=store)
+
+
+def test_incremental_gap_is_resumed_without_loss():
+    store = FakePlayStore({"app.a": 10})
+    df, watermark = scrape_reviews.scrape_bank_reviews_incremental(
+        "app.a", "A", batch_size=5, fetch=store, delay=0)
+    seen = list(df["review"])
+
+    # more new reviews than one run may page through
+    store.add("app.a", 12)
+    df, watermark = scrape_reviews.scrape_bank_reviews_incremental(
+        "app.a", "A", watermark, batch_size=5, max_pages=1,
+        fetch=store, delay=0)
+    seen += list(df["review"])
+    assert len(watermark["gaps"]) == 1
+
+    # each run spends one page on the head and the rest on the gap
+    for _ in range(5):
+        if not watermark["gaps"]:
+            break
+        df, watermark = scrape_reviews.scrape_bank_reviews_incremental(
+            "app.a", "A", watermark, batch_size=5, max_pages=2,
+            fetch=store, delay=0)
+        seen += list(df.get("review", []))
+    assert watermark["gaps"] == []
+
+    assert sorted(seen) == sorted(r["content"]
+                                  for r in store.reviews["app.a"])
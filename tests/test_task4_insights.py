@@ -0,0 +1,35 @@
+# tests/test_task4_insights.py
+"""
+Task 4 reads the Task 2 output (src/task2_sentiment_theme.py) as written.
+"""
+
+import pandas as pd
+from src import task4_insights
+
+
+def test_chart_jobs_from_task2_output(tmp_path):
+    path = tmp_path / "reviews_sentiment_themes.csv"
+    pd.DataFrame({
+        "review": ["login fails", "fast transfer", "crashes a lot"],
+        "rating": [1, 5, 2],
+        "date": ["2024-01-05", "2024-01-20 10:00:00", "2024-02-01"],
+        "bank": ["CBE", "BOA", "CBE"],
+        "source": "Google Play",
+        "sentiment_label": ["NEGATIVE", "POSITIVE", "NEGATIVE"],
+        "sentiment_score": [-0.9, 0.95, -0.8],
+        "themes": ["Account Access Issues",
+                   "Transaction Performance",
+                   "Reliability & Stability; Transaction Performance"],
+    }).to_csv(path, index=False)
+
+    df = task4_insights.load_reviews(str(path))
+    jobs = {job["name"]: job["data"]
+            for job in task4_insights.chart_jobs(df, use_rollups=False)}
+
+    assert set(jobs) == {"rating_distribution.png", "sentiment_trend.png",
+                         "wordcloud_CBE.png", "wordcloud_BOA.png",
+                         "top10_themes.png"}
+    assert len(jobs["sentiment_trend.png"]) == 3  # bank x month
+    assert jobs["top10_themes.png"].to_dict() == {
+        "Transaction Performance": 2, "Account Access Issues": 1,
+        "Reliability & Stability": 1}